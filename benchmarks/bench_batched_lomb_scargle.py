@@ -0,0 +1,105 @@
+"""
+Benchmark of the batched multi-term Lomb-Scargle (`PeriodogramMethodEnum.BATCHED`)
+against the per-bin astropy chi2 loop (`PeriodogramMethodEnum.ASTROPY`) used by
+`FrequencyDecomposer`.
+
+Bins are taken from the asteroids in `--data-dir` (split and binned as in the
+feature generation) or, without it, generated synthetically.
+
+Usage: python benchmarks/bench_batched_lomb_scargle.py [--data-dir DATA_DIR] [--asteroids N]
+"""
+
+import argparse
+from datetime import datetime
+from time import perf_counter
+
+import numpy as np
+
+from astrofit.model import Lightcurve, LightcurveBin
+from astrofit.utils import AsteroidLoader, FrequencyDecomposer, LightcurveBinner, LightcurveSplitter
+from astrofit.utils.enums import PeriodogramMethodEnum
+
+
+def synthetic_bins(n_bins: int, seed: int = 0) -> list[LightcurveBin]:
+    rng = np.random.default_rng(seed)
+
+    bins = []
+    for _ in range(n_bins):
+        lightcurves = []
+        start = 2450000 + rng.uniform(0, 1000)
+        for _ in range(rng.integers(1, 4)):
+            n_points = int(rng.integers(50, 500))
+            times = np.sort(start + rng.uniform(0, 0.3, n_points))
+            freq = rng.uniform(1, 10)
+            points = np.column_stack(
+                [
+                    times,
+                    1 + 0.2 * np.sin(2 * np.pi * freq * times) + 0.02 * rng.normal(size=n_points),
+                    rng.normal(size=(n_points, 6)),
+                ]
+            )
+            lightcurves.append(
+                Lightcurve(
+                    id=0,
+                    scale=1,
+                    points=points,
+                    created=datetime.now(),
+                    modified=datetime.now(),
+                    points_count=n_points,
+                )
+            )
+            start += rng.uniform(1, 10)
+
+        bins.append(LightcurveBin(lightcurves=lightcurves))
+
+    return bins
+
+
+def dataset_bins(data_dir: str, n_asteroids: int) -> list[LightcurveBin]:
+    loader = AsteroidLoader(data_dir)
+    splitter = LightcurveSplitter()
+    binner = LightcurveBinner()
+
+    bins = []
+    for ind, (_, asteroid) in enumerate(loader.iter_asteroids()):
+        if ind == n_asteroids:
+            break
+
+        lightcurves = splitter.split_lightcurves(asteroid.lightcurves, max_hours_diff=2, min_no_points=20)
+        bins.extend(binner.bin_lightcurves(lightcurves, max_time_diff=30, min_bin_size=1)[:4])
+
+    return bins
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--data-dir", default=None)
+    parser.add_argument("--asteroids", type=int, default=10)
+    parser.add_argument("--bins", type=int, default=20, help="Number of synthetic bins (without --data-dir)")
+    parser.add_argument("--nterms", type=int, default=3)
+    parser.add_argument("--max-freq", type=float, default=12)
+    parser.add_argument("--top-k", type=int, default=50)
+    args = parser.parse_args()
+
+    bins = dataset_bins(args.data_dir, args.asteroids) if args.data_dir else synthetic_bins(args.bins)
+    print(f"{len(bins)} bins, {sum(b.points_count for b in bins)} points")
+
+    results = {}
+    for method in PeriodogramMethodEnum:
+        decomposer = FrequencyDecomposer(method=method)
+        start = perf_counter()
+        results[method] = decomposer.decompose_bins(bins, args.nterms, args.top_k, args.max_freq)
+        print(f"{method.name:>8}: {perf_counter() - start:.3f}s")
+
+    max_power_diff = 0.0
+    overlaps = []
+    for reference, batched in zip(results[PeriodogramMethodEnum.ASTROPY], results[PeriodogramMethodEnum.BATCHED]):
+        max_power_diff = max(max_power_diff, float(np.abs(reference[:, 1] - batched[:, 1]).max()))
+        overlaps.append(len(np.intersect1d(reference[:, 0], batched[:, 0])) / len(reference))
+
+    print(f"Max top-k power difference: {max_power_diff:.3e}")
+    print(f"Mean top-k frequency overlap: {np.mean(overlaps) * 100:.2f}%")
+
+
+if __name__ == "__main__":
+    main()
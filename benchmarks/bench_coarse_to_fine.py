@@ -0,0 +1,107 @@
+"""
+Accuracy and speed of the coarse-to-fine frequency search of `FrequencyDecomposer`
+against the full frequency grid, over the bins of the stored dataset.
+
+For every bin the full-grid and coarse-to-fine top-k frequencies are compared
+(best frequency match, top-k overlap) and the number of evaluated frequencies
+is counted.
+
+Usage: python benchmarks/bench_coarse_to_fine.py --data-dir DATA_DIR [--asteroids N]
+    [--coarse-samples-per-peak S] [--max-evaluations M]
+"""
+
+import argparse
+from time import perf_counter
+
+import numpy as np
+
+from astrofit.model import LightcurveBin
+from astrofit.utils import AsteroidLoader, FrequencyDecomposer, LightcurveBinner, LightcurveSplitter
+from astrofit.utils.enums import PeriodogramMethodEnum
+
+
+class CountingFrequencyDecomposer(FrequencyDecomposer):
+    """
+    Counts the frequencies at which periodograms are evaluated.
+    """
+
+    evaluations = 0
+
+    def _get_periodogram(self, *args, **kwargs) -> tuple[np.ndarray, np.ndarray]:
+        frequency, power = super()._get_periodogram(*args, **kwargs)
+        self.evaluations += len(frequency)
+
+        return frequency, power
+
+
+def dataset_bins(data_dir: str, n_asteroids: int | None) -> list[tuple[float, LightcurveBin]]:
+    loader = AsteroidLoader(data_dir)
+    splitter = LightcurveSplitter()
+    binner = LightcurveBinner()
+
+    bins = []
+    for ind, (_, asteroid) in enumerate(loader.iter_asteroids(prefetch=2)):
+        if ind == n_asteroids:
+            break
+
+        lightcurves = splitter.split_lightcurves(asteroid.lightcurves, max_hours_diff=2, min_no_points=20)
+        asteroid_bins = binner.bin_lightcurves(lightcurves, max_time_diff=30, min_bin_size=1)
+        bins.extend((asteroid.period, lightcurve_bin) for lightcurve_bin in sorted(asteroid_bins, reverse=True)[:4])
+
+    return bins
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--data-dir", required=True)
+    parser.add_argument("--asteroids", type=int, default=None)
+    parser.add_argument("--coarse-samples-per-peak", type=float, default=1)
+    parser.add_argument("--max-evaluations", type=int, default=None)
+    parser.add_argument("--nterms", type=int, default=3)
+    parser.add_argument("--max-freq", type=float, default=12)
+    parser.add_argument("--top-k", type=int, default=50)
+    args = parser.parse_args()
+
+    bins = dataset_bins(args.data_dir, args.asteroids)
+    print(f"{len(bins)} bins, {sum(b.points_count for _, b in bins)} points")
+
+    full = CountingFrequencyDecomposer(method=PeriodogramMethodEnum.BATCHED)
+    coarse_to_fine = CountingFrequencyDecomposer(
+        method=PeriodogramMethodEnum.BATCHED,
+        coarse_samples_per_peak=args.coarse_samples_per_peak,
+        max_evaluations=args.max_evaluations,
+    )
+
+    results = {}
+    for name, decomposer in [("full", full), ("coarse-to-fine", coarse_to_fine)]:
+        start = perf_counter()
+        results[name] = decomposer.decompose_bins([b for _, b in bins], args.nterms, args.top_k, args.max_freq)
+        print(f"{name:>15}: {perf_counter() - start:8.3f}s, {decomposer.evaluations:>10} frequency evaluations")
+
+    best_matches, overlaps, best_diffs, period_errors = [], [], [], []
+    for (period, _), reference, searched in zip(bins, results["full"], results["coarse-to-fine"]):
+        best_matches.append(reference[0, 0] == searched[0, 0])
+        best_diffs.append(abs(reference[0, 0] - searched[0, 0]))
+        overlaps.append(len(np.intersect1d(reference[:, 0], searched[:, 0])) / len(reference))
+
+        # Lightcurves are usually double-peaked, so the best frequency may be the rotation frequency or twice it
+        true_freqs = np.array([24 / period, 2 * 24 / period])
+        period_errors.append(
+            (
+                np.min(np.abs(reference[0, 0] - true_freqs) / true_freqs),
+                np.min(np.abs(searched[0, 0] - true_freqs) / true_freqs),
+            )
+        )
+
+    period_errors = np.array(period_errors)
+    print(f"Best frequency identical: {np.mean(best_matches) * 100:.2f}% of bins")
+    print(f"Best frequency difference: median {np.median(best_diffs):.3e}, max {np.max(best_diffs):.3e}")
+    print(f"Mean top-k overlap: {np.mean(overlaps) * 100:.2f}%")
+    print(
+        "Median relative error of the best frequency vs (1 or 2) * 24 / period: "
+        f"full {np.median(period_errors[:, 0]):.4f}, coarse-to-fine {np.median(period_errors[:, 1]):.4f}"
+    )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,113 @@
+"""
+Speed and period recovery of the Phase Dispersion Minimization backend
+(`PeriodogramMethodEnum.PDM`) against the Lomb-Scargle ones of `FrequencyDecomposer`.
+
+Bins are taken from the asteroids in `--data-dir` (split and binned as in the
+feature generation) or, without it, generated synthetically as double-peaked
+lightcurves. The best frequency of each bin is compared with the known rotation
+frequency `24 / period` and its first harmonic.
+
+Usage: python benchmarks/bench_pdm.py [--data-dir DATA_DIR] [--asteroids N] [--pdm-bins B]
+"""
+
+import argparse
+from datetime import datetime
+from time import perf_counter
+
+import numpy as np
+
+from astrofit.model import Lightcurve, LightcurveBin
+from astrofit.utils import AsteroidLoader, FrequencyDecomposer, LightcurveBinner, LightcurveSplitter
+from astrofit.utils.enums import PeriodogramMethodEnum
+
+# A best frequency within this relative error of the target counts as recovered
+RECOVERY_TOLERANCE = 0.01
+
+
+def synthetic_bins(n_bins: int, seed: int = 0) -> list[tuple[float, LightcurveBin]]:
+    rng = np.random.default_rng(seed)
+
+    bins = []
+    for _ in range(n_bins):
+        period = rng.uniform(2, 20)
+        freq = 24 / period
+        phase_shift = rng.uniform(0, 2 * np.pi)
+
+        lightcurves = []
+        start = 2450000 + rng.uniform(0, 1000)
+        for _ in range(rng.integers(2, 5)):
+            n_points = int(rng.integers(50, 300))
+            times = np.sort(start + rng.uniform(0, 0.25, n_points))
+            # Two unequal maxima per rotation
+            brightnesses = (
+                1
+                + 0.2 * np.cos(4 * np.pi * freq * times)
+                + 0.05 * np.cos(2 * np.pi * freq * times + phase_shift)
+                + 0.02 * rng.normal(size=n_points)
+            )
+            points = np.column_stack([times, brightnesses, rng.normal(size=(n_points, 6))])
+            lightcurves.append(
+                Lightcurve(
+                    id=0,
+                    scale=1,
+                    points=points,
+                    created=datetime.now(),
+                    modified=datetime.now(),
+                    points_count=n_points,
+                )
+            )
+            start += rng.uniform(1, 5)
+
+        bins.append((period, LightcurveBin(lightcurves=lightcurves)))
+
+    return bins
+
+
+def dataset_bins(data_dir: str, n_asteroids: int) -> list[tuple[float, LightcurveBin]]:
+    loader = AsteroidLoader(data_dir)
+    splitter = LightcurveSplitter()
+    binner = LightcurveBinner()
+
+    bins = []
+    for ind, (_, asteroid) in enumerate(loader.iter_asteroids(prefetch=2)):
+        if ind == n_asteroids:
+            break
+
+        lightcurves = splitter.split_lightcurves(asteroid.lightcurves, max_hours_diff=2, min_no_points=20)
+        asteroid_bins = binner.bin_lightcurves(lightcurves, max_time_diff=30, min_bin_size=1)
+        bins.extend((asteroid.period, lightcurve_bin) for lightcurve_bin in sorted(asteroid_bins, reverse=True)[:4])
+
+    return bins
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--data-dir", default=None)
+    parser.add_argument("--asteroids", type=int, default=10)
+    parser.add_argument("--bins", type=int, default=20, help="Number of synthetic bins (without --data-dir)")
+    parser.add_argument("--pdm-bins", type=int, default=10)
+    parser.add_argument("--nterms", type=int, default=3)
+    parser.add_argument("--max-freq", type=float, default=12)
+    parser.add_argument("--top-k", type=int, default=50)
+    args = parser.parse_args()
+
+    bins = dataset_bins(args.data_dir, args.asteroids) if args.data_dir else synthetic_bins(args.bins)
+    periods = np.array([period for period, _ in bins])
+    print(f"{len(bins)} bins, {sum(b.points_count for _, b in bins)} points")
+
+    # Lightcurves are usually double-peaked, so the best frequency may be the rotation frequency or twice it
+    targets = {"1 x": 24 / periods, "2 x": 2 * 24 / periods}
+    print(f"{'method':>8} {'time [s]':>9} " + " ".join(f"{name + ' recovered':>12}" for name in targets))
+    for method in PeriodogramMethodEnum:
+        decomposer = FrequencyDecomposer(method=method, pdm_bins=args.pdm_bins)
+        start = perf_counter()
+        results = decomposer.decompose_bins([b for _, b in bins], args.nterms, args.top_k, args.max_freq)
+        elapsed = perf_counter() - start
+
+        best = np.array([result[0, 0] for result in results])
+        recovered = [np.mean(np.abs(best - target) / target < RECOVERY_TOLERANCE) * 100 for target in targets.values()]
+        print(f"{method.name:>8} {elapsed:>9.3f} " + " ".join(f"{value:>11.1f}%" for value in recovered))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,64 @@
+"""
+Benchmark of the bulk DAMIT points parser (`Point.array_from_str`) against
+the previous per-row `Point.from_list` path.
+
+Usage: python benchmarks/bench_point_parsing.py [--points N] [--repeats R]
+"""
+
+import argparse
+from time import perf_counter
+
+import numpy as np
+
+from astrofit.model import Point
+
+
+def make_points_block(n_points: int, seed: int = 0) -> str:
+    rng = np.random.default_rng(seed)
+    data = np.column_stack(
+        [
+            np.sort(2450000 + rng.uniform(0, 100, n_points)),
+            rng.uniform(0.5, 1.5, n_points),
+            rng.normal(size=(n_points, 6)),
+        ]
+    )
+
+    return "\n".join(" ".join(f"{value:.8f}" for value in row) for row in data) + "\n"
+
+
+def parse_per_row(points: str) -> np.ndarray:
+    return Point.to_array([Point.from_list(row.split()) for row in points.split("\n") if row])
+
+
+def parse_bulk(points: str) -> np.ndarray:
+    return Point.array_from_str(points)
+
+
+def best_time(func, points: str, repeats: int) -> float:
+    times = []
+    for _ in range(repeats):
+        start = perf_counter()
+        func(points)
+        times.append(perf_counter() - start)
+
+    return min(times)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--points", type=int, nargs="+", default=[1_000, 10_000, 100_000])
+    parser.add_argument("--repeats", type=int, default=3)
+    args = parser.parse_args()
+
+    print(f"{'points':>10} {'per-row [s]':>12} {'bulk [s]':>10} {'speedup':>8}")
+    for n_points in args.points:
+        points = make_points_block(n_points)
+        assert np.array_equal(parse_per_row(points), parse_bulk(points))
+
+        per_row = best_time(parse_per_row, points, args.repeats)
+        bulk = best_time(parse_bulk, points, args.repeats)
+        print(f"{n_points:>10} {per_row:>12.4f} {bulk:>10.4f} {per_row / bulk:>7.1f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,136 @@
+"""
+Benchmark of the split -> bin pipeline with derived lightcurves built through the
+trusted path (`Lightcurve.from_trusted_points`) against fully validated ones
+(`Lightcurve.from_points`, as before), plus overlap merging in `Asteroid`.
+
+Asteroids are taken from `--data-dir` or, without it, generated synthetically.
+
+Usage: python benchmarks/bench_trusted_lightcurves.py [--data-dir DATA_DIR] [--asteroids N] [--repeats R]
+"""
+
+import argparse
+from datetime import datetime
+from time import perf_counter
+
+import numpy as np
+
+from astrofit.model import Asteroid, Lightcurve
+from astrofit.utils import AsteroidLoader, LightcurveBinner, LightcurveSplitter
+
+
+class ValidatingLightcurveSplitter(LightcurveSplitter):
+    def _split_lightcurve(
+        self,
+        lightcurve: Lightcurve,
+        max_hours_diff: float,
+        min_no_points: int | None = None,
+    ) -> list[Lightcurve]:
+        return [
+            Lightcurve.from_points(lightcurve, lc.points_arr)
+            for lc in super()._split_lightcurve(lightcurve, max_hours_diff, min_no_points)
+        ]
+
+
+def synthetic_asteroids(n_asteroids: int, seed: int = 0) -> list[Asteroid]:
+    rng = np.random.default_rng(seed)
+
+    asteroids = []
+    for ind in range(n_asteroids):
+        lightcurves = []
+        start = 2450000 + rng.uniform(0, 1000)
+        for lc_id in range(int(rng.integers(20, 60))):
+            # Nights of observations separated by daytime gaps
+            times = np.concatenate(
+                [np.sort(start + night + rng.uniform(0, 0.3, int(rng.integers(20, 200)))) for night in range(3)]
+            )
+            points = np.column_stack([times, rng.uniform(0.5, 1.5, len(times)), rng.normal(size=(len(times), 6))])
+            lightcurves.append(
+                Lightcurve(
+                    id=lc_id,
+                    scale=1,
+                    points=points,
+                    created=datetime.now(),
+                    modified=datetime.now(),
+                    points_count=len(times),
+                )
+            )
+            # Some lightcurves overlap the previous one
+            start += rng.uniform(1, 30)
+
+        asteroids.append(
+            Asteroid(
+                id=ind, name=f"Asteroid {ind}", period=rng.uniform(2, 20), lambd=0, beta=0, lightcurves=lightcurves
+            )
+        )
+
+    return asteroids
+
+
+def dataset_asteroids(data_dir: str, n_asteroids: int) -> list[Asteroid]:
+    asteroids = []
+    for ind, (_, asteroid) in enumerate(AsteroidLoader(data_dir).iter_asteroids()):
+        if ind == n_asteroids:
+            break
+
+        asteroids.append(asteroid)
+
+    return asteroids
+
+
+def run_pipeline(splitter: LightcurveSplitter, asteroids: list[Asteroid]) -> list:
+    binner = LightcurveBinner()
+
+    bins = []
+    for asteroid in asteroids:
+        for max_hours_diff in (1, 2, 4, 8):
+            lightcurves = splitter.split_lightcurves(asteroid.lightcurves, max_hours_diff, min_no_points=10)
+            for max_time_diff in (30, 45, 60):
+                bins.append(binner.bin_lightcurves(lightcurves, max_time_diff=max_time_diff, min_bin_size=1))
+
+    return bins
+
+
+def best_time(func, repeats: int) -> float:
+    times = []
+    for _ in range(repeats):
+        start = perf_counter()
+        func()
+        times.append(perf_counter() - start)
+
+    return min(times)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--data-dir", default=None)
+    parser.add_argument("--asteroids", type=int, default=20)
+    parser.add_argument("--repeats", type=int, default=3)
+    args = parser.parse_args()
+
+    if args.data_dir:
+        asteroids = dataset_asteroids(args.data_dir, args.asteroids)
+    else:
+        asteroids = synthetic_asteroids(args.asteroids)
+    print(f"{len(asteroids)} asteroids, {sum(len(a.lightcurves) for a in asteroids)} lightcurves")
+
+    trusted_bins = run_pipeline(LightcurveSplitter(), asteroids)
+    validated_bins = run_pipeline(ValidatingLightcurveSplitter(), asteroids)
+    for trusted, validated in zip(trusted_bins, validated_bins):
+        assert [b.points_count for b in trusted] == [b.points_count for b in validated]
+        assert all(np.array_equal(t.times, v.times) for t, v in zip(trusted, validated))
+
+    validated = best_time(lambda: run_pipeline(ValidatingLightcurveSplitter(), asteroids), args.repeats)
+    trusted = best_time(lambda: run_pipeline(LightcurveSplitter(), asteroids), args.repeats)
+    print(f"split/bin, validated: {validated:.3f}s, trusted: {trusted:.3f}s, speedup: {validated / trusted:.2f}x")
+
+    lightcurves = [lc for asteroid in asteroids for lc in asteroid.lightcurves]
+    validated = best_time(lambda: [Lightcurve.from_points(lc, lc.points_arr) for lc in lightcurves], args.repeats)
+    trusted = best_time(lambda: [Lightcurve.from_trusted_points(lc, lc.points_arr) for lc in lightcurves], args.repeats)
+    print(
+        f"construction of {len(lightcurves)} lightcurves, validated: {validated:.4f}s, trusted: {trusted:.4f}s, "
+        f"speedup: {validated / trusted:.1f}x"
+    )
+
+
+if __name__ == "__main__":
+    main()
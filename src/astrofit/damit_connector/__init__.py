@@ -1,6 +1,7 @@
 __all__ = [
     "AsteroidDownloader",
+    "DownloadSummary",
 ]
 
 
-from astrofit.damit_connector.asteroid_downloader import AsteroidDownloader
+from astrofit.damit_connector.asteroid_downloader import AsteroidDownloader, DownloadSummary
@@ -1,67 +1,303 @@
+import gzip
 import json
+import os
+import shutil
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from datetime import datetime, timedelta, timezone
+from email.utils import parsedate_to_datetime
+from importlib.util import find_spec
 from pathlib import Path
 from random import choice
+from threading import Lock, get_ident
+from time import sleep
+from urllib.parse import urlsplit
 
 import pandas as pd
 import requests
-from bs4 import BeautifulSoup
+from bs4 import BeautifulSoup, SoupStrainer
+from pydantic import BaseModel
+from requests.adapters import HTTPAdapter
+
+from astrofit.damit_connector.rate_limiter import RateLimiter
 
 DAMIT_URL = "https://astro.troja.mff.cuni.cz/projects/damit/?q="
 LC_JSON_URI = "https://astro.troja.mff.cuni.cz/projects/damit/light_curves/exportAllForAsteroid/{}/json"
 
+SEARCH_TABLE_CLASS = "damit-table-asteroids-browse"
+SEARCH_CACHE_FILE = "damit_search_cache.json"
+# lxml is much faster than the builtin parser, but optional
+HTML_PARSER = "lxml" if find_spec("lxml") is not None else "html.parser"
+
+LC_FILE = "lc.json"
+LC_GZ_FILE = "lc.json.gz"
+# Validators of the downloaded lightcurves, sent back in conditional requests
+LC_META_FILE = "lc_meta.json"
+CHUNK_SIZE = 2**20
+
+# Responses retried (with exponential backoff) besides connection errors and timeouts
+RETRY_STATUSES = (429, 500, 502, 503, 504)
+# Upper bound of a single wait between retries (a longer `Retry-After` is cut to it) in seconds
+MAX_BACKOFF = 120
+
 request_headers = [
     {
         "User-Agent": "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/58.0.3029.110 Safari/537.3",  # noqa E501
         "Accept": "text/html,application/xhtml+xml,application/xml;q=0.9,image/webp,*/*;q=0.8",
         "Referer": "http://www.google.com",
-        "Accept-Encoding": "gzip, deflate, br",
+        "Accept-Encoding": "gzip, deflate",
         "Accept-Language": "en-US,en;q=0.5",
     },
     {
         "User-Agent": "Mozilla/5.0 (X11; Ubuntu; Linux x86_64; rv:55.0) Gecko/20100101 Firefox/55.0",
         "Accept": "text/html,application/xhtml+xml,application/xml;q=0.9,image/webp,*/*;q=0.8",
         "Referer": "http://www.google.com",
-        "Accept-Encoding": "gzip, deflate, br",
+        "Accept-Encoding": "gzip, deflate",
         "Accept-Language": "en-US,en;q=0.5",
     },
     {
         "User-Agent": "Mozilla/5.0 (Windows NT 6.1; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/58.0.3029.110 Safari/537.3",  # noqa E501
         "Accept": "text/html,application/xhtml+xml,application/xml;q=0.9,image/webp,*/*;q=0.8",
         "Referer": "http://www.google.com",
-        "Accept-Encoding": "gzip, deflate, br",
+        "Accept-Encoding": "gzip, deflate",
         "Accept-Language": "en-US,en;q=0.5",
     },
     {
         "User-Agent": "Mozilla/5.0 (Macintosh; Intel Mac OS X 10_15_7) AppleWebKit/605.1.15 (KHTML, like Gecko) Version/14.0.3 Safari/605.1.15",  # noqa E501
         "Accept": "text/html,application/xhtml+xml,application/xml;q=0.9,*/*;q=0.8",
-        "Accept-Encoding": "gzip, deflate, br",
+        "Accept-Encoding": "gzip, deflate",
         "Referer": "https://www.apple.com",
     },
     {
         "User-Agent": "Mozilla/5.0 (X11; Ubuntu; Linux x86_64; rv:88.0) Gecko/20100101 Firefox/88.0",
         "Accept": "text/html,application/xhtml+xml,application/xml;q=0.9,image/webp,*/*;q=0.8",
-        "Accept-Encoding": "gzip, deflate, br",
+        "Accept-Encoding": "gzip, deflate",
         "Referer": "https://www.mozilla.org",
     },
 ]
 
 
+class DownloadSummary(BaseModel):
+    succeeded: dict[str, str] = {}
+    failed: dict[str, str] = {}
+
+    def __repr__(self) -> str:
+        return f"DownloadSummary(succeeded={len(self.succeeded)}, failed={len(self.failed)})"
+
+    def __str__(self) -> str:
+        return self.__repr__()
+
+
 class AsteroidDownloader:
-    def __init__(self, data_dir: Path | str) -> None:
+    def __init__(
+        self,
+        data_dir: Path | str,
+        damit_url: str = DAMIT_URL,
+        lc_json_uri: str = LC_JSON_URI,
+        timeout: float = 30,
+        max_retries: int = 5,
+        backoff_factor: float = 0.5,
+        requests_per_second: float | None = 2,
+        pool_size: int = 10,
+        compress: bool = False,
+        search_cache_max_age: timedelta | None = timedelta(days=7),
+    ) -> None:
+        """
+        :param data_dir: The data directory containing `asteroids.csv` and the `asteroids` directory.
+        :param damit_url: The URL of the DAMIT search, the query is appended to it.
+        :param lc_json_uri: The URL template of the lightcurves export, formatted with the asteroid id.
+        :param timeout: The connect and read timeout of each request in seconds.
+        :param max_retries: The number of retries of a failed request (connection errors, timeouts and
+            `RETRY_STATUSES`). Retries are made here rather than by the connection pool, so each one
+            waits for the rate limiter like a new request.
+        :param backoff_factor: The base of the exponential backoff between retries in seconds,
+            the server's `Retry-After` is used instead when given.
+        :param requests_per_second: The maximum request rate to a single host, unlimited if None.
+        :param pool_size: The number of pooled connections per host.
+        :param compress: Whether to store the lightcurves gzip-compressed (`lc.json.gz`) instead of `lc.json`.
+        :param search_cache_max_age: How long the parsed search results (`<data_dir>/damit_search_cache.json`)
+            are used instead of querying DAMIT again, forever if None.
+        """
         self._data_dir = Path(data_dir)
         self._asteroids_dir = self._data_dir / "asteroids"
+        self._damit_url = damit_url
+        self._lc_json_uri = lc_json_uri
+        self._timeout = timeout
+        self._compress = compress
+        self._max_retries = max_retries
+        self._backoff_factor = backoff_factor
 
         self._asteroids_df = self._load_asteroids_df()
-
-    def query_asteroid(self, query: str | int, exists_ok: bool = False) -> None:
+        self._session = self._create_session(pool_size)
+        self._rate_limiter = RateLimiter(requests_per_second)
+
+        self._search_cache_file = self._data_dir / SEARCH_CACHE_FILE
+        self._search_cache_max_age = search_cache_max_age
+        self._search_cache = self._load_search_cache()
+        self._search_cache_dirty = False
+        self._search_cache_lock = Lock()
+
+    def query_asteroid(
+        self,
+        query: str | int,
+        exists_ok: bool = False,
+        skip_mirrored: bool = False,
+        revalidate: bool = False,
+    ) -> str | None:
+        """
+        Download the lightcurves and the period of the asteroid found by the query.
+
+        The search result is taken from the search cache if it is fresh enough.
+
+        :param skip_mirrored: Whether to skip the download if the asteroid directory already has
+            the lightcurves and the period.
+        :param revalidate: Whether to re-fetch the lightcurves of an already downloaded asteroid with a
+            conditional request (downloaded again only if changed on the server), takes precedence
+            over `skip_mirrored` and `exists_ok`.
+
+        :return: The name of the asteroid, or None if nothing was found.
+        """
+        try:
+            return self._query_asteroid(query, exists_ok, skip_mirrored, revalidate)
+        finally:
+            self._save_search_cache()
+
+    def download_many(
+        self,
+        queries: list[str | int],
+        concurrency: int = 4,
+        exists_ok: bool = False,
+        skip_mirrored: bool = True,
+        revalidate: bool = False,
+    ) -> DownloadSummary:
+        """
+        Query many asteroids concurrently, sharing the pooled and rate-limited session.
+
+        The search cache is written once, after all queries.
+
+        :param queries: The queries.
+        :param concurrency: The number of asteroids downloaded at the same time.
+        :param exists_ok: Whether to overwrite already downloaded asteroids.
+        :param skip_mirrored: Whether to skip asteroids whose lightcurves and period are already downloaded.
+        :param revalidate: Whether to refresh already downloaded asteroids with conditional requests instead,
+            see `query_asteroid`.
+
+        :return: The names of the downloaded asteroids and the errors of the failed ones, by query.
+        """
+        summary = DownloadSummary()
+        try:
+            with ThreadPoolExecutor(max_workers=concurrency) as pool:
+                futures = {
+                    pool.submit(self._query_asteroid, query, exists_ok, skip_mirrored, revalidate): str(query)
+                    for query in queries
+                }
+                for future in as_completed(futures):
+                    query = futures[future]
+                    try:
+                        asteroid_name = future.result()
+                    except Exception as e:
+                        summary.failed[query] = f"{type(e).__name__}: {e}"
+                        continue
+
+                    if asteroid_name is None:
+                        summary.failed[query] = "No object found"
+                    else:
+                        summary.succeeded[query] = asteroid_name
+        finally:
+            self._save_search_cache()
+
+        print(f"Downloaded {len(summary.succeeded)} asteroids, {len(summary.failed)} failed")
+
+        return summary
+
+    def _query_asteroid(
+        self,
+        query: str | int,
+        exists_ok: bool,
+        skip_mirrored: bool,
+        revalidate: bool,
+    ) -> str | None:
         if isinstance(query, int):
             query = str(query)
 
-        response = requests.get(DAMIT_URL + query, headers=choice(request_headers))
-        soup = BeautifulSoup(response.content, "html.parser")
-
         print(f"Beginning asteroid extraction for: {query}...")
-        self._extract_asteroid_info(soup, query, exists_ok)
+        search_entry = self._get_search_entry(query)
+
+        asteroid_name = search_entry["asteroid_name"]
+        if asteroid_name is None:
+            print(f"No object found for query: {query}!")
+            return None
+
+        if self._is_mirrored(asteroid_name):
+            if revalidate:
+                exists_ok = True
+            elif skip_mirrored:
+                print(f"Asteroid {asteroid_name} is already downloaded, skipping")
+                return asteroid_name
+
+        asteroid_dir, created = self._create_asteroid_dir(asteroid_name, exists_ok)
+        try:
+            self._download_lc_json(asteroid_name, asteroid_dir)
+            self._save_period(search_entry["period"], asteroid_dir)
+        except BaseException:
+            # Otherwise the leftover directory would fail the next attempt with `exists_ok=False`
+            if created:
+                shutil.rmtree(asteroid_dir, ignore_errors=True)
+            raise
+
+        print(f"Finished extracting asteroid {asteroid_name}!")
+
+        return asteroid_name
+
+    def _create_session(self, pool_size: int) -> requests.Session:
+        # No retries in the pool, they would bypass the rate limiter (see `_get`)
+        adapter = HTTPAdapter(pool_connections=pool_size, pool_maxsize=pool_size)
+
+        session = requests.Session()
+        session.mount("http://", adapter)
+        session.mount("https://", adapter)
+
+        return session
+
+    def _get(self, url: str, headers: dict[str, str] | None = None, stream: bool = False) -> requests.Response:
+        host = urlsplit(url).netloc
+        attempt = 0
+        while True:
+            # Retries count against the rate limit like any other request
+            self._rate_limiter.wait(host)
+
+            try:
+                response = self._session.get(
+                    url, headers={**choice(request_headers), **(headers or {})}, timeout=self._timeout, stream=stream
+                )
+            except (requests.ConnectionError, requests.Timeout):
+                if attempt == self._max_retries:
+                    raise
+
+                backoff = self._get_backoff(attempt, None)
+            else:
+                if response.status_code not in RETRY_STATUSES or attempt == self._max_retries:
+                    response.raise_for_status()
+                    return response
+
+                response.close()
+                backoff = self._get_backoff(attempt, response.headers.get("Retry-After"))
+
+            sleep(backoff)
+            attempt += 1
+
+    def _get_backoff(self, attempt: int, retry_after: str | None) -> float:
+        backoff = self._backoff_factor * 2**attempt
+        if retry_after:
+            # Either a number of seconds or an HTTP date
+            try:
+                backoff = float(retry_after)
+            except ValueError:
+                try:
+                    backoff = (parsedate_to_datetime(retry_after) - datetime.now(timezone.utc)).total_seconds()
+                except (TypeError, ValueError):
+                    pass
+
+        return min(max(backoff, 0.0), MAX_BACKOFF)
 
     def _load_asteroids_df(self) -> pd.DataFrame:
         asteroid_csv = self._data_dir / "asteroids.csv"
@@ -74,11 +310,74 @@ class AsteroidDownloader:
 
         return asteroids_df
 
-    def _extract_asteroid_info(self, soup: BeautifulSoup, query: str, exists_ok: bool) -> None:
-        table = soup.find("table", class_="damit-table-asteroids-browse")
+    def _load_search_cache(self) -> dict[str, dict]:
+        if not self._search_cache_file.exists():
+            return {}
+
+        try:
+            with open(self._search_cache_file, "r") as f:
+                return json.load(f)
+        except json.JSONDecodeError:
+            return {}
+
+    def _get_search_entry(self, query: str) -> dict:
+        with self._search_cache_lock:
+            search_entry = self._search_cache.get(query)
+
+        if search_entry is not None and self._is_search_entry_fresh(search_entry):
+            return search_entry
+
+        response = self._get(self._damit_url + query)
+        # Only the results table is built into the tree
+        soup = BeautifulSoup(response.content, HTML_PARSER, parse_only=SoupStrainer("table", class_=SEARCH_TABLE_CLASS))
+
+        search_entry = self._extract_asteroid_info(soup, query)
+        search_entry["fetched_at"] = datetime.now(timezone.utc).isoformat()
+
+        # Saved to the file by `_save_search_cache`, once per `query_asteroid` or `download_many` call
+        with self._search_cache_lock:
+            self._search_cache[query] = search_entry
+            self._search_cache_dirty = True
+
+        return search_entry
+
+    def _save_search_cache(self) -> None:
+        with self._search_cache_lock:
+            if not self._search_cache_dirty:
+                return
+
+            tmp_search_cache_file = self._get_tmp_path(self._search_cache_file)
+            try:
+                with open(tmp_search_cache_file, "w") as f:
+                    json.dump(self._search_cache, f)
+
+                os.replace(tmp_search_cache_file, self._search_cache_file)
+                self._search_cache_dirty = False
+            except OSError as e:
+                # Only a cache, the searches are repeated next time
+                print(f"Could not save the search cache to {self._search_cache_file}: {e}")
+            finally:
+                tmp_search_cache_file.unlink(missing_ok=True)
+
+    def _is_search_entry_fresh(self, search_entry: dict) -> bool:
+        if self._search_cache_max_age is None:
+            return True
+
+        fetched_at = datetime.fromisoformat(search_entry["fetched_at"])
+
+        return datetime.now(timezone.utc) - fetched_at <= self._search_cache_max_age
+
+    def _is_mirrored(self, asteroid_name: str) -> bool:
+        asteroid_dir = self._asteroids_dir / asteroid_name
+
+        return (asteroid_dir / "period.txt").exists() and any(
+            (asteroid_dir / name).exists() for name in (LC_FILE, LC_GZ_FILE)
+        )
+
+    def _extract_asteroid_info(self, soup: BeautifulSoup, query: str) -> dict:
+        table = soup.find("table", class_=SEARCH_TABLE_CLASS)
         if table is None:
-            print(f"No object found for query: {query}!")
-            return None
+            return {"asteroid_name": None}
 
         tbody = table.find("tbody")
         if tbody is None:
@@ -89,8 +388,8 @@ class AsteroidDownloader:
             raise ValueError(f"No asteroid name found for query: {query}\n")
 
         print(f"Found asteroid: {asteroid_name}")
-        self._extract_row_models(asteroid_name, tbody, exists_ok)  # type: ignore
-        print(f"Finished extracting asteroid {asteroid_name}!")
+
+        return {"asteroid_name": asteroid_name, **self._extract_row_models(asteroid_name, tbody)}  # type: ignore
 
     def _get_asteroid_name(self, tbody: BeautifulSoup) -> str | None:
         tr = tbody.find("tr", class_="damit-asteroid-row")
@@ -99,7 +398,7 @@ class AsteroidDownloader:
 
         return a.text.split(") ")[1].strip()  # type: ignore
 
-    def _extract_row_models(self, asteroid_name: str, tbody: BeautifulSoup, exists_ok: bool) -> None:
+    def _extract_row_models(self, asteroid_name: str, tbody: BeautifulSoup) -> dict:
         trs = tbody.find_all("tr", class_="damit-model-row")
         if len(trs) == 0:
             raise ValueError(f"No models found for asteroid {asteroid_name}")
@@ -111,9 +410,7 @@ class AsteroidDownloader:
         if period is None:
             raise ValueError(f"Period not found for asteroid {asteroid_name}")
 
-        asteroid_dir = self._create_asteroid_dir(asteroid_name, exists_ok)
-        self._download_lc_json(asteroid_name, asteroid_dir)
-        self._save_period(period, asteroid_dir)
+        return {"period": period, "models_count": len(trs), "selected_model": len(trs) - 1}
 
     def _match_span(self, tag: BeautifulSoup) -> bool:
         return (
@@ -131,24 +428,85 @@ class AsteroidDownloader:
 
         return None
 
-    def _create_asteroid_dir(self, asteroid_name: str, exists_ok: bool) -> Path:
+    def _create_asteroid_dir(self, asteroid_name: str, exists_ok: bool) -> tuple[Path, bool]:
         asteroid_dir = self._asteroids_dir / asteroid_name
 
-        asteroid_dir.mkdir(parents=True, exist_ok=exists_ok)
+        try:
+            asteroid_dir.mkdir(parents=True)
+        except FileExistsError:
+            if not exists_ok:
+                raise
 
-        return asteroid_dir
+            return asteroid_dir, False
+
+        return asteroid_dir, True
 
     def _download_lc_json(self, asteroid_name: str, asteroid_dir: Path) -> None:
         (asteroid_id,) = self._asteroids_df.query(f"name == '{asteroid_name}'").index
-        response = requests.get(LC_JSON_URI.format(asteroid_id), headers=choice(request_headers))
-
-        lc_json = json.loads(response.content)
-        lc_file = asteroid_dir / "lc.json"
-        with open(lc_file, "w") as f:
-            json.dump(lc_json, f, indent=4)
+        lc_file = asteroid_dir / (LC_GZ_FILE if self._compress else LC_FILE)
+        meta_file = asteroid_dir / LC_META_FILE
+
+        # Unchanged lightcurves (same validators as the stored file) are not downloaded again
+        meta = {}
+        if lc_file.exists() and meta_file.exists():
+            with open(meta_file, "r") as f:
+                meta = json.load(f)
+
+        headers = {}
+        if meta.get("etag"):
+            headers["If-None-Match"] = meta["etag"]
+        if meta.get("last_modified"):
+            headers["If-Modified-Since"] = meta["last_modified"]
+
+        with self._get(self._lc_json_uri.format(asteroid_id), headers=headers, stream=True) as response:
+            if response.status_code == 304:
+                print(f"Light curve JSON for asteroid {asteroid_name} is up to date")
+                return None
+
+            # Streamed as received (compact) to a temporary file, renamed once complete
+            tmp_lc_file = self._get_tmp_path(lc_file)
+            try:
+                with gzip.open(tmp_lc_file, "wb") if self._compress else open(tmp_lc_file, "wb") as f:
+                    for chunk in response.iter_content(chunk_size=CHUNK_SIZE):
+                        f.write(chunk)
+
+                # A bad response (e.g. an error page served with 200) never replaces the stored lightcurves
+                self._validate_lc_json(tmp_lc_file, asteroid_name)
+                os.replace(tmp_lc_file, lc_file)
+            finally:
+                tmp_lc_file.unlink(missing_ok=True)
+
+            meta = {"etag": response.headers.get("ETag"), "last_modified": response.headers.get("Last-Modified")}
+
+        # The other format would be preferred by (or shadow) the new file when loading
+        other_lc_file = asteroid_dir / (LC_FILE if self._compress else LC_GZ_FILE)
+        other_lc_file.unlink(missing_ok=True)
+
+        tmp_meta_file = self._get_tmp_path(meta_file)
+        try:
+            with open(tmp_meta_file, "w") as f:
+                json.dump(meta, f)
+
+            os.replace(tmp_meta_file, meta_file)
+        finally:
+            tmp_meta_file.unlink(missing_ok=True)
 
         print(f"Downloaded light curve JSON for asteroid {asteroid_name} to {lc_file}")
 
+    def _validate_lc_json(self, lc_file: Path, asteroid_name: str) -> None:
+        try:
+            with gzip.open(lc_file, "rt") if self._compress else open(lc_file, "r") as f:
+                lightcurves = json.load(f)
+        except (OSError, EOFError, UnicodeDecodeError, json.JSONDecodeError) as e:
+            raise ValueError(f"Invalid light curve JSON for asteroid {asteroid_name}: {e}") from e
+
+        if not isinstance(lightcurves, list) or not all(isinstance(lc, dict) and "points" in lc for lc in lightcurves):
+            raise ValueError(f"Invalid light curve JSON for asteroid {asteroid_name}: expected a list of light curves")
+
+    def _get_tmp_path(self, path: Path) -> Path:
+        # Unique per process and thread, so concurrent downloads never share a temporary file
+        return path.with_name(f"{path.name}.{os.getpid()}.{get_ident()}.tmp")
+
     def _save_period(self, period: float, asteroid_dir: Path) -> None:
         period_file = asteroid_dir / "period.txt"
         with open(period_file, "w") as f:
@@ -0,0 +1,31 @@
+from threading import Lock
+from time import monotonic, sleep
+
+
+class RateLimiter:
+    """
+    Thread-safe limiter of the request rate to each host.
+    """
+
+    def __init__(self, requests_per_second: float | None) -> None:
+        """
+        :param requests_per_second: The maximum number of requests per second to a single host, unlimited if None.
+        """
+        self._interval = 1 / requests_per_second if requests_per_second else 0.0
+        self._next_times: dict[str, float] = {}
+        self._lock = Lock()
+
+    def wait(self, host: str) -> None:
+        """
+        Block until a request to the host is allowed.
+        """
+        if not self._interval:
+            return
+
+        with self._lock:
+            now = monotonic()
+            request_time = max(now, self._next_times.get(host, now))
+            self._next_times[host] = request_time + self._interval
+
+        if request_time > now:
+            sleep(request_time - now)
@@ -2,6 +2,7 @@ __all__ = [
     "Asteroid",
     "Lightcurve",
     "LightcurveBin",
+    "ObservationGeometry",
     "Point",
 ]
 
@@ -9,4 +10,5 @@ __all__ = [
 from astrofit.model.asteroid import Asteroid
 from astrofit.model.lightcurve import Lightcurve
 from astrofit.model.lightcurve_bin import LightcurveBin
+from astrofit.model.observation_geometry import ObservationGeometry
 from astrofit.model.point import Point
@@ -1,7 +1,9 @@
 from __future__ import annotations
 
+import hashlib
 from functools import cached_property
 
+import numpy as np
 import seaborn as sns
 from pydantic import BaseModel, ValidationError, field_validator
 
@@ -29,27 +31,19 @@ class Asteroid(BaseModel):
         # Pre-sort lightcurves by first_JD
         lightcurves = sorted(v, key=lambda lc: lc.first_JD)
 
-        # Merge lightcurves that overlap
-        sorted_lightcurves = []
-        curr_ind = 0
-        curr_lc = lightcurves[curr_ind]
-        while True:
-            if curr_ind >= len(lightcurves) - 1:
-                break
-
-            next_lc = lightcurves[curr_ind + 1]
-
-            if curr_lc.last_JD >= next_lc.first_JD:
-                curr_lc = curr_lc.merge(next_lc)
+        # Group lightcurves that overlap (directly or through a chain of overlapping ones)
+        groups = [[lightcurves[0]]]
+        group_last_JD = lightcurves[0].last_JD
+        for lc in lightcurves[1:]:
+            if group_last_JD >= lc.first_JD:
+                groups[-1].append(lc)
             else:
-                sorted_lightcurves.append(curr_lc)
-                curr_lc = next_lc
-
-            curr_ind += 1
+                groups.append([lc])
 
-        sorted_lightcurves.append(curr_lc)
+            group_last_JD = max(group_last_JD, lc.last_JD)
 
-        return sorted_lightcurves
+        # Each group is merged at once
+        return [group[0] if len(group) == 1 else Lightcurve.merge_many(group) for group in groups]
 
     @staticmethod
     def from_lightcurves(id: int, name: str, period: float, lambd: float, beta: float, data: list[dict]) -> Asteroid:
@@ -121,6 +115,21 @@ class Asteroid(BaseModel):
         """
         return {lc.id: lc for lc in self.lightcurves}
 
+    @cached_property
+    def fingerprint(self) -> str:
+        """
+        Get a hash of the content of the asteroid (its parameters and all lightcurve points).
+
+        :return: The hex digest.
+        """
+        digest = hashlib.sha1()
+        digest.update(repr((self.id, self.name, self.period, self.lambd, self.beta)).encode())
+        for lc in self.lightcurves:
+            digest.update(repr((lc.id, lc.scale, lc.points_count)).encode())
+            digest.update(np.ascontiguousarray(lc.points_arr).data)
+
+        return digest.hexdigest()
+
     def __repr__(self) -> str:
         return (
             f"Asteroid(id={self.id}, name={self.name}, period={self.period}, "
@@ -4,26 +4,31 @@ from datetime import datetime
 from functools import cached_property
 from typing import Self
 
+import numpy as np
 import seaborn as sns
 from matplotlib import pyplot as plt
 from matplotlib.axes import Axes
 from pydantic import BaseModel, Field, field_validator, model_validator
 from pydantic.config import ConfigDict
 
-from astrofit.model.point import Point
+from astrofit.model.observation_geometry import ObservationGeometry
+from astrofit.model.point import BRIGHTNESS_COL, EARTH_COLS, JD_COL, POINT_FIELDS, SUN_COLS, Point
 
 
 class Lightcurve(BaseModel):
     """
     A light curve is a series of measurements of the brightness of an object
     over time.
+
+    Points are stored column-wise in a single (n_points, 8) float64 array,
+    with columns ordered as in `Point.model_fields`.
     """
 
-    model_config = ConfigDict(populate_by_name=True)
+    model_config = ConfigDict(populate_by_name=True, arbitrary_types_allowed=True)
 
     id: int
     scale: int
-    points: list[Point]
+    points_arr: np.ndarray = Field(alias="points")
     created_at: datetime = Field(alias="created")
     updated_at: datetime = Field(alias="modified")
     points_count: int
@@ -40,31 +45,63 @@ class Lightcurve(BaseModel):
     def __len__(self) -> int:
         return self.points_count
 
-    @field_validator("points", mode="before")
+    def __eq__(self, other: object) -> bool:
+        # The default comparison would compare the points arrays element-wise
+        if not isinstance(other, Lightcurve):
+            return NotImplemented
+
+        return (
+            self.id == other.id
+            and self.scale == other.scale
+            and self.created_at == other.created_at
+            and self.updated_at == other.updated_at
+            and self.points_count == other.points_count
+            and np.array_equal(self.points_arr, other.points_arr)
+        )
+
+    @field_validator("points_arr", mode="before")
     @classmethod
-    def parse_points(cls, points):
+    def parse_points(cls, points) -> np.ndarray:
         """
-        Parse points from a string into a list of lists of floats.
+        Parse points (a string, a list of Points or an array-like) into a 2-D float array.
         """
         if isinstance(points, str):
-            return [Point.from_list(row.split()) for row in points.split("\n") if row]
-        else:
-            return points
+            return Point.array_from_str(points)
 
-    @field_validator("points", mode="after")
+        if isinstance(points, list) and any(isinstance(point, Point) for point in points):
+            points = Point.to_array(points)
+
+        points = np.asarray(points, dtype=np.float64)
+        if points.size == 0:
+            points = points.reshape(0, len(POINT_FIELDS))
+
+        if points.ndim != 2 or points.shape[1] != len(POINT_FIELDS):
+            raise ValueError(f"Expected points of shape (n, {len(POINT_FIELDS)}), got {points.shape}")
+
+        return points
+
+    @field_validator("points_arr", mode="after")
     @classmethod
-    def sort_points(cls, points: list[Point]) -> list[Point]:
+    def sort_points(cls, points: np.ndarray) -> np.ndarray:
         """
-        Sort points by Julian Date.
+        Sort points by Julian Date (stable, so equal dates keep their order).
         """
-        return sorted(points, key=lambda p: p.JD)
+        jds = points[:, JD_COL]
+        if np.any(jds[1:] < jds[:-1]):
+            points = points[np.argsort(jds, kind="stable")]
+
+        # Derived lightcurves share slices of this array, so it is never modified in place
+        points = points.view()
+        points.flags.writeable = False
+
+        return points
 
     @model_validator(mode="after")
     def check_points_count(self) -> Self:
         """
         Check that the number of points is equal to the points_count.
         """
-        if len(self.points) != self.points_count:
+        if len(self.points_arr) != self.points_count:
             raise ValueError("Number of points does not match points_count")
 
         return self
@@ -76,7 +113,7 @@ class Lightcurve(BaseModel):
         return self
 
     @staticmethod
-    def from_points(og_lightcurve: Lightcurve, points: list[Point]) -> Lightcurve:
+    def from_points(og_lightcurve: Lightcurve, points: list[Point] | np.ndarray) -> Lightcurve:
         return Lightcurve(
             id=og_lightcurve.id,
             scale=og_lightcurve.scale,
@@ -86,6 +123,26 @@ class Lightcurve(BaseModel):
             points_count=len(points),
         )
 
+    @staticmethod
+    def from_trusted_points(og_lightcurve: Lightcurve, points_arr: np.ndarray) -> Lightcurve:
+        """
+        Create a light curve derived from a validated one, skipping validation.
+
+        For library internals only: `points_arr` must be a non-empty (n, 8) float64 array
+        sorted by Julian Date (e.g. a slice or a sorted concatenation of validated points).
+        """
+        points_arr = points_arr.view()
+        points_arr.flags.writeable = False
+
+        return Lightcurve.model_construct(
+            id=og_lightcurve.id,
+            scale=og_lightcurve.scale,
+            points_arr=points_arr,
+            created_at=og_lightcurve.created_at,
+            updated_at=og_lightcurve.updated_at,
+            points_count=len(points_arr),
+        )
+
     def get_period(self, in_hours: bool = False) -> float:
         """
         Get the period of the light curve converted to hours if less than 1 day.
@@ -98,9 +155,20 @@ class Lightcurve(BaseModel):
         """
         Merge two light curves.
         """
-        sorted_points = sorted(self.points + other.points, key=lambda p: p.JD)
+        return Lightcurve.merge_many([self, other])
 
-        return Lightcurve.from_points(self, sorted_points)
+    @staticmethod
+    def merge_many(lightcurves: list[Lightcurve]) -> Lightcurve:
+        """
+        Merge light curves into one with the metadata of the first of them.
+
+        The points are sorted once (stable, so equal dates keep the order of the input
+        light curves), which gives the same result as merging them pairwise in order.
+        """
+        merged_points = np.concatenate([lc.points_arr for lc in lightcurves])
+        merged_points = merged_points[np.argsort(merged_points[:, JD_COL], kind="stable")]
+
+        return Lightcurve.from_trusted_points(lightcurves[0], merged_points)
 
     def plot(self, color: tuple | None = None, ax: Axes | None = None, asteroid_name: str = ""):
         """
@@ -133,28 +201,56 @@ class Lightcurve(BaseModel):
         """
         Get the start Julian Date of the light curve.
         """
-        return self.points[0].JD
+        return float(self.points_arr[0, JD_COL])
 
     @property
     def last_JD(self) -> float:
         """
         Get the end Julian Date of the light curve.
         """
-        return self.points[-1].JD
+        return float(self.points_arr[-1, JD_COL])
 
     @cached_property
-    def time_arr(self) -> list[float]:
+    def points(self) -> list[Point]:
+        """
+        Get the points of the light curve as Point objects (built lazily from `points_arr`).
+        """
+        return [Point.from_list(row) for row in self.points_arr.tolist()]
+
+    @property
+    def time_arr(self) -> np.ndarray:
+        """
+        Get the time of the light curve (a view of `points_arr`).
+        """
+        return self.points_arr[:, JD_COL]
+
+    @property
+    def brightness_arr(self) -> np.ndarray:
+        """
+        Get the brightness of the light curve (a view of `points_arr`).
+        """
+        return self.points_arr[:, BRIGHTNESS_COL]
+
+    @property
+    def sun_arr(self) -> np.ndarray:
+        """
+        Get the asteroid-centric (x, y, z) coordinates of the Sun (a view of `points_arr`).
+        """
+        return self.points_arr[:, SUN_COLS]
+
+    @property
+    def earth_arr(self) -> np.ndarray:
         """
-        Get the time of the light curve.
+        Get the asteroid-centric (x, y, z) coordinates of the Earth (a view of `points_arr`).
         """
-        return [point.JD for point in self.points]
+        return self.points_arr[:, EARTH_COLS]
 
     @cached_property
-    def brightness_arr(self) -> list[float]:
+    def geometry(self) -> ObservationGeometry:
         """
-        Get the brightness of the light curve.
+        Get the observation geometry (distances, phase angle, directions) of every point, computed once.
         """
-        return [point.brightness for point in self.points]
+        return ObservationGeometry.from_points(self.points_arr)
 
     @cached_property
     def period(self) -> float:
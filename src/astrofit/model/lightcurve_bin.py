@@ -3,6 +3,7 @@ from __future__ import annotations
 from functools import cached_property
 from typing import Iterator
 
+import numpy as np
 from pydantic import BaseModel
 
 from astrofit.model.lightcurve import Lightcurve
@@ -61,17 +62,15 @@ class LightcurveBin(BaseModel):
         return sum(len(lc) for lc in self.lightcurves)
 
     @cached_property
-    def times(self) -> list[float]:
-        times: list[float] = []
-        for lc in self.lightcurves:
-            times.extend(lc.time_arr)
+    def times(self) -> np.ndarray:
+        if not self.lightcurves:
+            return np.empty(0)
 
-        return times
+        return np.concatenate([lc.time_arr for lc in self.lightcurves])
 
     @cached_property
-    def brightnesses(self) -> list[float]:
-        brightnesses: list[float] = []
-        for lc in self.lightcurves:
-            brightnesses.extend(lc.brightness_arr)
+    def brightnesses(self) -> np.ndarray:
+        if not self.lightcurves:
+            return np.empty(0)
 
-        return brightnesses
+        return np.concatenate([lc.brightness_arr for lc in self.lightcurves])
@@ -0,0 +1,161 @@
+from __future__ import annotations
+
+import numpy as np
+from pydantic import BaseModel, field_validator
+from pydantic.config import ConfigDict
+
+from astrofit.model.point import EARTH_COLS, SUN_COLS
+
+GEOMETRY_FIELDS = (
+    "sun_distance",
+    "earth_distance",
+    "phase_angle",
+    "sun_theta",
+    "sun_phi",
+    "earth_theta",
+    "earth_phi",
+)
+
+# Column indices of the geometry array
+SUN_DISTANCE_COL = 0
+EARTH_DISTANCE_COL = 1
+PHASE_ANGLE_COL = 2
+SUN_SPHERICAL_COLS = slice(3, 5)
+EARTH_SPHERICAL_COLS = slice(5, 7)
+
+
+def cartesian_to_spherical(vectors: np.ndarray) -> np.ndarray:
+    """
+    Convert cartesian (x, y, z) vectors to spherical coordinates.
+
+    :param vectors: An array of shape (..., 3).
+
+    :return: An array of shape (..., 3) with the (r, theta, phi) coordinates,
+        theta = arccos(z / r) in [0, pi] and phi = arctan2(y, x) in (-pi, pi].
+    """
+    vectors = np.asarray(vectors, dtype=np.float64)
+    x, y, z = vectors[..., 0], vectors[..., 1], vectors[..., 2]
+
+    r = np.sqrt(x**2 + y**2 + z**2)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        theta = np.arccos(np.clip(z / r, -1.0, 1.0))
+
+    return np.stack([r, theta, np.arctan2(y, x)], axis=-1)
+
+
+class ObservationGeometry(BaseModel):
+    """
+    Observation geometry of every point of a light curve.
+
+    Stored column-wise in a single (n_points, 7) float64 array, with columns ordered
+    as in `GEOMETRY_FIELDS`: the heliocentric (r) and geocentric (delta) distances of
+    the asteroid, the phase angle (Sun-asteroid-Earth) and the spherical (theta, phi)
+    directions of the asteroid-centric Sun and Earth vectors. Angles are in radians.
+    """
+
+    model_config = ConfigDict(arbitrary_types_allowed=True)
+
+    geometry_arr: np.ndarray
+
+    def __len__(self) -> int:
+        return len(self.geometry_arr)
+
+    @field_validator("geometry_arr", mode="after")
+    @classmethod
+    def check_shape(cls, geometry: np.ndarray) -> np.ndarray:
+        """
+        Check the shape of the geometry array and make it read-only.
+        """
+        if geometry.ndim != 2 or geometry.shape[1] != len(GEOMETRY_FIELDS):
+            raise ValueError(f"Expected geometry of shape (n, {len(GEOMETRY_FIELDS)}), got {geometry.shape}")
+
+        geometry = geometry.view()
+        geometry.flags.writeable = False
+
+        return geometry
+
+    @staticmethod
+    def compute(points_arr: np.ndarray) -> np.ndarray:
+        """
+        Compute the geometry array of the given points.
+
+        :param points_arr: An (n, 8) array of points.
+
+        :return: An (n, 7) float64 array with columns ordered as in `GEOMETRY_FIELDS`.
+        """
+        sun = cartesian_to_spherical(points_arr[:, SUN_COLS])
+        earth = cartesian_to_spherical(points_arr[:, EARTH_COLS])
+
+        geometry = np.empty((len(points_arr), len(GEOMETRY_FIELDS)))
+        geometry[:, SUN_DISTANCE_COL] = sun[:, 0]
+        geometry[:, EARTH_DISTANCE_COL] = earth[:, 0]
+        geometry[:, SUN_SPHERICAL_COLS] = sun[:, 1:]
+        geometry[:, EARTH_SPHERICAL_COLS] = earth[:, 1:]
+
+        # Angle between the asteroid-centric Sun and Earth vectors
+        dot = np.einsum("ij,ij->i", points_arr[:, SUN_COLS], points_arr[:, EARTH_COLS])
+        with np.errstate(divide="ignore", invalid="ignore"):
+            cos_phase = dot / (sun[:, 0] * earth[:, 0])
+        geometry[:, PHASE_ANGLE_COL] = np.arccos(np.clip(cos_phase, -1.0, 1.0))
+
+        return geometry
+
+    @staticmethod
+    def from_points(points_arr: np.ndarray) -> ObservationGeometry:
+        """
+        Compute the observation geometry of the given points.
+
+        :param points_arr: An (n, 8) array of points.
+
+        :return: The observation geometry.
+        """
+        return ObservationGeometry(geometry_arr=ObservationGeometry.compute(points_arr))
+
+    @staticmethod
+    def from_array(geometry_arr: np.ndarray) -> ObservationGeometry:
+        """
+        Wrap an already computed geometry array (e.g. a slice of a persisted one), skipping validation.
+
+        :param geometry_arr: An (n, 7) array as returned by `compute`.
+
+        :return: The observation geometry.
+        """
+        geometry_arr = geometry_arr.view()
+        geometry_arr.flags.writeable = False
+
+        return ObservationGeometry.model_construct(geometry_arr=geometry_arr)
+
+    @property
+    def sun_distance(self) -> np.ndarray:
+        """
+        Get the heliocentric distance of the asteroid (a view of `geometry_arr`).
+        """
+        return self.geometry_arr[:, SUN_DISTANCE_COL]
+
+    @property
+    def earth_distance(self) -> np.ndarray:
+        """
+        Get the geocentric distance of the asteroid (a view of `geometry_arr`).
+        """
+        return self.geometry_arr[:, EARTH_DISTANCE_COL]
+
+    @property
+    def phase_angle(self) -> np.ndarray:
+        """
+        Get the phase angle in radians (a view of `geometry_arr`).
+        """
+        return self.geometry_arr[:, PHASE_ANGLE_COL]
+
+    @property
+    def sun_spherical(self) -> np.ndarray:
+        """
+        Get the (theta, phi) direction of the asteroid-centric Sun vector (a view of `geometry_arr`).
+        """
+        return self.geometry_arr[:, SUN_SPHERICAL_COLS]
+
+    @property
+    def earth_spherical(self) -> np.ndarray:
+        """
+        Get the (theta, phi) direction of the asteroid-centric Earth vector (a view of `geometry_arr`).
+        """
+        return self.geometry_arr[:, EARTH_SPHERICAL_COLS]
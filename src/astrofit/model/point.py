@@ -1,5 +1,8 @@
 from __future__ import annotations
 
+from io import StringIO
+
+import numpy as np
 from pydantic import BaseModel
 
 
@@ -25,3 +28,69 @@ class Point(BaseModel):
         :return: A Point object.
         """
         return Point(**dict(zip(Point.model_fields.keys(), data)))
+
+    @staticmethod
+    def to_array(points: list[Point]) -> np.ndarray:
+        """
+        Convert a list of Point objects into a 2-D array of shape (n_points, n_fields).
+
+        :param points: The list of points.
+
+        :return: A float64 array with columns ordered as in `Point.model_fields`.
+        """
+        fields = Point.model_fields.keys()
+        data = np.array([[getattr(point, field) for field in fields] for point in points], dtype=np.float64)
+
+        return data.reshape(-1, len(fields))
+
+    @staticmethod
+    def array_from_str(data: str) -> np.ndarray:
+        """
+        Parse a whitespace-separated block of points (one point per row) into a 2-D array in a single pass.
+
+        :param data: The points block, as stored in the DAMIT `points` field.
+
+        :return: A float64 array of shape (n_points, n_fields) with columns ordered as in `Point.model_fields`.
+
+        :raises ValueError: If any row does not consist of exactly n_fields numbers.
+        """
+        n_fields = len(Point.model_fields)
+        if not data.strip():
+            return np.empty((0, n_fields), dtype=np.float64)
+
+        try:
+            points = np.loadtxt(StringIO(data), dtype=np.float64, ndmin=2)
+        except ValueError:
+            points = None
+
+        if points is None or points.shape[1] != n_fields:
+            Point._raise_malformed_row(data, n_fields)
+
+        return points
+
+    @staticmethod
+    def _raise_malformed_row(data: str, n_fields: int) -> None:
+        for row_no, row in enumerate(data.split("\n"), start=1):
+            values = row.split()
+            if not values:
+                continue
+
+            if len(values) != n_fields:
+                raise ValueError(
+                    f"Malformed point at row {row_no}: expected {n_fields} values, got {len(values)} ({row!r})"
+                )
+
+            try:
+                [float(value) for value in values]
+            except ValueError:
+                raise ValueError(f"Malformed point at row {row_no}: non-numeric value ({row!r})") from None
+
+        raise ValueError("Malformed points data")
+
+
+# Column indices of the point arrays (same order as `Point.model_fields`)
+POINT_FIELDS = tuple(Point.model_fields.keys())
+JD_COL = POINT_FIELDS.index("JD")
+BRIGHTNESS_COL = POINT_FIELDS.index("brightness")
+SUN_COLS = slice(POINT_FIELDS.index("x_sun"), POINT_FIELDS.index("z_sun") + 1)
+EARTH_COLS = slice(POINT_FIELDS.index("x_earth"), POINT_FIELDS.index("z_earth") + 1)
@@ -1,14 +1,26 @@
 __all__ = [
     "AsteroidLoader",
+    "FeatureStore",
     "FrequencyDecomposer",
     "LightcurveBinner",
+    "LightcurveNormalizer",
     "LightcurvePlotter",
+    "LightcurveResampler",
     "LightcurveSplitter",
+    "ParameterSweep",
+    "PhaseFolder",
+    "PipelineCache",
 ]
 
 
 from astrofit.utils.asteroid_loader import AsteroidLoader
+from astrofit.utils.feature_store import FeatureStore
 from astrofit.utils.frequency_decomposer import FrequencyDecomposer
 from astrofit.utils.lightcurve_binner import LightcurveBinner
+from astrofit.utils.lightcurve_normalizer import LightcurveNormalizer
 from astrofit.utils.lightcurve_plotter import LightcurvePlotter
+from astrofit.utils.lightcurve_resampler import LightcurveResampler
 from astrofit.utils.lightcurve_splitter import LightcurveSplitter
+from astrofit.utils.parameter_sweep import ParameterSweep
+from astrofit.utils.phase_folder import PhaseFolder
+from astrofit.utils.pipeline_cache import PipelineCache
@@ -0,0 +1,205 @@
+import hashlib
+import json
+import os
+from datetime import datetime
+from pathlib import Path
+
+import numpy as np
+
+from astrofit.model import Asteroid, Lightcurve, ObservationGeometry
+
+CACHE_POINTS_FILE = "points.npy"
+CACHE_GEOMETRY_FILE = "geometry.npy"
+CACHE_META_FILE = "meta.json"
+
+
+class AsteroidCache:
+    """
+    On-disk cache of parsed asteroids.
+
+    Each asteroid is stored in its own directory as a single `points.npy` array
+    (the points of all its, already sorted and merged, lightcurves) and a small
+    `meta.json` with the asteroid and lightcurve metadata. Entries are invalidated
+    when any of the source files changes: the modification time and size are
+    checked first and the content hash only when they differ.
+
+    Optionally the observation geometry of all the points is persisted next to them
+    as `geometry.npy` and memory-mapped into the `geometry` of the loaded lightcurves.
+    """
+
+    def __init__(self, cache_dir: Path | str, cache_geometry: bool = False) -> None:
+        """
+        :param cache_dir: The directory of the cache.
+        :param cache_geometry: Whether to persist the observation geometry of the lightcurves.
+        """
+        self._cache_dir = Path(cache_dir)
+        self._cache_geometry = cache_geometry
+
+    def load(self, work_name: str, source_files: list[Path]) -> Asteroid | None:
+        """
+        Load a cached asteroid with its points memory-mapped.
+
+        :param work_name: The name of the asteroid directory.
+        :param source_files: The files the asteroid was parsed from.
+
+        :return: The asteroid, or None if it is not cached or the cache is stale.
+        """
+        entry_dir = self._cache_dir / work_name
+        meta_file = entry_dir / CACHE_META_FILE
+        points_file = entry_dir / CACHE_POINTS_FILE
+        if not meta_file.exists() or not points_file.exists():
+            return None
+
+        try:
+            return self._load_entry(entry_dir, source_files)
+        except (OSError, ValueError, KeyError, TypeError):
+            # An unreadable (e.g. truncated or hand-edited) entry is a miss, the next save overwrites it
+            return None
+
+    def _load_entry(self, entry_dir: Path, source_files: list[Path]) -> Asteroid | None:
+        with open(entry_dir / CACHE_META_FILE, "r") as f:
+            meta = json.load(f)
+
+        if not self._is_fresh(entry_dir, meta, source_files):
+            return None
+
+        points_arr = np.load(entry_dir / CACHE_POINTS_FILE, mmap_mode="r")
+        if points_arr.shape[0] != meta["points_count"]:
+            return None
+
+        geometry_arr = self._load_geometry(entry_dir, points_arr) if self._cache_geometry else None
+
+        # Point arrays were validated (sorted, counted) before being cached
+        lightcurves = []
+        offset = 0
+        for lc_meta in meta["lightcurves"]:
+            points_count = lc_meta["points_count"]
+            lightcurve = Lightcurve.model_construct(
+                id=lc_meta["id"],
+                scale=lc_meta["scale"],
+                points_arr=points_arr[offset : offset + points_count],
+                created_at=datetime.fromisoformat(lc_meta["created"]),
+                updated_at=datetime.fromisoformat(lc_meta["modified"]),
+                points_count=points_count,
+            )
+            if geometry_arr is not None:
+                # Pre-populate the cached property
+                lightcurve.__dict__["geometry"] = ObservationGeometry.from_array(
+                    geometry_arr[offset : offset + points_count]
+                )
+
+            lightcurves.append(lightcurve)
+            offset += points_count
+
+        asteroid = meta["asteroid"]
+
+        return Asteroid.model_construct(
+            id=asteroid["id"],
+            name=asteroid["name"],
+            period=asteroid["period"],
+            lambd=asteroid["lambd"],
+            beta=asteroid["beta"],
+            lightcurves=lightcurves,
+        )
+
+    def save(self, work_name: str, asteroid: Asteroid, source_files: list[Path]) -> None:
+        """
+        Save an asteroid to the cache.
+
+        :param work_name: The name of the asteroid directory.
+        :param asteroid: The asteroid to cache.
+        :param source_files: The files the asteroid was parsed from.
+        """
+        entry_dir = self._cache_dir / work_name
+        entry_dir.mkdir(parents=True, exist_ok=True)
+
+        points_arr = np.concatenate([lc.points_arr for lc in asteroid.lightcurves])
+        meta = {
+            "asteroid": {
+                "id": asteroid.id,
+                "name": asteroid.name,
+                "period": asteroid.period,
+                "lambd": asteroid.lambd,
+                "beta": asteroid.beta,
+            },
+            "points_count": len(points_arr),
+            "lightcurves": [
+                {
+                    "id": lc.id,
+                    "scale": lc.scale,
+                    "created": lc.created_at.isoformat(),
+                    "modified": lc.updated_at.isoformat(),
+                    "points_count": lc.points_count,
+                }
+                for lc in asteroid.lightcurves
+            ],
+            "sources": {path.name: self._get_file_signature(path) for path in source_files},
+        }
+
+        # The metadata is written last, so a partially written entry is never considered fresh
+        self._write_array(entry_dir, CACHE_POINTS_FILE, points_arr)
+        if self._cache_geometry:
+            self._write_array(entry_dir, CACHE_GEOMETRY_FILE, ObservationGeometry.compute(points_arr))
+        else:
+            # A geometry file left from an earlier save would not match the new points
+            (entry_dir / CACHE_GEOMETRY_FILE).unlink(missing_ok=True)
+
+        self._write_meta(entry_dir, meta)
+
+    def _load_geometry(self, entry_dir: Path, points_arr: np.ndarray) -> np.ndarray:
+        geometry_file = entry_dir / CACHE_GEOMETRY_FILE
+        if geometry_file.exists():
+            geometry_arr = np.load(geometry_file, mmap_mode="r")
+            if geometry_arr.shape[0] == points_arr.shape[0]:
+                return geometry_arr
+
+        # Cached before the geometry was persisted, compute it for all the points at once
+        geometry_arr = ObservationGeometry.compute(points_arr)
+        self._write_array(entry_dir, CACHE_GEOMETRY_FILE, geometry_arr)
+
+        return geometry_arr
+
+    def _write_array(self, entry_dir: Path, file_name: str, arr: np.ndarray) -> None:
+        tmp_file = entry_dir / f"{file_name}.{os.getpid()}.tmp"
+        with open(tmp_file, "wb") as f:
+            np.save(f, arr)
+        os.replace(tmp_file, entry_dir / file_name)
+
+    def _is_fresh(self, entry_dir: Path, meta: dict, source_files: list[Path]) -> bool:
+        sources = meta["sources"]
+        if set(sources) != {path.name for path in source_files}:
+            return False
+
+        touched = False
+        for path in source_files:
+            cached = sources[path.name]
+            stat = path.stat()
+            if stat.st_mtime_ns == cached["mtime_ns"] and stat.st_size == cached["size"]:
+                continue
+
+            # Touched but possibly unchanged (e.g. re-checked out), compare the content
+            if stat.st_size != cached["size"] or self._get_file_hash(path) != cached["sha256"]:
+                return False
+
+            cached["mtime_ns"] = stat.st_mtime_ns
+            touched = True
+
+        if touched:
+            self._write_meta(entry_dir, meta)
+
+        return True
+
+    def _write_meta(self, entry_dir: Path, meta: dict) -> None:
+        tmp_meta_file = entry_dir / f"{CACHE_META_FILE}.{os.getpid()}.tmp"
+        with open(tmp_meta_file, "w") as f:
+            json.dump(meta, f)
+        os.replace(tmp_meta_file, entry_dir / CACHE_META_FILE)
+
+    def _get_file_signature(self, path: Path) -> dict:
+        stat = path.stat()
+
+        return {"mtime_ns": stat.st_mtime_ns, "size": stat.st_size, "sha256": self._get_file_hash(path)}
+
+    def _get_file_hash(self, path: Path) -> str:
+        with open(path, "rb") as f:
+            return hashlib.file_digest(f, "sha256").hexdigest()
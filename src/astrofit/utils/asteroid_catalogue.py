@@ -0,0 +1,234 @@
+import gzip
+import json
+import os
+from functools import cached_property
+from pathlib import Path
+from typing import IO
+
+import pandas as pd
+
+from astrofit.model import Point
+from astrofit.model.point import JD_COL
+
+ASTEROIDS_CSV = "asteroids.csv"
+SPIN_PARAMS_FILE = "spin_params.json"
+LC_FILE = "lc.json"
+LC_GZ_FILE = "lc.json.gz"
+MANIFEST_FILE = "asteroids_catalogue.json"
+MANIFEST_VERSION = 2
+
+
+def get_lc_file(asteroid_dir: Path) -> Path | None:
+    """
+    Get the lightcurves file of an asteroid, the gzip-compressed one if both exist.
+
+    :return: The path, or None if there is no lightcurves file.
+    """
+    for name in (LC_GZ_FILE, LC_FILE):
+        if (asteroid_dir / name).exists():
+            return asteroid_dir / name
+
+    return None
+
+
+def open_lc_file(lc_file: Path) -> IO[str]:
+    """
+    Open a lightcurves file for reading as text, decompressing it if gzipped.
+    """
+    if lc_file.suffix == ".gz":
+        return gzip.open(lc_file, "rt")
+
+    return open(lc_file, "r")
+
+
+class AsteroidCatalogue:
+    """
+    Catalogue of the asteroids available in the data directory.
+
+    The name -> number index of `asteroids.csv` and the per-asteroid spin params,
+    lightcurve/point counts and JD ranges are kept in a manifest file
+    (`<data_dir>/asteroids_catalogue.json`). The index is rebuilt only when
+    `asteroids.csv` changes and an asteroid entry only when the modification time
+    of its directory (i.e. files are added, removed or replaced in it) or the
+    modification time or size of its spin params or lightcurves file changes
+    (i.e. they are edited in place), so an up-to-date catalogue is read with
+    `stat` calls only, without parsing any per-asteroid file.
+    """
+
+    def __init__(self, data_dir: Path | str) -> None:
+        self._data_dir = Path(data_dir)
+        self._asteroids_dir = self._data_dir / "asteroids"
+        self._asteroids_csv = self._data_dir / ASTEROIDS_CSV
+        self._manifest_file = self._data_dir / MANIFEST_FILE
+
+        self._available_asteroids = self._load()
+
+    @property
+    def available_asteroids(self) -> dict[str, dict]:
+        return self._available_asteroids
+
+    @cached_property
+    def asteroids_df(self) -> pd.DataFrame:
+        if not self._asteroids_csv.exists():
+            raise FileNotFoundError(f"Could not find `{ASTEROIDS_CSV}` in {self._data_dir}!")
+
+        asteroids_df = pd.read_csv(self._asteroids_csv, index_col=0)
+        asteroids_df.dropna(subset=["number"], inplace=True)
+        asteroids_df["number"] = asteroids_df["number"].astype(int)
+
+        return asteroids_df
+
+    def rebuild(self) -> dict[str, dict]:
+        """
+        Rebuild the whole catalogue from `asteroids.csv` and the asteroid directories.
+
+        :return: The available asteroids.
+        """
+        self.__dict__.pop("asteroids_df", None)
+        self._available_asteroids = self._load(rebuild=True)
+
+        return self._available_asteroids
+
+    def _load(self, rebuild: bool = False) -> dict[str, dict]:
+        if not self._asteroids_csv.exists():
+            raise FileNotFoundError(f"Could not find `{ASTEROIDS_CSV}` in {self._data_dir}!")
+
+        manifest = {} if rebuild else self._read_manifest()
+        changed = False
+
+        csv_stat = self._asteroids_csv.stat()
+        csv_signature = {"mtime_ns": csv_stat.st_mtime_ns, "size": csv_stat.st_size}
+        if manifest.get("csv") == csv_signature:
+            name_index = manifest["index"]
+        else:
+            name_index = self._build_name_index()
+            changed = True
+
+        cached_entries = manifest.get("asteroids", {})
+        entries = {}
+        with os.scandir(self._asteroids_dir) as it:
+            for dir_entry in it:
+                if not dir_entry.is_dir():
+                    continue
+
+                work_name = dir_entry.name
+                directory = Path(dir_entry.path)
+                signature = {"mtime_ns": dir_entry.stat().st_mtime_ns, "files": self._get_files_signature(directory)}
+                cached_entry = cached_entries.get(work_name)
+                if cached_entry is not None and all(cached_entry.get(key) == signature[key] for key in signature):
+                    entries[work_name] = cached_entry
+                else:
+                    entries[work_name] = {**signature, **self._scan_asteroid_dir(directory)}
+                    changed = True
+
+        changed = changed or entries.keys() != cached_entries.keys()
+        if changed:
+            self._write_manifest(
+                {"version": MANIFEST_VERSION, "csv": csv_signature, "index": name_index, "asteroids": entries}
+            )
+
+        available_asteroids = {}
+        for work_name in sorted(entries):
+            asteroid_name = work_name.split("_")[0]
+
+            numbers = name_index.get(asteroid_name, [])
+            if len(numbers) != 1:
+                raise ValueError(f"Found multiple asteroids with name {asteroid_name} (work name: {work_name})")
+
+            entry = entries[work_name]
+            available_asteroids[work_name] = {
+                "id": numbers[0],
+                "name": asteroid_name,
+                "period": entry["period"],
+                "lambda": entry["lambda"],
+                "beta": entry["beta"],
+                "lightcurves_count": entry["lightcurves_count"],
+                "points_count": entry["points_count"],
+                "first_JD": entry["first_JD"],
+                "last_JD": entry["last_JD"],
+            }
+
+        return available_asteroids
+
+    def _build_name_index(self) -> dict[str, list[int]]:
+        self.__dict__.pop("asteroids_df", None)
+        numbers = self.asteroids_df.groupby("name")["number"].apply(list)
+
+        return {name: [int(number) for number in name_numbers] for name, name_numbers in numbers.items()}
+
+    def _get_files_signature(self, directory: Path) -> dict[str, list[int]]:
+        signature = {}
+        for path in (directory / SPIN_PARAMS_FILE, get_lc_file(directory)):
+            if path is not None and path.exists():
+                stat = path.stat()
+                signature[path.name] = [stat.st_mtime_ns, stat.st_size]
+
+        return signature
+
+    def _scan_asteroid_dir(self, directory: Path) -> dict:
+        # Unreadable files leave their values empty, the errors are raised when the asteroid is loaded
+        entry = {
+            "period": None,
+            "lambda": None,
+            "beta": None,
+            "lightcurves_count": None,
+            "points_count": None,
+            "first_JD": None,
+            "last_JD": None,
+        }
+
+        try:
+            with open(directory / SPIN_PARAMS_FILE, "r") as f:
+                spin_params = json.load(f)
+
+            period, lambd, beta = spin_params["period"], spin_params["lambda"], spin_params["beta"]
+            entry.update({"period": period, "lambda": lambd, "beta": beta})
+        except (OSError, ValueError, KeyError, TypeError):
+            pass
+
+        lc_file = get_lc_file(directory)
+        if lc_file is None:
+            return entry
+
+        try:
+            with open_lc_file(lc_file) as f:
+                lightcurves = json.load(f)
+
+            jds = [Point.array_from_str(lc["points"])[:, JD_COL] for lc in lightcurves]
+        except (OSError, EOFError, ValueError, KeyError, TypeError):
+            return entry
+
+        jds = [lc_jds for lc_jds in jds if len(lc_jds)]
+
+        entry["lightcurves_count"] = len(lightcurves)
+        entry["points_count"] = sum(len(lc_jds) for lc_jds in jds)
+        if jds:
+            entry["first_JD"] = min(float(lc_jds.min()) for lc_jds in jds)
+            entry["last_JD"] = max(float(lc_jds.max()) for lc_jds in jds)
+
+        return entry
+
+    def _read_manifest(self) -> dict:
+        if not self._manifest_file.exists():
+            return {}
+
+        try:
+            with open(self._manifest_file, "r") as f:
+                manifest = json.load(f)
+        except (OSError, json.JSONDecodeError):
+            return {}
+
+        if manifest.get("version") != MANIFEST_VERSION:
+            return {}
+
+        return manifest
+
+    def _write_manifest(self, manifest: dict) -> None:
+        # Best-effort, e.g. a read-only data directory is scanned again the next time instead
+        tmp_manifest_file = self._manifest_file.with_name(f"{MANIFEST_FILE}.{os.getpid()}.tmp")
+        try:
+            with open(tmp_manifest_file, "w") as f:
+                json.dump(manifest, f)
+            os.replace(tmp_manifest_file, self._manifest_file)
+        except OSError:
+            tmp_manifest_file.unlink(missing_ok=True)
@@ -1,21 +1,34 @@
 import json
+from collections import deque
+from concurrent.futures import Executor, Future, ProcessPoolExecutor, ThreadPoolExecutor, as_completed
 from pathlib import Path
+from typing import Callable, Iterator
 
 import pandas as pd
 
-from astrofit.model import Asteroid
+from astrofit.model import Asteroid, Point
+from astrofit.utils.asteroid_cache import AsteroidCache
+from astrofit.utils.asteroid_catalogue import SPIN_PARAMS_FILE, AsteroidCatalogue, get_lc_file, open_lc_file
+from astrofit.utils.enums import ExecutorEnum
 
-SPIN_PARAMS_FILE = "spin_params.json"
-LC_FILE = "lc.json"
+CACHE_DIR = "asteroids_cache"
 
 
 class AsteroidLoader:
-    def __init__(self, data_dir: Path | str) -> None:
+    def __init__(self, data_dir: Path | str, use_cache: bool = False, cache_geometry: bool = False) -> None:
+        """
+        :param data_dir: The data directory containing `asteroids.csv` and the `asteroids` directory.
+        :param use_cache: Whether to keep parsed asteroids in a binary cache (`<data_dir>/asteroids_cache`)
+            that is memory-mapped on subsequent loads.
+        :param cache_geometry: Whether the cache also persists the observation geometry of the lightcurves.
+        """
         self._data_dir = Path(data_dir)
         self._asteroids_dir = self._data_dir / "asteroids"
+        self._cache = AsteroidCache(self._data_dir / CACHE_DIR, cache_geometry) if use_cache else None
 
-        self._asteroids_df = self._load_asteroids_df()
-        self._available_asteroids = self._get_available_asteroids()
+        self._catalogue = AsteroidCatalogue(self._data_dir)
+        self._available_asteroids = self._catalogue.available_asteroids
+        self._load_errors: dict[str, Exception] = {}
 
     def get_asteroid_info(self, asteroid_name: str) -> dict:
         if asteroid_name not in self._available_asteroids:
@@ -24,84 +37,230 @@ class AsteroidLoader:
         return self._available_asteroids[asteroid_name]
 
     def load_asteroid(self, asteroid_name: str) -> Asteroid:
-        asteroid_info = self.get_asteroid_info(asteroid_name)
+        source_files = self._get_source_files(asteroid_name)
+        if self._cache is not None and (asteroid := self._cache.load(asteroid_name, source_files)) is not None:
+            return asteroid
+
+        asteroid_data, spin_params = _read_asteroid_files(*source_files)
+
+        return self._build_asteroid(asteroid_name, asteroid_data, spin_params, source_files)
+
+    def load_asteroids(
+        self,
+        workers: int | None = None,
+        executor: ExecutorEnum | str = ExecutorEnum.PROCESS,
+        progress_callback: Callable[[str, int, int], None] | None = None,
+        skip_errors: bool = True,
+    ) -> dict[str, Asteroid]:
+        """
+        Load all available asteroids.
+
+        :param workers: The number of workers reading and parsing the asteroid files. If None, load serially.
+        :param executor: The kind of pool the workers run in (`"process"` or `"thread"`).
+        :param progress_callback: Called with (asteroid name, number of loaded asteroids, total) after each asteroid.
+        :param skip_errors: If True (the default), asteroids that fail to load are skipped and their errors
+            are available in `load_errors`, otherwise the first error is raised.
+
+        :return: The loaded asteroids, in the order of `available_asteroids`.
+        """
+        self._load_errors = {}
+
+        names = list(self._available_asteroids)
+        if workers is None:
+            loaded = self._load_serially(names, progress_callback, skip_errors)
+        else:
+            loaded = self._load_in_parallel(names, workers, ExecutorEnum(executor), progress_callback, skip_errors)
+
+        return {name: loaded[name] for name in names if name in loaded}
+
+    def iter_asteroids(
+        self,
+        predicate: Callable[[dict], bool] | None = None,
+        prefetch: int = 0,
+    ) -> Iterator[tuple[str, Asteroid]]:
+        """
+        Iterate over the available asteroids, loading them one at a time.
+
+        :param predicate: Called with the asteroid info from `available_asteroids` (id, name, period, lambda, beta),
+            asteroids for which it returns False are skipped without being read.
+        :param prefetch: The number of asteroids loaded ahead in background threads (0 loads them on demand).
+
+        :return: An iterator of (asteroid name, asteroid) pairs, in the order of `available_asteroids`.
+        """
+        names = [name for name, info in self._available_asteroids.items() if predicate is None or predicate(info)]
+        if prefetch <= 0:
+            for name in names:
+                yield name, self.load_asteroid(name)
+
+            return
+
+        pool = ThreadPoolExecutor(max_workers=prefetch)
+        try:
+            names_iter = iter(names)
+            pending: deque[tuple[str, Future[Asteroid]]] = deque()
+            for name in names_iter:
+                pending.append((name, pool.submit(self.load_asteroid, name)))
+                if len(pending) == prefetch:
+                    break
+
+            while pending:
+                name, future = pending.popleft()
+                if (next_name := next(names_iter, None)) is not None:
+                    pending.append((next_name, pool.submit(self.load_asteroid, next_name)))
+
+                yield name, future.result()
+        finally:
+            pool.shutdown(cancel_futures=True)
+
+    @property
+    def load_errors(self) -> dict[str, Exception]:
+        """
+        Errors of the asteroids skipped by the last `load_asteroids` call.
+        """
+        return self._load_errors
+
+    @property
+    def available_asteroids(self) -> dict[str, dict]:
+        return self._available_asteroids
+
+    @property
+    def asteroids_df(self) -> pd.DataFrame:
+        return self._catalogue.asteroids_df
+
+    def refresh_catalogue(self) -> None:
+        """
+        Rebuild the whole catalogue of available asteroids, e.g. after editing asteroid files
+        while this loader is in use (new loaders pick up changed files by themselves).
+        """
+        self._available_asteroids = self._catalogue.rebuild()
+
+    def _load_serially(
+        self,
+        names: list[str],
+        progress_callback: Callable[[str, int, int], None] | None,
+        skip_errors: bool,
+    ) -> dict[str, Asteroid]:
+        loaded = {}
+        for ind, name in enumerate(names, start=1):
+            try:
+                loaded[name] = self.load_asteroid(name)
+            except Exception as e:
+                if not skip_errors:
+                    raise e
+
+                self._load_errors[name] = e
+
+            if progress_callback is not None:
+                progress_callback(name, ind, len(names))
+
+        return loaded
+
+    def _load_in_parallel(
+        self,
+        names: list[str],
+        workers: int,
+        executor: ExecutorEnum,
+        progress_callback: Callable[[str, int, int], None] | None,
+        skip_errors: bool,
+    ) -> dict[str, Asteroid]:
+        loaded = {}
+        to_read = {}
+        completed = 0
+        for name in names:
+            try:
+                source_files = self._get_source_files(name)
+                if self._cache is None or (asteroid := self._cache.load(name, source_files)) is None:
+                    to_read[name] = source_files
+                    continue
+
+                loaded[name] = asteroid
+            except Exception as e:
+                if not skip_errors:
+                    raise e
+
+                self._load_errors[name] = e
+
+            # Cache hits and missing files are done without the workers
+            completed += 1
+            if progress_callback is not None:
+                progress_callback(name, completed, len(names))
+
+        pool = self._get_executor(executor, workers)
+        try:
+            # Workers only decode the JSON and parse the points into arrays, which are cheap to send back
+            futures = {pool.submit(_read_asteroid_files, *source_files): name for name, source_files in to_read.items()}
+            for future in as_completed(futures):
+                name = futures[future]
+                try:
+                    loaded[name] = self._build_asteroid(name, *future.result(), to_read[name])
+                except Exception as e:
+                    if not skip_errors:
+                        raise e
+
+                    self._load_errors[name] = e
+
+                completed += 1
+                if progress_callback is not None:
+                    progress_callback(name, completed, len(names))
+        finally:
+            pool.shutdown(cancel_futures=True)
+
+        return loaded
+
+    def _get_executor(self, executor: ExecutorEnum, workers: int) -> Executor:
+        if executor == ExecutorEnum.PROCESS:
+            return ProcessPoolExecutor(max_workers=workers)
+        elif executor == ExecutorEnum.THREAD:
+            return ThreadPoolExecutor(max_workers=workers)
+        else:
+            options = ["ExecutorEnum." + option.name for option in ExecutorEnum]
+            raise ValueError(f"Invalid executor: {executor}, use: {options}")
+
+    def _get_source_files(self, asteroid_name: str) -> list[Path]:
+        self.get_asteroid_info(asteroid_name)
 
         asteroid_dir = self._asteroids_dir / asteroid_name
 
-        asteroid_data_path = asteroid_dir / LC_FILE
-        if not asteroid_data_path.exists():
+        asteroid_data_path = get_lc_file(asteroid_dir)
+        if asteroid_data_path is None:
             raise FileNotFoundError(f"Missing light curve data for asteroid {asteroid_name}!")
 
-        asteroid_id, period = asteroid_info["id"], asteroid_info["period"]
-        with open(asteroid_data_path, "r") as f:
-            asteroid_data = json.load(f)
-
         spin_param_file = asteroid_dir / SPIN_PARAMS_FILE
         if not spin_param_file.exists():
             raise FileNotFoundError(f"Missing spin params data for asteroid {asteroid_name}!")
 
-        with open(spin_param_file, "r") as f:
-            spin_params = json.load(f)
+        return [asteroid_data_path, spin_param_file]
 
+    def _build_asteroid(
+        self, asteroid_name: str, asteroid_data: list[dict], spin_params: dict, source_files: list[Path]
+    ) -> Asteroid:
+        asteroid_id = self.get_asteroid_info(asteroid_name)["id"]
         period, lambd, beta = spin_params["period"], spin_params["lambda"], spin_params["beta"]
 
-        return Asteroid.from_lightcurves(
+        asteroid = Asteroid.from_lightcurves(
             id=asteroid_id, name=asteroid_name, period=period, lambd=lambd, beta=beta, data=asteroid_data
         )
 
-    def load_asteroids(self) -> dict[str, Asteroid]:
-        return {name: self.load_asteroid(name) for name in self._available_asteroids}
-
-    @property
-    def available_asteroids(self) -> dict[str, dict]:
-        return self._available_asteroids
-
-    @property
-    def asteroids_df(self) -> pd.DataFrame:
-        return self._asteroids_df
-
-    def _load_asteroids_df(self) -> pd.DataFrame:
-        asteroid_csv = self._data_dir / "asteroids.csv"
-        if not asteroid_csv.exists():
-            raise FileNotFoundError(f"Could not find `asteroids.csv` in {self._data_dir}!")
-
-        asteroids_df = pd.read_csv(asteroid_csv, index_col=0)
-        asteroids_df.dropna(subset=["number"], inplace=True)
-        asteroids_df["number"] = asteroids_df["number"].astype(int)
-
-        return asteroids_df
-
-    def _get_available_asteroids(self) -> dict[str, dict]:
-        available_asteroids = {}
-        for directory in self._asteroids_dir.iterdir():
-            if not directory.is_dir():
-                continue
-
-            asteroid_name = directory.name.split("_")[0]
-            work_name = directory.name
-
-            res = self._asteroids_df[self._asteroids_df["name"] == asteroid_name]
-            if len(res) != 1:
-                raise ValueError(f"Found multiple asteroids with name {asteroid_name} (work name: {work_name})")
+        if self._cache is not None:
+            self._cache.save(asteroid_name, asteroid, source_files)
 
-            (asteroid_num,) = res["number"]
+        return asteroid
 
-            if not (directory / SPIN_PARAMS_FILE).exists():
-                raise FileNotFoundError(f"Missing {SPIN_PARAMS_FILE} for {work_name}")
 
-            with open(directory / SPIN_PARAMS_FILE, "r") as f:
-                spin_params = json.load(f)
+def _read_asteroid_files(asteroid_data_path: Path, spin_param_file: Path) -> tuple[list[dict], dict]:
+    """
+    Read the light curve (plain or gzipped) and spin params files of an asteroid, parsing the points into arrays.
 
-            period, lambd, beta = spin_params["period"], spin_params["lambda"], spin_params["beta"]
+    Module-level so it can be sent to worker processes.
+    """
+    with open_lc_file(asteroid_data_path) as f:
+        asteroid_data = json.load(f)
 
-            available_asteroids[work_name] = {
-                "id": asteroid_num,
-                "name": asteroid_name,
-                "period": period,
-                "lambda": lambd,
-                "beta": beta,
-            }
+    for lc in asteroid_data:
+        if isinstance(lc.get("points"), str):
+            lc["points"] = Point.array_from_str(lc["points"])
 
-        available_asteroids = {k: available_asteroids[k] for k in sorted(available_asteroids)}
+    with open(spin_param_file, "r") as f:
+        spin_params = json.load(f)
 
-        return available_asteroids
+    return asteroid_data, spin_params
@@ -1,6 +1,16 @@
 __all__ = [
+    "BinSelectionEnum",
     "BinningMethodEnum",
+    "ExecutorEnum",
+    "FeatureFormatEnum",
+    "PeriodogramMethodEnum",
+    "PhaseStatisticEnum",
 ]
 
 
+from astrofit.utils.enums.bin_selection_enum import BinSelectionEnum
 from astrofit.utils.enums.binning_method_enum import BinningMethodEnum
+from astrofit.utils.enums.executor_enum import ExecutorEnum
+from astrofit.utils.enums.feature_format_enum import FeatureFormatEnum
+from astrofit.utils.enums.periodogram_method_enum import PeriodogramMethodEnum
+from astrofit.utils.enums.phase_statistic_enum import PhaseStatisticEnum
@@ -0,0 +1,6 @@
+from enum import Enum
+
+
+class BinSelectionEnum(Enum):
+    LIGHTCURVES = "lightcurves"
+    POINTS = "points"
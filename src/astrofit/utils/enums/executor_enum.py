@@ -0,0 +1,6 @@
+from enum import Enum
+
+
+class ExecutorEnum(Enum):
+    PROCESS = "process"
+    THREAD = "thread"
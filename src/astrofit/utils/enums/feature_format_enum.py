@@ -0,0 +1,6 @@
+from enum import Enum
+
+
+class FeatureFormatEnum(Enum):
+    JSON = "json"
+    NPY = "npy"
@@ -0,0 +1,7 @@
+from enum import Enum, auto
+
+
+class PeriodogramMethodEnum(Enum):
+    ASTROPY = auto()
+    BATCHED = auto()
+    PDM = auto()
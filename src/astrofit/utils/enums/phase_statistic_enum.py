@@ -0,0 +1,6 @@
+from enum import Enum, auto
+
+
+class PhaseStatisticEnum(Enum):
+    MEAN = auto()
+    MEDIAN = auto()
@@ -0,0 +1,222 @@
+import json
+import os
+import re
+import uuid
+from pathlib import Path
+
+import numpy as np
+from pydantic import BaseModel, ConfigDict
+
+STORE_DIR = "config_{config_no}"
+STORE_FEATURES_FILE = "features_{token}.npy"
+STORE_MANIFEST_FILE = "manifest.json"
+STORE_VERSION = 1
+
+
+class AsteroidFeatures(BaseModel):
+    model_config = ConfigDict(arbitrary_types_allowed=True)
+
+    is_failed: bool
+    reason: str | None
+    period: float
+    processing_time: float
+    # Hash of the asteroid data and the configuration the features were computed from
+    input_hash: str | None = None
+    # Shape (n_bins, n_frequencies, n_columns), empty for failed asteroids
+    features: np.ndarray
+
+
+class FeatureStore:
+    """
+    Binary store of frequency features, one bundle per configuration.
+
+    Each bundle is a directory `config_{config_no}` with a single `features_*.npy` array holding
+    the [frequency, power] rows of all bins of all asteroids, and a `manifest.json` with the
+    configuration, the name of the array file, and for every asteroid its failure reason, period,
+    processing time, input hash and the row range of its bins. Reads memory-map the array, so
+    the features of an asteroid are a view into the file.
+
+    Every write creates a new array file and then replaces the manifest, so readers always see
+    either the old or the new bundle (and keep their memory maps of the old file).
+    """
+
+    def __init__(self, store_dir: Path | str) -> None:
+        self._store_dir = Path(store_dir)
+
+    @property
+    def config_numbers(self) -> list[int]:
+        """
+        The numbers of the stored configurations.
+        """
+        if not self._store_dir.exists():
+            return []
+
+        numbers = []
+        for path in self._store_dir.iterdir():
+            match = re.fullmatch(STORE_DIR.format(config_no=r"(\d+)"), path.name)
+            if match is not None and (path / STORE_MANIFEST_FILE).exists():
+                numbers.append(int(match.group(1)))
+
+        return sorted(numbers)
+
+    def read_config(self, config_no: int) -> dict:
+        """
+        Get the configuration of a stored bundle.
+        """
+        return self._read_manifest(config_no)["config"]
+
+    def read(self, config_no: int, asteroid_names: list[str] | None = None) -> dict[str, AsteroidFeatures]:
+        """
+        Read the features of a configuration.
+
+        :param config_no: The number of the configuration.
+        :param asteroid_names: The asteroids to read, all if None.
+
+        :return: The features by asteroid name, in the stored order.
+        """
+        manifest = self._read_manifest(config_no)
+        features = np.load(self._get_bundle_dir(config_no) / manifest["features_file"], mmap_mode="r")
+
+        entries = manifest["asteroids"]
+        if asteroid_names is not None:
+            missing = [name for name in asteroid_names if name not in entries]
+            if missing:
+                raise ValueError(f"Asteroids {missing} not found in config {config_no}!")
+
+            entries = {name: entries[name] for name in asteroid_names}
+
+        return {name: self._get_asteroid_features(entry, features) for name, entry in entries.items()}
+
+    def write(self, config_no: int, data: dict) -> Path:
+        """
+        Write the features of a configuration, replacing the stored ones.
+
+        :param config_no: The number of the configuration.
+        :param data: The configuration's data in the shape of the features JSON files
+            (`{"config": ..., "asteroids": {name: {..., "features": [[[freq, power], ...], ...]}}}`).
+
+        :return: The bundle directory.
+        """
+        arrays = []
+        entries = {}
+        offset = 0
+        for name, asteroid_data in data["asteroids"].items():
+            features = np.asarray(asteroid_data["features"], dtype=np.float64)
+            if features.size and features.ndim != 3:
+                raise ValueError(f"Features of {name} must have the same number of rows in every bin")
+
+            n_bins = len(features)
+            rows = features.reshape(-1, features.shape[-1]) if n_bins else np.empty((0, 0))
+            if rows.size:
+                arrays.append(rows)
+
+            entries[name] = {
+                "is_failed": asteroid_data["is_failed"],
+                "reason": asteroid_data["reason"],
+                "period": asteroid_data["period"],
+                "processing_time": asteroid_data["processing_time"],
+                "input_hash": asteroid_data.get("input_hash"),
+                "start": offset,
+                "stop": offset + len(rows),
+                "bins": n_bins,
+            }
+            offset += len(rows)
+
+        n_columns = {rows.shape[1] for rows in arrays}
+        if len(n_columns) > 1:
+            raise ValueError(f"Features of all asteroids must have the same number of columns, got {sorted(n_columns)}")
+
+        features = np.concatenate(arrays) if arrays else np.empty((0, 2))
+        features_file = STORE_FEATURES_FILE.format(token=uuid.uuid4().hex)
+        manifest = {
+            "version": STORE_VERSION,
+            "config": data["config"],
+            "features_file": features_file,
+            "columns": features.shape[1],
+            "asteroids": entries,
+        }
+
+        bundle_dir = self._get_bundle_dir(config_no)
+        bundle_dir.mkdir(parents=True, exist_ok=True)
+        with open(bundle_dir / features_file, "wb") as f:
+            np.save(f, features)
+
+        # Replacing the manifest switches the bundle to the new array file
+        tmp_manifest_file = bundle_dir / f"{STORE_MANIFEST_FILE}.{os.getpid()}.tmp"
+        with open(tmp_manifest_file, "w") as f:
+            json.dump(manifest, f)
+        os.replace(tmp_manifest_file, bundle_dir / STORE_MANIFEST_FILE)
+
+        for path in bundle_dir.glob(STORE_FEATURES_FILE.format(token="*")):
+            if path.name != features_file:
+                path.unlink(missing_ok=True)
+
+        return bundle_dir
+
+    def patch(self, config_no: int, data: dict) -> Path:
+        """
+        Replace the features of some asteroids of a configuration, keeping the other stored asteroids.
+
+        :param config_no: The number of the configuration.
+        :param data: The configuration and the new data of the asteroids, in the shape accepted by `write`.
+
+        :return: The bundle directory.
+        """
+        if config_no not in self.config_numbers:
+            return self.write(config_no, data)
+
+        merged = {name: features.model_dump() for name, features in self.read(config_no).items()}
+        merged.update(data["asteroids"])
+
+        return self.write(config_no, {"config": data["config"], "asteroids": merged})
+
+    def import_json(self, json_file: Path | str, config_no: int | None = None) -> Path:
+        """
+        Convert a features JSON file (`asteroids_freq_data_{config_no}.json`) into a bundle.
+
+        :param json_file: The JSON file.
+        :param config_no: The number of the configuration, by default taken from the file name.
+
+        :return: The bundle directory.
+        """
+        json_file = Path(json_file)
+        if config_no is None:
+            match = re.search(r"(\d+)$", json_file.stem)
+            if match is None:
+                raise ValueError(f"Cannot get the config number from {json_file.name}, pass it explicitly")
+
+            config_no = int(match.group(1))
+
+        with open(json_file, "r") as f:
+            data = json.load(f)
+
+        return self.write(config_no, data)
+
+    def _get_bundle_dir(self, config_no: int) -> Path:
+        return self._store_dir / STORE_DIR.format(config_no=config_no)
+
+    def _read_manifest(self, config_no: int) -> dict:
+        manifest_file = self._get_bundle_dir(config_no) / STORE_MANIFEST_FILE
+        if not manifest_file.exists():
+            raise FileNotFoundError(f"Config {config_no} not found in {self._store_dir}")
+
+        with open(manifest_file, "r") as f:
+            manifest = json.load(f)
+
+        if manifest.get("version") != STORE_VERSION:
+            raise ValueError(f"Unsupported feature store version: {manifest.get('version')}")
+
+        return manifest
+
+    def _get_asteroid_features(self, entry: dict, features: np.ndarray) -> AsteroidFeatures:
+        rows = features[entry["start"] : entry["stop"]]
+        n_columns = features.shape[1]
+
+        return AsteroidFeatures(
+            is_failed=entry["is_failed"],
+            reason=entry["reason"],
+            period=entry["period"],
+            processing_time=entry["processing_time"],
+            input_hash=entry["input_hash"],
+            features=rows.reshape(entry["bins"], -1, n_columns) if entry["bins"] else rows.reshape(0, 0, n_columns),
+        )
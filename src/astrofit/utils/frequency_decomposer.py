@@ -1,11 +1,76 @@
+from concurrent.futures import ProcessPoolExecutor
+
 import matplotlib.pyplot as plt
 import numpy as np
 from astropy.timeseries import LombScargle
 
 from astrofit.model import LightcurveBin
+from astrofit.utils.batched_lomb_scargle import BatchedLombScargle
+from astrofit.utils.enums import PeriodogramMethodEnum
+from astrofit.utils.phase_dispersion import PhaseDispersionMinimization
+
+# Number of frequencies of the fine grid evaluated around each peak when refining
+REFINE_POINTS = 21
+
+# Number of the highest local maxima (per requested peak) first checked for the peak separation
+PEAK_CANDIDATES_FACTOR = 4
 
 
 class FrequencyDecomposer:
+    def __init__(
+        self,
+        method: PeriodogramMethodEnum = PeriodogramMethodEnum.ASTROPY,
+        peak_separation: float | None = None,
+        refine_peaks: bool = False,
+        samples_per_peak: float = 5,
+        coarse_samples_per_peak: float | None = None,
+        max_evaluations: int | None = None,
+        pdm_bins: int = 10,
+    ) -> None:
+        """
+        :param method: The periodogram implementation. `ASTROPY` evaluates each bin with astropy's
+            chi2 Lomb-Scargle, `BATCHED` with `BatchedLombScargle`, vectorized over the frequencies of a bin,
+            `PDM` scores frequencies with `1 - theta` of the Phase Dispersion Minimization
+            (`fourier_nterms` is then ignored).
+        :param peak_separation: If set, the top-k frequencies are local maxima of the periodogram at least
+            this far apart (in frequency units), instead of the k grid points with the highest power.
+        :param refine_peaks: Whether to refine each selected frequency on a fine grid spanning
+            one grid step around it.
+        :param samples_per_peak: The oversampling of the (full) frequency grid, as in astropy's `autofrequency`.
+        :param coarse_samples_per_peak: If set, search coarse-to-fine: the periodogram is first evaluated on
+            a grid with this oversampling, then on the full grid only around the top-k local maxima.
+        :param max_evaluations: With the coarse-to-fine search, the upper bound of the number of frequencies
+            evaluated per bin (at most half of it is spent on the coarse scan).
+        :param pdm_bins: The number of phase bins of the `PDM` method.
+        """
+        self._method = method
+        self._peak_separation = peak_separation
+        self._refine_peaks = refine_peaks
+        self._samples_per_peak = samples_per_peak
+        self._coarse_samples_per_peak = coarse_samples_per_peak
+        self._max_evaluations = max_evaluations
+        self._pdm_bins = pdm_bins
+
+    @property
+    def config(self) -> dict:
+        """
+        The settings that affect the decomposed frequencies (e.g. for hashing the inputs of saved features),
+        without the ones the chosen method or search ignores.
+        """
+        config = {
+            "method": self._method.name,
+            "peak_separation": self._peak_separation,
+            "refine_peaks": self._refine_peaks,
+            "samples_per_peak": self._samples_per_peak,
+            "coarse_samples_per_peak": self._coarse_samples_per_peak,
+        }
+        if self._coarse_samples_per_peak is not None:
+            config["max_evaluations"] = self._max_evaluations
+        if self._method == PeriodogramMethodEnum.PDM:
+            config["pdm_bins"] = self._pdm_bins
+
+        return config
+
     def decompose_bins(
         self,
         lightcurve_bins: list[LightcurveBin],
@@ -13,8 +78,15 @@ class FrequencyDecomposer:
         top_k: int,
         max_freq: float | None = None,
         show_plot: bool = False,
+        workers: int | None = None,
     ) -> list[np.ndarray]:
-        return self._decompose_bins(lightcurve_bins, fourier_nterms, top_k, max_freq, show_plot)
+        """
+        Get the top-k [frequency, power] pairs of each bin.
+
+        :param workers: The number of worker processes, if None the bins are decomposed serially.
+            Ignored when `show_plot` is set.
+        """
+        return self._decompose_bins(lightcurve_bins, fourier_nterms, top_k, max_freq, show_plot, workers)
 
     def decompose_bin(
         self,
@@ -24,7 +96,35 @@ class FrequencyDecomposer:
         max_freq: float | None = None,
         show_plot: bool = False,
     ) -> np.ndarray:
-        return self._decompose_bins([lightcurve_bin], fourier_nterms, top_k, max_freq, show_plot)[0]
+        return self._decompose_bins([lightcurve_bin], fourier_nterms, top_k, max_freq, show_plot, None)[0]
+
+    def decompose_asteroids(
+        self,
+        asteroids_bins: dict[str, list[LightcurveBin]],
+        fourier_nterms: int,
+        top_k: int,
+        max_freq: float | None = None,
+        workers: int | None = None,
+    ) -> dict[str, list[np.ndarray]]:
+        """
+        Get the top-k [frequency, power] pairs of the bins of many asteroids, spreading all
+        (asteroid, bin) periodograms over a single pool of worker processes.
+
+        :param asteroids_bins: The bins of each asteroid.
+        :param workers: The number of worker processes, if None the bins are decomposed serially.
+
+        :return: The top-k pairs of each bin, per asteroid, in the input order.
+        """
+        tasks = [lightcurve_bin for lightcurve_bins in asteroids_bins.values() for lightcurve_bin in lightcurve_bins]
+        results = self._run_tasks(tasks, fourier_nterms, top_k, max_freq, workers)
+
+        ret_data = {}
+        offset = 0
+        for asteroid_name, lightcurve_bins in asteroids_bins.items():
+            ret_data[asteroid_name] = results[offset : offset + len(lightcurve_bins)]
+            offset += len(lightcurve_bins)
+
+        return ret_data
 
     def _decompose_bins(
         self,
@@ -33,34 +133,239 @@ class FrequencyDecomposer:
         top_k: int,
         max_freq: float | None,
         show_plot: bool,
+        workers: int | None,
     ) -> list[np.ndarray]:
-        ret_data = []
-        for lightcurve_bin in lightcurve_bins:
-            ret_data.append(self._decompose_bin(lightcurve_bin, fourier_nterms, top_k, max_freq, show_plot))
+        if show_plot:
+            return [
+                self._decompose_bin(
+                    lightcurve_bin.times,
+                    lightcurve_bin.brightnesses,
+                    fourier_nterms,
+                    top_k,
+                    max_freq,
+                    plot_title=f"Lomb-Scargle periodogram for {lightcurve_bin}",
+                )
+                for lightcurve_bin in lightcurve_bins
+            ]
 
-        return ret_data
+        return self._run_tasks(lightcurve_bins, fourier_nterms, top_k, max_freq, workers)
+
+    def _run_tasks(
+        self,
+        tasks: list[LightcurveBin],
+        fourier_nterms: int,
+        top_k: int,
+        max_freq: float | None,
+        workers: int | None,
+    ) -> list[np.ndarray]:
+        if workers is None:
+            return [
+                self._decompose_bin(
+                    lightcurve_bin.times,
+                    lightcurve_bin.brightnesses,
+                    fourier_nterms,
+                    top_k,
+                    max_freq,
+                )
+                for lightcurve_bin in tasks
+            ]
+
+        # Largest bins are submitted first, so that no long periodogram is left running alone at the end
+        order = sorted(range(len(tasks)), key=lambda ind: tasks[ind].points_count, reverse=True)
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            futures = {}
+            for ind in order:
+                futures[ind] = pool.submit(
+                    self._decompose_bin,
+                    tasks[ind].times,
+                    tasks[ind].brightnesses,
+                    fourier_nterms,
+                    top_k,
+                    max_freq,
+                )
+
+            return [futures[ind].result() for ind in range(len(tasks))]
+
+    def _get_periodogram(
+        self,
+        times: np.ndarray,
+        brightnesses: np.ndarray,
+        fourier_nterms: int,
+        max_freq: float | None,
+        frequency: np.ndarray | None,
+    ) -> tuple[np.ndarray, np.ndarray]:
+        if self._method == PeriodogramMethodEnum.ASTROPY:
+            lomb_scargle = LombScargle(times, brightnesses, nterms=fourier_nterms)
+            if frequency is None:
+                return lomb_scargle.autopower(
+                    method="chi2", maximum_frequency=max_freq, samples_per_peak=self._samples_per_peak
+                )
+
+            return frequency, lomb_scargle.power(frequency, method="chi2")
+
+        elif self._method == PeriodogramMethodEnum.BATCHED:
+            engine = BatchedLombScargle(nterms=fourier_nterms, samples_per_peak=self._samples_per_peak)
+            if frequency is None:
+                frequency = engine.autofrequency(times, maximum_frequency=max_freq)
+
+            return frequency, engine.power([times], [brightnesses], frequency)[0]
+
+        elif self._method == PeriodogramMethodEnum.PDM:
+            if frequency is None:
+                frequency = BatchedLombScargle(samples_per_peak=self._samples_per_peak).autofrequency(
+                    times, maximum_frequency=max_freq
+                )
+
+            return frequency, PhaseDispersionMinimization(self._pdm_bins).power(times, brightnesses, frequency)
+
+        else:
+            options = ["PeriodogramMethodEnum." + option.name for option in PeriodogramMethodEnum]
+            raise ValueError(f"Invalid method: {self._method}, use: {options}")
 
     def _decompose_bin(
         self,
-        lightcurve_bin: LightcurveBin,
+        times: np.ndarray,
+        brightnesses: np.ndarray,
         fourier_nterms: int,
         top_k: int,
         max_freq: float | None,
-        show_plot: bool,
+        plot_title: str | None = None,
     ) -> np.ndarray:
-        frequency, power = LombScargle(
-            lightcurve_bin.times,
-            lightcurve_bin.brightnesses,
-            nterms=fourier_nterms,
-        ).autopower(method="chi2", maximum_frequency=max_freq)
+        if self._coarse_samples_per_peak is None:
+            frequency, power = self._get_periodogram(times, brightnesses, fourier_nterms, max_freq, None)
+        else:
+            frequency, power = self._get_coarse_to_fine_periodogram(
+                times, brightnesses, fourier_nterms, top_k, max_freq
+            )
 
-        if show_plot:
+        if plot_title is not None:
             plt.plot(frequency, power)
             plt.xlabel("Frequency")
             plt.ylabel("Power")
-            plt.title(f"Lomb-Scargle periodogram for {lightcurve_bin}")
+            plt.title(plot_title)
             plt.show()
 
-        idx = np.argsort(power)[::-1][:top_k]
+        if self._peak_separation is None:
+            idx = self._get_top_k_idx(power, top_k)
+        else:
+            idx = self._get_top_k_peaks_idx(frequency, power, top_k, self._peak_separation)
+
+        peak_frequency, peak_power = frequency[idx], power[idx]
+        if self._refine_peaks and len(frequency) > 1:
+            peak_frequency, peak_power = self._refine(
+                times, brightnesses, fourier_nterms, peak_frequency, np.min(np.diff(frequency))
+            )
+
+        return np.array([peak_frequency, peak_power]).T
+
+    def _get_coarse_to_fine_periodogram(
+        self,
+        times: np.ndarray,
+        brightnesses: np.ndarray,
+        fourier_nterms: int,
+        top_k: int,
+        max_freq: float | None,
+    ) -> tuple[np.ndarray, np.ndarray]:
+        engine = BatchedLombScargle(nterms=fourier_nterms, samples_per_peak=self._samples_per_peak)
+        frequency = engine.autofrequency(times, maximum_frequency=max_freq)
+
+        # The coarse grid is every `step`-th point of the full grid, so both scans share the same lattice
+        step = max(1, round(self._samples_per_peak / self._coarse_samples_per_peak))
+        if self._max_evaluations is not None:
+            step = max(step, -(-2 * len(frequency) // self._max_evaluations))
+
+        coarse_idx = np.arange(0, len(frequency), step)
+        _, coarse_power = self._get_periodogram(times, brightnesses, fourier_nterms, None, frequency[coarse_idx])
+        if step == 1:
+            return frequency, coarse_power
+
+        # Every candidate peak is re-evaluated on the full grid between its coarse neighbours
+        window = np.arange(-step + 1, step)
+        n_candidates = top_k
+        if self._max_evaluations is not None:
+            n_candidates = max(0, min(n_candidates, (self._max_evaluations - len(coarse_idx)) // len(window)))
+
+        candidates = coarse_idx[self._get_top_k_peaks_idx(frequency[coarse_idx], coarse_power, n_candidates, 0.0)]
+        fine_idx = np.unique((candidates[:, None] + window[None, :]).clip(0, len(frequency) - 1))
+        fine_idx = np.setdiff1d(fine_idx, coarse_idx, assume_unique=True)
+        _, fine_power = self._get_periodogram(times, brightnesses, fourier_nterms, None, frequency[fine_idx])
+
+        idx = np.concatenate([coarse_idx, fine_idx])
+        power = np.concatenate([coarse_power, fine_power])
+        order = np.argsort(idx)
+
+        return frequency[idx[order]], power[order]
+
+    def _get_top_k_idx(self, power: np.ndarray, top_k: int) -> np.ndarray:
+        # A slice of [-0:] would select everything
+        if top_k <= 0:
+            return np.empty(0, dtype=int)
+
+        if top_k < len(power):
+            idx = np.argpartition(power, -top_k)[-top_k:]
+        else:
+            idx = np.arange(len(power))
+
+        return idx[np.argsort(power[idx])[::-1]]
+
+    def _get_top_k_peaks_idx(
+        self,
+        frequency: np.ndarray,
+        power: np.ndarray,
+        top_k: int,
+        separation: float,
+    ) -> np.ndarray:
+        # Local maxima (the first point of a plateau), edges count when higher than their only neighbour
+        is_peak = np.ones(len(power), dtype=bool)
+        is_peak[1:] &= power[1:] > power[:-1]
+        is_peak[:-1] &= power[:-1] >= power[1:]
+
+        peaks = np.flatnonzero(is_peak)
+        if top_k <= 0:
+            return np.empty(0, dtype=int)
+
+        # Only the highest peaks are sorted and checked, the preselection grows until enough are separated
+        n_candidates = PEAK_CANDIDATES_FACTOR * top_k
+        while True:
+            if n_candidates < len(peaks):
+                candidates = np.sort(peaks[np.argpartition(power[peaks], -n_candidates)[-n_candidates:]])
+            else:
+                candidates = peaks
+            candidates = candidates[np.argsort(power[candidates])[::-1]]
+
+            selected: list[int] = []
+            for ind in candidates:
+                if len(selected) == top_k:
+                    break
+
+                if selected and np.min(np.abs(frequency[selected] - frequency[ind])) < separation:
+                    continue
+
+                selected.append(ind)
+
+            if len(selected) == top_k or len(candidates) == len(peaks):
+                return np.array(selected, dtype=int)
+
+            n_candidates *= 2
+
+    def _refine(
+        self,
+        times: np.ndarray,
+        brightnesses: np.ndarray,
+        fourier_nterms: int,
+        peak_frequency: np.ndarray,
+        step: float,
+    ) -> tuple[np.ndarray, np.ndarray]:
+        # All fine grids are evaluated in a single periodogram call
+        offsets = np.linspace(-step, step, REFINE_POINTS)
+        fine_frequency = (peak_frequency[:, None] + offsets[None, :]).clip(min=step / 2)
+        _, fine_power = self._get_periodogram(times, brightnesses, fourier_nterms, None, fine_frequency.ravel())
+        fine_power = fine_power.reshape(fine_frequency.shape)
+
+        best = np.argmax(fine_power, axis=1)
+        refined_frequency = fine_frequency[np.arange(len(best)), best]
+        refined_power = fine_power[np.arange(len(best)), best]
+
+        order = np.argsort(refined_power)[::-1]
 
-        return np.array([frequency[idx], power[idx]]).T
+        return refined_frequency[order], refined_power[order]
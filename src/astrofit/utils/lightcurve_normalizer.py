@@ -0,0 +1,61 @@
+import numpy as np
+
+from astrofit.model import Lightcurve
+from astrofit.model.point import BRIGHTNESS_COL, EARTH_COLS, SUN_COLS
+
+
+class LightcurveNormalizer:
+    """
+    Brightness normalization of light curves observed at different distances.
+
+    The intensities are reduced to unit heliocentric (r) and geocentric (delta) distances,
+    `I * (r * delta)**2`, with the distances taken from the asteroid-centric Sun and Earth
+    vectors of the points, and each light curve is then divided by its mean reduced intensity,
+    so light curves from different apparitions (and with different calibrations) are comparable.
+    All the given light curves are normalized at once, as a single array.
+    """
+
+    def __init__(self, correct_distance: bool = True, relative_scaling: bool = True) -> None:
+        """
+        :param correct_distance: Whether to reduce the intensities to unit distances.
+        :param relative_scaling: Whether to scale each light curve to a unit mean intensity.
+        """
+        self._correct_distance = correct_distance
+        self._relative_scaling = relative_scaling
+
+    @property
+    def config(self) -> tuple[bool, bool]:
+        """
+        The settings of the normalizer, e.g. for cache keys.
+        """
+        return (self._correct_distance, self._relative_scaling)
+
+    def normalize_lightcurves(self, lightcurves: list[Lightcurve]) -> list[Lightcurve]:
+        return self._normalize_lightcurves(lightcurves)
+
+    def normalize_lightcurve(self, lightcurve: Lightcurve) -> Lightcurve:
+        return self._normalize_lightcurves([lightcurve])[0]
+
+    def _normalize_lightcurves(self, lightcurves: list[Lightcurve]) -> list[Lightcurve]:
+        if not lightcurves:
+            return []
+
+        # The normalized light curves are views of a single new array, the input is never modified
+        points_arr = np.concatenate([lc.points_arr for lc in lightcurves])
+        brightness = points_arr[:, BRIGHTNESS_COL]
+
+        if self._correct_distance:
+            sun_distance_sq = np.einsum("ij,ij->i", points_arr[:, SUN_COLS], points_arr[:, SUN_COLS])
+            earth_distance_sq = np.einsum("ij,ij->i", points_arr[:, EARTH_COLS], points_arr[:, EARTH_COLS])
+            brightness *= sun_distance_sq * earth_distance_sq
+
+        counts = np.array([lc.points_count for lc in lightcurves])
+        bounds = np.concatenate([[0], np.cumsum(counts)])
+        if self._relative_scaling:
+            means = np.add.reduceat(brightness, bounds[:-1]) / counts
+            brightness /= np.repeat(means, counts)
+
+        return [
+            Lightcurve.from_trusted_points(lc, points_arr[start:stop])
+            for lc, start, stop in zip(lightcurves, bounds[:-1], bounds[1:])
+        ]
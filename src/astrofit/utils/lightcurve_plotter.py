@@ -1,10 +1,12 @@
 import math
 
+import numpy as np
 import seaborn as sns
 from matplotlib import pyplot as plt
 from matplotlib.axes import Axes
 
 from astrofit.model import Lightcurve, LightcurveBin
+from astrofit.utils.phase_folder import PhaseFolder
 
 plt.rcParams["figure.figsize"] = (12, 6)
 sns.set_theme()
@@ -14,6 +16,9 @@ MAX_COLS = 4
 
 
 class LightcurvePlotter:
+    def __init__(self) -> None:
+        self._phase_folder = PhaseFolder()
+
     def plot_lightcurve(self, lightcurve: Lightcurve):
         """
         Plot the light curve.
@@ -111,22 +116,24 @@ class LightcurvePlotter:
         period: float,
         known_period: float | None = None,
         asteroid_name: str = "",
+        phase_bins: int | None = None,
     ):
-        ref_JD = None
-        for lc in lightcurves:
-            if ref_JD is None:
-                ref_JD = lc.first_JD
-
-            phases = []
-            brightness = []
-            for point in lc.points:
+        """
+        Plot the light curves folded at the period (in hours).
 
-                phase = self._get_phase(point.JD, ref_JD, period)
+        :param phase_bins: If set, also plot the mean brightness in this many phase bins.
+        """
+        if not len(lightcurves):
+            raise ValueError("No light curves to plot!")
 
-                phases.append(phase)
-                brightness.append(point.brightness)
+        ref_JD = lightcurves[0].first_JD
+        for lc in lightcurves:
+            phases = self._phase_folder.fold(lc.time_arr, period, ref_JD)[0]
+            plt.scatter(phases, lc.brightness_arr, s=8, label=f"Lightcurve {lc.id}")
 
-            plt.scatter(phases, brightness, s=8, label=f"Lightcurve {lc.id}")
+        if phase_bins is not None:
+            (curve,) = self._phase_folder.phase_curves_lightcurves(lightcurves, period, phase_bins)
+            plt.plot((np.arange(phase_bins) + 0.5) / phase_bins, curve, color="black", label="Mean")
 
         diff_known = ""
         if known_period is not None:
@@ -141,9 +148,6 @@ class LightcurvePlotter:
         plt.ylabel("Brightness")
         plt.show()
 
-    def _get_phase(self, pivot_time: float, ref_time: float, period: float) -> float:
-        return (pivot_time - ref_time) * 24 % period / period
-
     def _get_grid_size(self, bins: list[LightcurveBin]) -> tuple[int, int]:
         n = len(bins)
         if n == 0:
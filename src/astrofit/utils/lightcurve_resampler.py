@@ -0,0 +1,132 @@
+import numpy as np
+
+from astrofit.model import Lightcurve, LightcurveBin
+from astrofit.model.point import BRIGHTNESS_COL, JD_COL
+
+# Default longest filled gap (between the centers of non-empty buckets), in buckets
+MAX_GAP_BUCKETS = 4
+
+
+class LightcurveResampler:
+    """
+    Resampling of lightcurves onto a uniform time grid.
+
+    Points are grouped into buckets of `resolution` days starting at the first point, and every
+    non-empty bucket is reduced to a single point at its center with the mean brightness (and, for
+    whole lightcurves, the mean Sun/Earth vectors). Optionally, short runs of empty buckets between
+    non-empty ones are filled by cubic spline interpolation of the brightness (requires scipy).
+    """
+
+    def __init__(self, resolution: float = 0.002, fill_gaps: bool = False, max_gap: float | None = None) -> None:
+        """
+        :param resolution: The width of a bucket in days.
+        :param fill_gaps: Whether to fill empty buckets by spline interpolation.
+        :param max_gap: With `fill_gaps`, only the gaps (between the centers of non-empty buckets) up to this
+            many days are filled, by default `MAX_GAP_BUCKETS` buckets. Use `math.inf` to fill all of them,
+            including the gaps between nights.
+        """
+        if resolution <= 0:
+            raise ValueError(f"Resolution must be positive, got {resolution}")
+
+        if max_gap is None:
+            max_gap = MAX_GAP_BUCKETS * resolution
+        elif max_gap <= 0:
+            raise ValueError(f"Max gap must be positive, got {max_gap}")
+
+        self._resolution = resolution
+        self._fill_gaps = fill_gaps
+        self._max_gap = max_gap
+
+    def resample(self, times: np.ndarray, brightnesses: np.ndarray) -> tuple[np.ndarray, np.ndarray]:
+        """
+        Resample a (sorted) time series.
+
+        :param times: The Julian Dates.
+        :param brightnesses: The brightnesses.
+
+        :return: The times (bucket centers) and brightnesses of the resampled series.
+        """
+        times = np.asarray(times, dtype=np.float64)
+        points = np.column_stack([times, np.asarray(brightnesses, dtype=np.float64)])
+        resampled = self._resample_points(points, time_col=0, brightness_col=1)
+
+        return resampled[:, 0], resampled[:, 1]
+
+    def resample_lightcurve(self, lightcurve: Lightcurve) -> Lightcurve:
+        """
+        Resample a lightcurve (all columns of its points are averaged per bucket).
+        """
+        return Lightcurve.from_trusted_points(
+            lightcurve, self._resample_points(lightcurve.points_arr, JD_COL, BRIGHTNESS_COL)
+        )
+
+    def resample_bin(self, lightcurve_bin: LightcurveBin) -> LightcurveBin:
+        """
+        Resample each lightcurve of a bin.
+        """
+        return LightcurveBin(lightcurves=[self.resample_lightcurve(lc) for lc in lightcurve_bin])
+
+    def resample_bins(self, lightcurve_bins: list[LightcurveBin]) -> list[LightcurveBin]:
+        """
+        Resample each lightcurve of each bin, e.g. to reduce the number of points before computing periodograms.
+        """
+        return [self.resample_bin(lightcurve_bin) for lightcurve_bin in lightcurve_bins]
+
+    def _resample_points(self, points: np.ndarray, time_col: int, brightness_col: int) -> np.ndarray:
+        times = points[:, time_col]
+        if len(times) == 0:
+            return points[:0].copy()
+
+        # Bucket edges cover all points, a bucket includes its left edge
+        n_buckets = int((times[-1] - times[0]) // self._resolution) + 1
+        edges = times[0] + self._resolution * np.arange(n_buckets + 1)
+        bucket_idx = np.clip(np.searchsorted(edges, times, side="right") - 1, 0, n_buckets - 1)
+
+        counts = np.bincount(bucket_idx, minlength=n_buckets)
+        non_empty = counts > 0
+
+        resampled = np.empty((int(non_empty.sum()), points.shape[1]))
+        for col in range(points.shape[1]):
+            sums = np.bincount(bucket_idx, weights=points[:, col], minlength=n_buckets)
+            resampled[:, col] = sums[non_empty] / counts[non_empty]
+
+        centers = edges[:-1] + self._resolution / 2
+        resampled[:, time_col] = centers[non_empty]
+
+        if self._fill_gaps and len(resampled) > 1:
+            resampled = self._fill_empty_buckets(resampled, centers[~non_empty], time_col, brightness_col)
+
+        return resampled
+
+    def _fill_empty_buckets(
+        self,
+        resampled: np.ndarray,
+        empty_centers: np.ndarray,
+        time_col: int,
+        brightness_col: int,
+    ) -> np.ndarray:
+        try:
+            from scipy.interpolate import CubicSpline
+        except ImportError as e:
+            raise ImportError("Filling gaps requires scipy, install it or use fill_gaps=False") from e
+
+        known_times = resampled[:, time_col]
+        right = np.searchsorted(known_times, empty_centers)
+        # Whole numbers of buckets, so rounding errors of the centers do not decide the comparison
+        gaps = np.rint((known_times[right] - known_times[right - 1]) / self._resolution) * self._resolution
+        empty_centers = empty_centers[gaps <= self._max_gap]
+
+        if len(empty_centers) == 0:
+            return resampled
+
+        # The brightness is interpolated with the spline, the other columns linearly
+        filled = np.empty((len(empty_centers), resampled.shape[1]))
+        for col in range(resampled.shape[1]):
+            filled[:, col] = np.interp(empty_centers, known_times, resampled[:, col])
+
+        filled[:, time_col] = empty_centers
+        filled[:, brightness_col] = CubicSpline(known_times, resampled[:, brightness_col])(empty_centers)
+
+        merged = np.concatenate([resampled, filled])
+
+        return merged[np.argsort(merged[:, time_col], kind="stable")]
@@ -1,6 +1,6 @@
 import numpy as np
 
-from astrofit.model import Lightcurve, Point
+from astrofit.model import Lightcurve
 
 
 class LightcurveSplitter:
@@ -30,53 +30,71 @@ class LightcurveSplitter:
         max_hours_diff: float,
         min_no_points: int | None = None,
     ) -> list[Lightcurve]:
-        splitted_lightcurves = []
+        times = lightcurve.time_arr
+        if len(times) == 0:
+            return []
+
+        # Segments are separated by gaps (in hours) larger than max_hours_diff
+        bounds = np.concatenate([[0], np.flatnonzero(24 * np.diff(times) > max_hours_diff) + 1, [len(times)]])
+        starts, ends = bounds[:-1], bounds[1:]
 
-        curr_points = []
-        for point in lightcurve.points:
-            if not curr_points:
-                curr_points.append(point)
+        # Outliers are filtered in all segments but the last one, which is only checked for its size
+        keep_mask = self._get_inliers_mask(lightcurve.brightness_arr[: starts[-1]], starts[:-1], ends[:-1])
+
+        splitted_lightcurves = []
+        for start, end in zip(starts[:-1], ends[:-1]):
+            if min_no_points is not None and end - start < min_no_points:
                 continue
 
-            # In hours
-            if 24 * (point.JD - curr_points[-1].JD) > max_hours_diff:
-                if (filtered_points := self._filter_points(curr_points, min_no_points)) is not None:
-                    splitted_lightcurves.append(Lightcurve.from_points(og_lightcurve=lightcurve, points=filtered_points))
+            segment_mask = keep_mask[start:end]
+            if segment_mask.all():
+                points = lightcurve.points_arr[start:end]
+            else:
+                points = lightcurve.points_arr[start:end][segment_mask]
 
-                curr_points = []
+            if min_no_points is not None and len(points) < min_no_points:
+                continue
 
-            curr_points.append(point)
+            splitted_lightcurves.append(Lightcurve.from_trusted_points(lightcurve, points))
 
-        if curr_points and (min_no_points is None or len(curr_points) >= min_no_points):
-            splitted_lightcurves.append(Lightcurve.from_points(og_lightcurve=lightcurve, points=curr_points))
+        if min_no_points is None or ends[-1] - starts[-1] >= min_no_points:
+            points = lightcurve.points_arr[starts[-1] : ends[-1]]
+            splitted_lightcurves.append(Lightcurve.from_trusted_points(lightcurve, points))
 
         return splitted_lightcurves
 
-    def _filter_points(self, points: list[Point], min_no_points: int | None) -> list[Point] | None:
-        if min_no_points is not None and len(points) < min_no_points:
-            return None
-
-        brightnesses = np.array([point.brightness for point in points])
+    def _get_inliers_mask(self, brightnesses: np.ndarray, starts: np.ndarray, ends: np.ndarray) -> np.ndarray:
+        """
+        Get the mask of points whose modified z-score (within their segment) is in [-3.5, 3.5].
+        """
+        if len(brightnesses) == 0:
+            return np.ones(0, dtype=bool)
 
-        median_brightness = np.median(brightnesses)
-        median_absolute_dev = np.median(np.abs(brightnesses - median_brightness))
+        sizes = ends - starts
+        segment_ids = np.repeat(np.arange(len(starts)), sizes)
 
-        if median_absolute_dev == 0:
-            # Use mean absolute deviation instead
-            mean_absolute_dev = np.mean(np.abs(brightnesses - median_brightness))
-            modified_z_score = 0.7979 * (brightnesses - median_brightness) / mean_absolute_dev
-        else:
-            modified_z_score = 0.6745 * (brightnesses - median_brightness) / median_absolute_dev
+        median_brightness = self._get_segment_medians(brightnesses, segment_ids, starts, sizes)[segment_ids]
+        abs_dev = np.abs(brightnesses - median_brightness)
+        median_absolute_dev = self._get_segment_medians(abs_dev, segment_ids, starts, sizes)
+        mean_absolute_dev = np.add.reduceat(abs_dev, starts) / sizes
 
-        filtered = []
-        for point, z_score in zip(points, modified_z_score):
-            if z_score < -3.5 or z_score > 3.5:
-                # Outlier
-                continue
+        # Use mean absolute deviation where the median absolute deviation is zero
+        use_mean = median_absolute_dev == 0
+        scale = np.where(use_mean, 0.7979, 0.6745)[segment_ids]
+        dev = np.where(use_mean, mean_absolute_dev, median_absolute_dev)[segment_ids]
 
-            filtered.append(point)
+        with np.errstate(divide="ignore", invalid="ignore"):
+            modified_z_score = scale * (brightnesses - median_brightness) / dev
 
-        if min_no_points is not None and len(filtered) < min_no_points:
-            return None
+        return ~((modified_z_score < -3.5) | (modified_z_score > 3.5))
 
-        return filtered
+    def _get_segment_medians(
+        self,
+        values: np.ndarray,
+        segment_ids: np.ndarray,
+        starts: np.ndarray,
+        sizes: np.ndarray,
+    ) -> np.ndarray:
+        sorted_values = values[np.lexsort((values, segment_ids))]
+
+        return (sorted_values[starts + (sizes - 1) // 2] + sorted_values[starts + sizes // 2]) / 2
@@ -0,0 +1,449 @@
+import hashlib
+import json
+import os
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from itertools import product
+from pathlib import Path
+from time import perf_counter
+from typing import Any, Callable
+
+import numpy as np
+from pydantic import BaseModel, ValidationError
+
+from astrofit.model import Asteroid, LightcurveBin
+from astrofit.utils.enums import BinSelectionEnum, FeatureFormatEnum
+from astrofit.utils.feature_store import FeatureStore
+from astrofit.utils.frequency_decomposer import FrequencyDecomposer
+from astrofit.utils.lightcurve_binner import LightcurveBinner
+from astrofit.utils.lightcurve_normalizer import LightcurveNormalizer
+from astrofit.utils.lightcurve_splitter import LightcurveSplitter
+from astrofit.utils.pipeline_cache import PipelineCache
+
+FEATURES_FILE = "asteroids_freq_data_{config_no}.json"
+# Version of the inputs identified by the input hashes, bumped when their meaning changes
+INPUT_HASH_VERSION = 1
+
+
+class SweepConfig(BaseModel):
+    max_hours_diff: float
+    min_no_points: int
+    top_k_bins: int
+    buffer_bins: int
+    select_bins_by: BinSelectionEnum
+    max_time_diff: float
+    min_bin_size: int
+    max_freq: float
+    top_k_freqs: int
+    nterms: int
+    normalize: bool = False
+    max_debug: bool = False
+
+    @property
+    def split_key(self) -> tuple:
+        return (self.max_hours_diff, self.min_no_points)
+
+    @property
+    def bin_key(self) -> tuple:
+        return self.split_key + (self.normalize, self.max_time_diff, self.min_bin_size)
+
+    @property
+    def decompose_key(self) -> tuple:
+        return (self.nterms, self.top_k_freqs, self.max_freq)
+
+
+class ParameterSweep:
+    """
+    Frequency features of many asteroids for a grid of configurations.
+
+    Per asteroid, the configurations form a DAG of split -> anomaly filter -> (normalize) -> bin -> select -> decompose
+    stages, and every unique node (e.g. a split shared by all configurations with the same
+    `max_hours_diff` and `min_no_points`, or a bin periodogram shared by configurations differing only
+    in the bin selection) is computed once. All nodes of an asteroid only depend on the asteroid,
+    so the asteroids are the unit of parallel work.
+    """
+
+    def __init__(
+        self,
+        decomposer: FrequencyDecomposer | None = None,
+        splitter: LightcurveSplitter | None = None,
+        binner: LightcurveBinner | None = None,
+        normalizer: LightcurveNormalizer | None = None,
+        anomaly_threshold: int = 2,
+    ) -> None:
+        """
+        :param decomposer: The frequency decomposer, a new one by default.
+        :param splitter: The lightcurve splitter, a new one by default.
+        :param binner: The lightcurve binner, a new one by default.
+        :param normalizer: The lightcurve normalizer of the configurations with `normalize`, a new one by default.
+        :param anomaly_threshold: An asteroid fails with "anomalous series" if the median brightness of
+            any split lightcurve differs from the median of all of them by this many orders of magnitude.
+        """
+        self._decomposer = decomposer or FrequencyDecomposer()
+        self._splitter = splitter or LightcurveSplitter()
+        self._binner = binner or LightcurveBinner()
+        self._normalizer = normalizer or LightcurveNormalizer()
+        self._anomaly_threshold = anomaly_threshold
+
+    @staticmethod
+    def build_configs(options: dict[str, list]) -> list[SweepConfig]:
+        """
+        Get all combinations of the given option values (in `itertools.product` order).
+
+        :param options: The values of each `SweepConfig` field.
+
+        :return: The configurations.
+        """
+        return [SweepConfig(**dict(zip(options.keys(), values))) for values in product(*options.values())]
+
+    def run(
+        self,
+        asteroids: dict[str, Asteroid],
+        configs: list[SweepConfig],
+        workers: int | None = None,
+        progress_callback: Callable[[str, int, int], None] | None = None,
+    ) -> list[dict]:
+        """
+        Compute the features of all asteroids for all configurations.
+
+        :param asteroids: The asteroids by name.
+        :param configs: The configurations.
+        :param workers: The number of worker processes, if None the asteroids are processed serially.
+        :param progress_callback: Called with (asteroid name, number of processed asteroids, total) after each asteroid.
+
+        :return: For each configuration, the data in the shape of the features files, `{"config": ...,
+            "asteroids": {name: {"is_failed", "reason", "period", "processing_time", "input_hash", "features"}}}`.
+            The processing time of an asteroid is the time of all stages its configuration depends on,
+            including the ones shared with other configurations. The input hash identifies the asteroid's data
+            and the configuration (with the decomposer settings) the features were computed from.
+        """
+        results = self._process_asteroids(
+            {name: (asteroid, configs) for name, asteroid in asteroids.items()}, workers, progress_callback
+        )
+
+        return [
+            {
+                "config": config.model_dump(mode="json"),
+                "asteroids": {name: results[name][ind] for name in asteroids},
+            }
+            for ind, config in enumerate(configs)
+        ]
+
+    def save(
+        self,
+        results: list[dict],
+        features_dir: Path | str,
+        first_config_no: int = 1,
+        output_format: FeatureFormatEnum | str = FeatureFormatEnum.JSON,
+    ) -> list[Path]:
+        """
+        Write each configuration's data, either to `asteroids_freq_data_{config_no}.json`
+        or as a `FeatureStore` bundle.
+
+        :param results: The output of `run`.
+        :param features_dir: The output directory.
+        :param first_config_no: The number of the first configuration.
+        :param output_format: `"json"` for the JSON files, `"npy"` for the feature store.
+
+        :return: The written files (JSON) or bundle directories (feature store).
+        """
+        output_format = FeatureFormatEnum(output_format)
+
+        features_dir = Path(features_dir)
+        features_dir.mkdir(parents=True, exist_ok=True)
+
+        return [
+            self._write(features_dir, config_no, data, output_format)
+            for config_no, data in enumerate(results, start=first_config_no)
+        ]
+
+    def regenerate(
+        self,
+        asteroids: dict[str, Asteroid],
+        configs: list[SweepConfig],
+        features_dir: Path | str,
+        first_config_no: int = 1,
+        output_format: FeatureFormatEnum | str = FeatureFormatEnum.JSON,
+        workers: int | None = None,
+        progress_callback: Callable[[str, int, int], None] | None = None,
+    ) -> dict[int, list[str]]:
+        """
+        Recompute only the (asteroid, configuration) features whose inputs changed since they were saved
+        (or that are missing) and patch them into the saved outputs. Saved asteroids missing from
+        `asteroids` are kept as they are, unless the saved output of a configuration number was computed
+        for a different configuration: it is then replaced with the results of `asteroids` only.
+
+        :param asteroids: The asteroids by name.
+        :param configs: The configurations.
+        :param features_dir: The directory of the saved outputs.
+        :param first_config_no: The number of the first configuration.
+        :param output_format: `"json"` for the JSON files, `"npy"` for the feature store.
+        :param workers: The number of worker processes, if None the asteroids are processed serially.
+        :param progress_callback: Called with (asteroid name, number of processed asteroids, total) after each
+            recomputed asteroid.
+
+        :return: The names of the recomputed asteroids per configuration number.
+        """
+        output_format = FeatureFormatEnum(output_format)
+        features_dir = Path(features_dir)
+        features_dir.mkdir(parents=True, exist_ok=True)
+
+        config_numbers = list(range(first_config_no, first_config_no + len(configs)))
+        stored = {config_no: self._read_stored(features_dir, config_no, output_format) for config_no in config_numbers}
+        stored_hashes = {config_no: hashes for config_no, (_, hashes) in stored.items()}
+
+        # Outputs of other configurations are not patched, so results of two configurations never mix
+        replaced = {
+            config_no
+            for config_no, config in zip(config_numbers, configs)
+            if stored[config_no][0] is not None and not self._is_same_config(stored[config_no][0], config)
+        }
+
+        tasks: dict[str, tuple[Asteroid, list[SweepConfig]]] = {}
+        stale: dict[str, list[int]] = {}
+        for name, asteroid in asteroids.items():
+            for config_no, config in zip(config_numbers, configs):
+                input_hash = self._get_input_hash(asteroid, config)
+                if config_no in replaced or stored_hashes[config_no].get(name) != input_hash:
+                    stale.setdefault(name, []).append(config_no)
+
+            if name in stale:
+                tasks[name] = (asteroid, [configs[config_no - first_config_no] for config_no in stale[name]])
+
+        results = self._process_asteroids(tasks, workers, progress_callback)
+
+        patches: dict[int, dict[str, dict]] = {config_no: {} for config_no in replaced}
+        for name, stale_config_numbers in stale.items():
+            for config_no, asteroid_data in zip(stale_config_numbers, results[name]):
+                patches.setdefault(config_no, {})[name] = asteroid_data
+
+        for config_no, asteroids_data in sorted(patches.items()):
+            data = {
+                "config": configs[config_no - first_config_no].model_dump(mode="json"),
+                "asteroids": asteroids_data,
+            }
+            if config_no in replaced:
+                self._write(features_dir, config_no, data, output_format)
+            else:
+                self._patch(features_dir, config_no, data, output_format)
+
+        return {config_no: list(asteroids_data) for config_no, asteroids_data in sorted(patches.items())}
+
+    def _process_asteroids(
+        self,
+        tasks: dict[str, tuple[Asteroid, list[SweepConfig]]],
+        workers: int | None,
+        progress_callback: Callable[[str, int, int], None] | None,
+    ) -> dict[str, list[dict]]:
+        results: dict[str, list[dict]] = {}
+        if workers is None:
+            for completed, (name, (asteroid, configs)) in enumerate(tasks.items(), start=1):
+                results[name] = self._process_asteroid(asteroid, configs)
+                if progress_callback is not None:
+                    progress_callback(name, completed, len(tasks))
+        else:
+            with ProcessPoolExecutor(max_workers=workers) as pool:
+                futures = {
+                    pool.submit(self._process_asteroid, asteroid, configs): name
+                    for name, (asteroid, configs) in tasks.items()
+                }
+                for completed, future in enumerate(as_completed(futures), start=1):
+                    name = futures[future]
+                    results[name] = future.result()
+                    if progress_callback is not None:
+                        progress_callback(name, completed, len(tasks))
+
+        return results
+
+    def _read_stored(
+        self, features_dir: Path, config_no: int, output_format: FeatureFormatEnum
+    ) -> tuple[dict | None, dict]:
+        # The stored configuration (None if there is no output) and input hashes of the asteroids
+        if output_format == FeatureFormatEnum.NPY:
+            store = FeatureStore(features_dir)
+            if config_no not in store.config_numbers:
+                return None, {}
+
+            hashes = {name: features.input_hash for name, features in store.read(config_no).items()}
+            return store.read_config(config_no), hashes
+
+        path = features_dir / FEATURES_FILE.format(config_no=config_no)
+        if not path.exists():
+            return None, {}
+
+        with open(path, "r") as f:
+            data = json.load(f)
+
+        hashes = {name: asteroid_data.get("input_hash") for name, asteroid_data in data["asteroids"].items()}
+
+        return data["config"], hashes
+
+    def _is_same_config(self, stored_config: dict, config: SweepConfig) -> bool:
+        # Validated, so configurations saved before a field with a default was added still match
+        try:
+            return SweepConfig.model_validate(stored_config) == config
+        except ValidationError:
+            return False
+
+    def _write(self, features_dir: Path, config_no: int, data: dict, output_format: FeatureFormatEnum) -> Path:
+        if output_format == FeatureFormatEnum.NPY:
+            return FeatureStore(features_dir).write(config_no, data)
+        elif output_format == FeatureFormatEnum.JSON:
+            path = features_dir / FEATURES_FILE.format(config_no=config_no)
+            self._write_json(path, data)
+            return path
+        else:
+            options = ["FeatureFormatEnum." + option.name for option in FeatureFormatEnum]
+            raise ValueError(f"Invalid output format: {output_format}, use: {options}")
+
+    def _patch(self, features_dir: Path, config_no: int, data: dict, output_format: FeatureFormatEnum) -> None:
+        if output_format == FeatureFormatEnum.NPY:
+            FeatureStore(features_dir).patch(config_no, data)
+            return
+
+        path = features_dir / FEATURES_FILE.format(config_no=config_no)
+        if path.exists():
+            with open(path, "r") as f:
+                stored = json.load(f)
+
+            stored["config"] = data["config"]
+            stored["asteroids"].update(data["asteroids"])
+            data = stored
+
+        self._write_json(path, data)
+
+    def _write_json(self, path: Path, data: dict) -> None:
+        # Written next to the target and renamed, so readers never see a partially written file
+        tmp_path = path.with_name(f"{path.name}.{os.getpid()}.tmp")
+        with open(tmp_path, "w") as f:
+            json.dump(data, f, indent=4)
+        os.replace(tmp_path, path)
+
+    def _get_input_hash(self, asteroid: Asteroid, config: SweepConfig) -> str:
+        # Only settings affecting the features, and configuration fields left at their defaults are omitted,
+        # so adding a setting or a field keeps the hashes of the saved features
+        inputs = {
+            "version": INPUT_HASH_VERSION,
+            "asteroid": asteroid.fingerprint,
+            "config": config.model_dump(mode="json", exclude_defaults=True),
+            "decomposer": self._decomposer.config,
+            "normalizer": self._normalizer.config if config.normalize else None,
+            "anomaly_threshold": self._anomaly_threshold,
+        }
+
+        return hashlib.sha1(json.dumps(inputs, sort_keys=True).encode()).hexdigest()
+
+    def _process_asteroid(self, asteroid: Asteroid, configs: list[SweepConfig]) -> list[dict]:
+        # Nodes of the asteroid's DAG, each value is (result, time it took)
+        cache = PipelineCache(self._splitter, self._binner, self._normalizer, max_bytes=None)
+        nodes: dict[tuple, tuple[Any, float]] = {}
+
+        def node(key: tuple, compute: Callable[[], Any]) -> tuple[Any, float]:
+            if key not in nodes:
+                start = perf_counter()
+                value = compute()
+                nodes[key] = (value, perf_counter() - start)
+
+            return nodes[key]
+
+        ret_data = []
+        for config in configs:
+            used: set[tuple] = set()
+
+            def use(key: tuple, compute: Callable[[], Any]) -> Any:
+                used.add(key)
+                return node(key, compute)[0]
+
+            features, reason = self._get_features(asteroid, config, cache, use)
+            ret_data.append(
+                {
+                    "is_failed": reason is not None,
+                    "reason": reason,
+                    "period": asteroid.period,
+                    "processing_time": sum(nodes[key][1] for key in used),
+                    "input_hash": self._get_input_hash(asteroid, config),
+                    "features": features,
+                }
+            )
+
+        return ret_data
+
+    def _get_features(
+        self,
+        asteroid: Asteroid,
+        config: SweepConfig,
+        cache: PipelineCache,
+        use: Callable[[tuple, Callable[[], Any]], Any],
+    ) -> tuple[list, str | None]:
+        split_key = ("split",) + config.split_key
+        lightcurves = use(split_key, lambda: cache.split_lightcurves(asteroid, *config.split_key))
+        if use(("anomaly",) + config.split_key, lambda: self._has_anomalous_series(lightcurves)):
+            return [], "anomalous series"
+
+        bin_key = ("bin",) + config.bin_key
+        bins: list[LightcurveBin] = use(
+            bin_key,
+            lambda: cache.bin_lightcurves(
+                asteroid,
+                *config.split_key,
+                config.max_time_diff,
+                min_bin_size=config.min_bin_size,
+                normalize=config.normalize,
+            ),
+        )
+
+        # Includes the buffer bins, used in case of too few frequencies for some of the top bins
+        n_selected = config.top_k_bins + config.buffer_bins
+        selected = use(
+            ("select",) + config.bin_key + (config.select_bins_by, n_selected),
+            lambda: self._select_bins(bins, config.select_bins_by, n_selected),
+        )
+        if not selected:
+            return [], "no bins"
+
+        freq_data = []
+        for ind in selected:
+            if len(freq_data) == config.top_k_bins:
+                break
+
+            bin_freq = use(
+                ("decompose",) + config.bin_key + (ind,) + config.decompose_key,
+                lambda: self._decomposer.decompose_bin(
+                    bins[ind], config.nterms, config.top_k_freqs, max_freq=config.max_freq
+                ),
+            )
+            if len(bin_freq) < config.top_k_freqs:
+                continue
+
+            freq_data.append(bin_freq.tolist())
+
+        if not freq_data:
+            return [], "no frequencies"
+
+        return freq_data, None
+
+    def _select_bins(
+        self,
+        bins: list[LightcurveBin],
+        select_bins_by: BinSelectionEnum,
+        n_selected: int,
+    ) -> list[int]:
+        if select_bins_by == BinSelectionEnum.LIGHTCURVES:
+            order = sorted(range(len(bins)), key=lambda ind: len(bins[ind]), reverse=True)
+        elif select_bins_by == BinSelectionEnum.POINTS:
+            order = sorted(range(len(bins)), key=lambda ind: bins[ind].points_count, reverse=True)
+        else:
+            options = ["BinSelectionEnum." + option.name for option in BinSelectionEnum]
+            raise ValueError(f"Invalid bin selection: {select_bins_by}, use: {options}")
+
+        return order[:n_selected]
+
+    def _has_anomalous_series(self, lightcurves: list) -> bool:
+        if not lightcurves:
+            return False
+
+        medians = np.array([np.median(lc.brightness_arr) for lc in lightcurves])
+        ratios = medians / np.median(medians)
+
+        return bool(
+            np.any((ratios > 10**self._anomaly_threshold) | (ratios < 10 ** (-self._anomaly_threshold)))
+        )
@@ -0,0 +1,83 @@
+import numpy as np
+
+from astrofit.utils.phase_folder import PhaseFolder
+
+# Upper bound of the memory used by the (frequencies x points) work arrays of a single chunk
+MAX_CHUNK_BYTES = 64 * 2**20
+
+
+class PhaseDispersionMinimization:
+    """
+    Phase Dispersion Minimization (Stellingwerf, 1978) evaluated for whole batches of frequencies.
+
+    For each trial frequency the points are folded into equal phase bins and the pooled variance
+    within the bins is compared to the total variance (theta). A good period groups similar
+    brightnesses in each phase bin and gives a low theta, unlike a periodogram it makes no
+    assumption on the shape of the lightcurve (e.g. double-peaked ones).
+    """
+
+    def __init__(self, n_bins: int = 10, max_chunk_bytes: int = MAX_CHUNK_BYTES) -> None:
+        """
+        :param n_bins: The number of phase bins.
+        :param max_chunk_bytes: The memory bound of the arrays of a chunk of frequencies.
+        """
+        if n_bins < 2:
+            raise ValueError(f"n_bins must be at least 2, got {n_bins}")
+
+        self._n_bins = n_bins
+        self._max_chunk_bytes = max_chunk_bytes
+        self._phase_folder = PhaseFolder()
+
+    def theta(self, times: np.ndarray, brightnesses: np.ndarray, frequency: np.ndarray) -> np.ndarray:
+        """
+        Compute the PDM statistic at each frequency.
+
+        :param times: The times of the bin (in days).
+        :param brightnesses: The brightnesses of the bin.
+        :param frequency: The frequency grid (in 1/day).
+
+        :return: The theta of each frequency, in [0, 1] for most frequencies (1 means no periodicity).
+        """
+        times = np.asarray(times, dtype=np.float64)
+        frequency = np.asarray(frequency, dtype=np.float64)
+        y = np.asarray(brightnesses, dtype=np.float64)
+        y = y - y.mean()
+
+        theta = np.ones(len(frequency))
+        total_variance = np.dot(y, y) / (len(y) - 1) if len(y) > 1 else 0.0
+        if total_variance == 0:
+            return theta
+
+        chunk_size = max(1, self._max_chunk_bytes // (8 * len(times) * 5))
+        for chunk_start in range(0, len(frequency), chunk_size):
+            chunk = slice(chunk_start, chunk_start + chunk_size)
+            theta[chunk] = self._chunk_theta(times, y, frequency[chunk]) / total_variance
+
+        return theta
+
+    def power(self, times: np.ndarray, brightnesses: np.ndarray, frequency: np.ndarray) -> np.ndarray:
+        """
+        Compute the score `1 - theta` at each frequency (higher is better, as a periodogram's power).
+        """
+        return 1 - self.theta(times, brightnesses, frequency)
+
+    def _chunk_theta(self, t: np.ndarray, y: np.ndarray, frequency: np.ndarray) -> np.ndarray:
+        n_freqs = len(frequency)
+
+        # Phase bins of all frequencies are numbered consecutively, so single bincounts sum all of them
+        phases = self._phase_folder.fold(t, 24 / frequency)
+        bin_idx = np.minimum((phases * self._n_bins).astype(np.int64), self._n_bins - 1)
+        keys = (bin_idx + self._n_bins * np.arange(n_freqs)[:, None]).ravel()
+
+        size = n_freqs * self._n_bins
+        counts = np.bincount(keys, minlength=size).reshape(n_freqs, self._n_bins)
+        sums = np.bincount(keys, weights=np.tile(y, n_freqs), minlength=size).reshape(n_freqs, self._n_bins)
+        squares = np.bincount(keys, weights=np.tile(y * y, n_freqs), minlength=size).reshape(n_freqs, self._n_bins)
+
+        # Pooled within-bin variance: sum over bins of (n_j - 1) * s_j^2, over (N - number of non-empty bins)
+        with np.errstate(invalid="ignore", divide="ignore"):
+            within = np.where(counts > 0, squares - sums**2 / counts, 0.0).sum(axis=1)
+
+        dof = len(t) - (counts > 0).sum(axis=1)
+
+        return np.where(dof > 0, within / np.maximum(dof, 1), np.dot(y, y) / max(len(y) - 1, 1))
@@ -0,0 +1,152 @@
+import numpy as np
+
+from astrofit.model import Lightcurve, LightcurveBin
+from astrofit.utils.enums import PhaseStatisticEnum
+
+
+class PhaseFolder:
+    """
+    Vectorized phase folding of lightcurves at many trial periods (in hours).
+
+    Points are folded as `(JD - ref_JD) * 24 % period / period`, with the first JD of the
+    (first) lightcurve as the reference, and can be reduced to fixed-size phase-binned curves.
+    """
+
+    def fold(
+        self,
+        times: np.ndarray,
+        periods: float | np.ndarray,
+        ref_time: float | None = None,
+    ) -> np.ndarray:
+        """
+        Get the phases of the times at each period.
+
+        :param times: The Julian Dates.
+        :param periods: The period or periods in hours.
+        :param ref_time: The Julian Date of phase 0, by default the first time.
+
+        :return: An array of shape (n_periods, n_points) with phases in [0, 1).
+        """
+        times = np.asarray(times, dtype=np.float64)
+        periods = np.atleast_1d(np.asarray(periods, dtype=np.float64))
+        if ref_time is None:
+            ref_time = times[0] if len(times) else 0.0
+
+        hours = (times - ref_time) * 24
+
+        return hours[None, :] % periods[:, None] / periods[:, None]
+
+    def fold_lightcurves(
+        self,
+        lightcurves: list[Lightcurve] | LightcurveBin,
+        periods: float | np.ndarray,
+    ) -> tuple[np.ndarray, np.ndarray]:
+        """
+        Get the phases of all points of the lightcurves at each period.
+
+        :param lightcurves: The lightcurves, the first JD of the first one is the phase 0.
+        :param periods: The period or periods in hours.
+
+        :return: The (n_periods, n_points) phases and the (n_points,) brightnesses.
+        """
+        times, brightnesses = self._get_points(lightcurves)
+
+        return self.fold(times, periods, times[0] if len(times) else None), brightnesses
+
+    def phase_curves(
+        self,
+        times: np.ndarray,
+        brightnesses: np.ndarray,
+        periods: float | np.ndarray,
+        n_bins: int = 50,
+        statistic: PhaseStatisticEnum = PhaseStatisticEnum.MEAN,
+        ref_time: float | None = None,
+        fill_empty: bool = False,
+    ) -> np.ndarray:
+        """
+        Get the phase-binned curves (the mean or median brightness in equal phase bins) at each period.
+
+        :param times: The Julian Dates.
+        :param brightnesses: The brightnesses.
+        :param periods: The period or periods in hours.
+        :param n_bins: The number of phase bins.
+        :param statistic: The statistic of the brightnesses in a bin.
+        :param ref_time: The Julian Date of phase 0, by default the first time.
+        :param fill_empty: Whether to fill empty bins by (circular) linear interpolation
+            from the non-empty ones, otherwise they are NaN.
+
+        :return: An array of shape (n_periods, n_bins).
+        """
+        brightnesses = np.asarray(brightnesses, dtype=np.float64)
+        phases = self.fold(times, periods, ref_time)
+        n_periods = len(phases)
+
+        # Bins of all periods are numbered consecutively, so a single pass reduces all of them
+        bin_idx = np.minimum((phases * n_bins).astype(np.int64), n_bins - 1)
+        keys = (bin_idx + n_bins * np.arange(n_periods)[:, None]).ravel()
+        values = np.broadcast_to(brightnesses, phases.shape).ravel()
+        counts = np.bincount(keys, minlength=n_periods * n_bins)
+
+        with np.errstate(invalid="ignore", divide="ignore"):
+            if statistic == PhaseStatisticEnum.MEAN:
+                curves = np.bincount(keys, weights=values, minlength=n_periods * n_bins) / counts
+            elif statistic == PhaseStatisticEnum.MEDIAN:
+                curves = self._get_grouped_medians(keys, values, counts)
+            else:
+                options = ["PhaseStatisticEnum." + option.name for option in PhaseStatisticEnum]
+                raise ValueError(f"Invalid statistic: {statistic}, use: {options}")
+
+        curves = curves.reshape(n_periods, n_bins)
+        if fill_empty:
+            self._fill_empty_bins(curves)
+
+        return curves
+
+    def phase_curves_lightcurves(
+        self,
+        lightcurves: list[Lightcurve] | LightcurveBin,
+        periods: float | np.ndarray,
+        n_bins: int = 50,
+        statistic: PhaseStatisticEnum = PhaseStatisticEnum.MEAN,
+        fill_empty: bool = False,
+    ) -> np.ndarray:
+        """
+        Get the phase-binned curves of the lightcurves at each period, see `phase_curves`.
+        """
+        times, brightnesses = self._get_points(lightcurves)
+
+        return self.phase_curves(times, brightnesses, periods, n_bins, statistic, fill_empty=fill_empty)
+
+    def _get_points(self, lightcurves: list[Lightcurve] | LightcurveBin) -> tuple[np.ndarray, np.ndarray]:
+        if isinstance(lightcurves, LightcurveBin):
+            return lightcurves.times, lightcurves.brightnesses
+
+        if not lightcurves:
+            return np.empty(0), np.empty(0)
+
+        return (
+            np.concatenate([lc.time_arr for lc in lightcurves]),
+            np.concatenate([lc.brightness_arr for lc in lightcurves]),
+        )
+
+    def _get_grouped_medians(self, keys: np.ndarray, values: np.ndarray, counts: np.ndarray) -> np.ndarray:
+        # Values sorted within their groups, each median is the middle element (or the mean of the middle two)
+        order = np.lexsort((values, keys))
+        sorted_values = values[order]
+        starts = np.concatenate([[0], np.cumsum(counts)[:-1]])
+
+        medians = np.full(len(counts), np.nan)
+        non_empty = counts > 0
+        lower = sorted_values[starts[non_empty] + (counts[non_empty] - 1) // 2]
+        upper = sorted_values[starts[non_empty] + counts[non_empty] // 2]
+        medians[non_empty] = (lower + upper) / 2
+
+        return medians
+
+    def _fill_empty_bins(self, curves: np.ndarray) -> None:
+        n_bins = curves.shape[1]
+        centers = (np.arange(n_bins) + 0.5) / n_bins
+        for curve in curves:
+            empty = np.isnan(curve)
+            if empty.any() and not empty.all():
+                curve[empty] = np.interp(centers[empty], centers[~empty], curve[~empty], period=1)
@@ -0,0 +1,250 @@
+import hashlib
+import os
+import pickle
+from collections import OrderedDict
+from pathlib import Path
+from threading import Lock
+from typing import Any, Callable
+
+from pydantic import BaseModel
+
+from astrofit.model import Asteroid, Lightcurve, LightcurveBin
+from astrofit.utils.enums import BinningMethodEnum
+from astrofit.utils.lightcurve_binner import LightcurveBinner
+from astrofit.utils.lightcurve_normalizer import LightcurveNormalizer
+from astrofit.utils.lightcurve_splitter import LightcurveSplitter
+
+SPLIT_STAGE = "split"
+NORMALIZE_STAGE = "normalize"
+BIN_STAGE = "bin"
+
+# Default memory budget of the in-memory tier
+MAX_BYTES = 2 * 2**30
+
+
+class CacheStats(BaseModel):
+    hits: int = 0
+    disk_hits: int = 0
+    misses: int = 0
+    evictions: int = 0
+
+
+class PipelineCache:
+    """
+    Memoizing wrapper of the split -> (normalize) -> bin stages of the feature pipeline.
+
+    Results are keyed by the asteroid (its name and content fingerprint) and the stage
+    parameters. They are kept in memory with least-recently-used eviction under a memory
+    budget (estimated from the sizes of the point arrays, so views shared with the asteroid
+    count in full) and, optionally, pickled to a directory that survives process restarts.
+    """
+
+    def __init__(
+        self,
+        splitter: LightcurveSplitter | None = None,
+        binner: LightcurveBinner | None = None,
+        normalizer: LightcurveNormalizer | None = None,
+        max_bytes: int | None = MAX_BYTES,
+        disk_dir: Path | str | None = None,
+    ) -> None:
+        """
+        :param splitter: The splitter to use, a new one by default.
+        :param binner: The binner to use, a new one by default.
+        :param normalizer: The normalizer to use, a new one by default.
+        :param max_bytes: The memory budget of the in-memory tier, unlimited if None.
+        :param disk_dir: The directory of the on-disk tier, disabled if None.
+        """
+        self._splitter = splitter or LightcurveSplitter()
+        self._binner = binner or LightcurveBinner()
+        self._normalizer = normalizer or LightcurveNormalizer()
+        self._max_bytes = max_bytes
+        self._disk_dir = Path(disk_dir) if disk_dir is not None else None
+
+        self._entries: OrderedDict[tuple, tuple[Any, int]] = OrderedDict()
+        self._size_bytes = 0
+        self._stats = {SPLIT_STAGE: CacheStats(), NORMALIZE_STAGE: CacheStats(), BIN_STAGE: CacheStats()}
+        self._lock = Lock()
+
+        if self._disk_dir is not None:
+            self._disk_dir.mkdir(parents=True, exist_ok=True)
+
+    def split_lightcurves(
+        self,
+        asteroid: Asteroid,
+        max_hours_diff: float,
+        min_no_points: int | None = None,
+    ) -> list[Lightcurve]:
+        """
+        Cached `LightcurveSplitter.split_lightcurves` of the asteroid's lightcurves.
+        """
+        return self._get_or_compute(
+            (SPLIT_STAGE, asteroid.name, asteroid.fingerprint, max_hours_diff, min_no_points),
+            lambda: self._splitter.split_lightcurves(asteroid.lightcurves, max_hours_diff, min_no_points),
+        )
+
+    def normalize_lightcurves(
+        self,
+        asteroid: Asteroid,
+        max_hours_diff: float,
+        min_no_points: int | None = None,
+    ) -> list[Lightcurve]:
+        """
+        Cached `LightcurveNormalizer.normalize_lightcurves` of the asteroid's split lightcurves
+        (the split is taken from the cache as well).
+        """
+        return self._get_or_compute(
+            (
+                NORMALIZE_STAGE,
+                asteroid.name,
+                asteroid.fingerprint,
+                max_hours_diff,
+                min_no_points,
+                self._normalizer.config,
+            ),
+            lambda: self._normalizer.normalize_lightcurves(
+                self.split_lightcurves(asteroid, max_hours_diff, min_no_points)
+            ),
+        )
+
+    def bin_lightcurves(
+        self,
+        asteroid: Asteroid,
+        max_hours_diff: float,
+        min_no_points: int | None,
+        max_time_diff: float,
+        binning_method: BinningMethodEnum = BinningMethodEnum.FIRST_TO_FIRST_DIFF,
+        min_bin_size: int | None = None,
+        normalize: bool = False,
+    ) -> list[LightcurveBin]:
+        """
+        Cached `LightcurveBinner.bin_lightcurves` of the asteroid's split (and, if `normalize`
+        is set, normalized) lightcurves, the previous stages are taken from the cache as well.
+        """
+        if normalize:
+            get_lightcurves = self.normalize_lightcurves
+            normalizer_config = self._normalizer.config
+        else:
+            get_lightcurves = self.split_lightcurves
+            normalizer_config = None
+
+        return self._get_or_compute(
+            (
+                BIN_STAGE,
+                asteroid.name,
+                asteroid.fingerprint,
+                max_hours_diff,
+                min_no_points,
+                max_time_diff,
+                binning_method.name,
+                min_bin_size,
+                normalizer_config,
+            ),
+            lambda: self._binner.bin_lightcurves(
+                get_lightcurves(asteroid, max_hours_diff, min_no_points),
+                max_time_diff,
+                binning_method,
+                min_bin_size,
+            ),
+        )
+
+    @property
+    def stats(self) -> dict[str, CacheStats]:
+        """
+        Hit/miss statistics per stage.
+        """
+        return self._stats
+
+    @property
+    def size_bytes(self) -> int:
+        """
+        Estimated size of the in-memory tier.
+        """
+        return self._size_bytes
+
+    def clear(self, disk: bool = False) -> None:
+        """
+        Drop all in-memory entries (and the on-disk ones if `disk` is set) and reset the statistics.
+        """
+        with self._lock:
+            self._entries.clear()
+            self._size_bytes = 0
+            self._stats = {stage: CacheStats() for stage in self._stats}
+
+        if disk and self._disk_dir is not None:
+            for path in self._disk_dir.glob("*.pkl"):
+                path.unlink(missing_ok=True)
+
+    def _get_or_compute(self, key: tuple, compute: Callable[[], Any]) -> Any:
+        with self._lock:
+            if key in self._entries:
+                self._entries.move_to_end(key)
+                self._stats[key[0]].hits += 1
+                return self._entries[key][0]
+
+        # Reading, computing and writing run outside the lock, only the counters are updated under it
+        value = self._read_disk(key)
+        if value is not None:
+            with self._lock:
+                self._stats[key[0]].disk_hits += 1
+        else:
+            with self._lock:
+                self._stats[key[0]].misses += 1
+            value = compute()
+            self._write_disk(key, value)
+
+        self._store(key, value)
+
+        return value
+
+    def _store(self, key: tuple, value: Any) -> None:
+        size = self._get_size(value)
+
+        with self._lock:
+            if key in self._entries:
+                self._size_bytes -= self._entries.pop(key)[1]
+
+            self._entries[key] = (value, size)
+            self._size_bytes += size
+
+            # The newest entry is kept even if it alone exceeds the budget
+            while self._max_bytes is not None and self._size_bytes > self._max_bytes and len(self._entries) > 1:
+                evicted_key, (_, evicted_size) = self._entries.popitem(last=False)
+                self._size_bytes -= evicted_size
+                self._stats[evicted_key[0]].evictions += 1
+
+    def _get_size(self, value: list[Lightcurve] | list[LightcurveBin]) -> int:
+        size = 0
+        for item in value:
+            lightcurves = item.lightcurves if isinstance(item, LightcurveBin) else [item]
+            size += sum(lc.points_arr.nbytes for lc in lightcurves)
+
+        return size
+
+    def _get_disk_path(self, key: tuple) -> Path | None:
+        if self._disk_dir is None:
+            return None
+
+        return self._disk_dir / f"{hashlib.sha1(repr(key).encode()).hexdigest()}.pkl"
+
+    def _read_disk(self, key: tuple) -> Any | None:
+        path = self._get_disk_path(key)
+        if path is None or not path.exists():
+            return None
+
+        try:
+            with open(path, "rb") as f:
+                stored_key, value = pickle.load(f)
+        except (OSError, EOFError, pickle.UnpicklingError):
+            return None
+
+        return value if stored_key == key else None
+
+    def _write_disk(self, key: tuple, value: Any) -> None:
+        path = self._get_disk_path(key)
+        if path is None:
+            return
+
+        tmp_path = path.with_name(f"{path.name}.{os.getpid()}.tmp")
+        with open(tmp_path, "wb") as f:
+            pickle.dump((key, value), f, protocol=pickle.HIGHEST_PROTOCOL)
+        os.replace(tmp_path, path)
@@ -0,0 +1,45 @@
+import json
+from pathlib import Path
+
+import numpy as np
+import pytest
+
+
+def write_asteroid(asteroids_dir: Path, name: str, seed: int) -> None:
+    rng = np.random.default_rng(seed)
+    asteroid_dir = asteroids_dir / name
+    asteroid_dir.mkdir(parents=True, exist_ok=True)
+
+    lightcurves = []
+    for lc_id in range(3):
+        jds = 2450000 + 10 * lc_id + np.sort(rng.uniform(0, 0.3, 20))
+        points = np.column_stack([jds, rng.uniform(0.9, 1.1, 20), rng.normal(size=(20, 6))])
+        lightcurves.append(
+            {
+                "id": lc_id,
+                "scale": 1,
+                "points": "\n".join(" ".join(f"{value:.8f}" for value in row) for row in points),
+                "created": "2020-01-01T00:00:00",
+                "modified": "2020-01-02T00:00:00",
+                "points_count": len(points),
+            }
+        )
+
+    with open(asteroid_dir / "lc.json", "w") as f:
+        json.dump(lightcurves, f)
+
+    with open(asteroid_dir / "spin_params.json", "w") as f:
+        json.dump({"period": 5.0 + seed, "lambda": 10.0, "beta": 20.0}, f)
+
+
+@pytest.fixture
+def data_dir(tmp_path: Path) -> Path:
+    names = ["Ast0", "Ast1", "Ast2"]
+    with open(tmp_path / "asteroids.csv", "w") as f:
+        f.write("id,name,number\n")
+        f.writelines(f"{100 + ind},{name},{ind + 1}\n" for ind, name in enumerate(names))
+
+    for ind, name in enumerate(names):
+        write_asteroid(tmp_path / "asteroids", name, ind)
+
+    return tmp_path
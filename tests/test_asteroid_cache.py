@@ -0,0 +1,44 @@
+import json
+import os
+from pathlib import Path
+
+import numpy as np
+
+from astrofit.utils import AsteroidLoader
+from astrofit.utils.asteroid_cache import CACHE_META_FILE, CACHE_POINTS_FILE
+from astrofit.utils.asteroid_loader import CACHE_DIR
+
+
+def test_round_trip(data_dir: Path):
+    parsed = AsteroidLoader(data_dir, use_cache=True).load_asteroid("Ast1")
+    assert (data_dir / CACHE_DIR / "Ast1" / CACHE_POINTS_FILE).exists()
+
+    cached = AsteroidLoader(data_dir, use_cache=True).load_asteroid("Ast1")
+
+    assert isinstance(cached.lightcurves[0].points_arr.base, np.memmap)
+    assert cached == parsed
+    assert cached.period == parsed.period
+
+
+def test_changed_source_invalidates(data_dir: Path):
+    AsteroidLoader(data_dir, use_cache=True).load_asteroid("Ast1")
+
+    spin_params_file = data_dir / "asteroids" / "Ast1" / "spin_params.json"
+    spin_params_file.write_text(json.dumps({"period": 42.0, "lambda": 10.0, "beta": 20.0}))
+
+    assert AsteroidLoader(data_dir, use_cache=True).load_asteroid("Ast1").period == 42.0
+
+
+def test_touched_source_stays_fresh(data_dir: Path):
+    AsteroidLoader(data_dir, use_cache=True).load_asteroid("Ast1")
+    meta_file = data_dir / CACHE_DIR / "Ast1" / CACHE_META_FILE
+
+    # A newer modification time with the same content only updates the stored signature
+    lc_file = data_dir / "asteroids" / "Ast1" / "lc.json"
+    stat = lc_file.stat()
+    os.utime(lc_file, ns=(stat.st_atime_ns, stat.st_mtime_ns + 10**9))
+
+    cached = AsteroidLoader(data_dir, use_cache=True).load_asteroid("Ast1")
+
+    assert isinstance(cached.lightcurves[0].points_arr.base, np.memmap)
+    assert json.loads(meta_file.read_text())["sources"]["lc.json"]["mtime_ns"] == stat.st_mtime_ns + 10**9
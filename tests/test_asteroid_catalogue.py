@@ -0,0 +1,70 @@
+import json
+import os
+from pathlib import Path
+
+import pytest
+
+from astrofit.utils import AsteroidLoader, asteroid_catalogue
+from astrofit.utils.asteroid_catalogue import MANIFEST_FILE, AsteroidCatalogue
+
+
+def edit_in_place(path: Path, content: str) -> None:
+    # Rewriting a file keeps the modification time of its directory
+    dir_stat = path.parent.stat()
+    path.write_text(content)
+    os.utime(path.parent, ns=(dir_stat.st_atime_ns, dir_stat.st_mtime_ns))
+
+
+def test_catalogue(data_dir: Path):
+    available_asteroids = AsteroidCatalogue(data_dir).available_asteroids
+
+    assert list(available_asteroids) == ["Ast0", "Ast1", "Ast2"]
+    assert available_asteroids["Ast1"]["id"] == 2
+    assert available_asteroids["Ast1"]["lightcurves_count"] == 3
+    assert available_asteroids["Ast1"]["points_count"] == 60
+
+
+def test_spin_params_edited_in_place(data_dir: Path):
+    AsteroidCatalogue(data_dir)
+
+    spin_params = {"period": 7.5, "lambda": 1.0, "beta": 2.0}
+    edit_in_place(data_dir / "asteroids" / "Ast1" / "spin_params.json", json.dumps(spin_params))
+
+    assert AsteroidCatalogue(data_dir).available_asteroids["Ast1"]["period"] == 7.5
+
+
+def test_lightcurves_edited_in_place(data_dir: Path):
+    AsteroidCatalogue(data_dir)
+
+    lc_file = data_dir / "asteroids" / "Ast1" / "lc.json"
+    edit_in_place(lc_file, json.dumps(json.loads(lc_file.read_text())[:1]))
+
+    assert AsteroidCatalogue(data_dir).available_asteroids["Ast1"]["lightcurves_count"] == 1
+
+
+def test_malformed_asteroid_is_catalogued(data_dir: Path):
+    lc_file = data_dir / "asteroids" / "Ast1" / "lc.json"
+    lightcurves = json.loads(lc_file.read_text())
+    lightcurves[0]["points"] += "\n1 2 3"
+    lc_file.write_text(json.dumps(lightcurves))
+    (data_dir / "asteroids" / "Ast2" / "spin_params.json").unlink()
+
+    loader = AsteroidLoader(data_dir)
+    assert loader.available_asteroids["Ast1"]["points_count"] is None
+    assert loader.available_asteroids["Ast2"]["period"] is None
+
+    # The errors are reported when the asteroids are loaded
+    assert list(loader.load_asteroids()) == ["Ast0"]
+    assert isinstance(loader.load_errors["Ast1"], ValueError)
+    assert isinstance(loader.load_errors["Ast2"], FileNotFoundError)
+
+
+def test_unwritable_manifest(data_dir: Path, monkeypatch: pytest.MonkeyPatch):
+    def deny(*args) -> None:
+        raise PermissionError("read-only")
+
+    monkeypatch.setattr(asteroid_catalogue.os, "replace", deny)
+
+    assert list(AsteroidCatalogue(data_dir).available_asteroids) == ["Ast0", "Ast1", "Ast2"]
+    assert not (data_dir / MANIFEST_FILE).exists()
+    assert not list(data_dir.glob("*.tmp"))
@@ -0,0 +1,290 @@
+import json
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+from typing import Iterator
+from urllib.parse import parse_qs, urlsplit
+
+import pytest
+
+from astrofit.damit_connector import AsteroidDownloader
+from astrofit.damit_connector import asteroid_downloader
+from astrofit.damit_connector.asteroid_downloader import MAX_BACKOFF, SEARCH_CACHE_FILE
+
+# name -> (DAMIT id, number)
+ASTEROIDS = {"Alpha": (101, 1), "Beta": (102, 2), "Flaky": (103, 3), "Truncated": (104, 4)}
+# Failed searches of Flaky before it is served
+FLAKY_FAILURES = 2
+# The lightcurves of Truncated are cut off mid-stream
+TRUNCATED_ID = 104
+
+
+def search_page(name: str, number: int) -> str:
+    return f"""<html><body><table class="damit-table-asteroids-browse"><tbody>
+<tr class="damit-asteroid-row"><th><a>({number}) {name}</a></th></tr>
+<tr class="damit-model-row"><td><span class="damit-cursor-help" title="Period">7.5 h</span></td></tr>
+<tr class="damit-model-row"><td><span class="damit-cursor-help" title="Period">{number + 5.25} h</span></td></tr>
+</tbody></table></body></html>"""
+
+
+def lightcurves(asteroid_id: int) -> list[dict]:
+    return [{"id": asteroid_id, "points": "1 2 3 4 5 6 7 8\n"}]
+
+
+class StubDamitHandler(BaseHTTPRequestHandler):
+    requests_log: list[str]
+    flaky_hits: int
+    truncate: bool
+    # Lightcurves served as an HTML error page with status 200
+    html_ids: set[int]
+
+    def log_message(self, *args) -> None:
+        pass
+
+    def do_GET(self) -> None:
+        url = urlsplit(self.path)
+        type(self).requests_log.append(self.path)
+
+        if url.path == "/damit/":
+            query = parse_qs(url.query).get("q", [""])[0]
+            if query == "Flaky":
+                type(self).flaky_hits += 1
+                if type(self).flaky_hits <= FLAKY_FAILURES:
+                    self._send(503, b"")
+                    return
+
+            body = "<html><body>No results</body></html>"
+            for name, (_, number) in ASTEROIDS.items():
+                if query in (name, str(number)):
+                    body = search_page(name, number)
+
+            self._send(200, body.encode(), {"Content-Type": "text/html"})
+        elif url.path.startswith("/lc/"):
+            asteroid_id = int(url.path.split("/")[2])
+            etag = f'"v{asteroid_id}"'
+            if self.headers.get("If-None-Match") == etag:
+                self._send(304, b"")
+                return
+
+            if asteroid_id in type(self).html_ids:
+                self._send(200, b"<html><body>Service unavailable</body></html>", {"Content-Type": "text/html"})
+                return
+
+            body = json.dumps(lightcurves(asteroid_id)).encode()
+            if asteroid_id == TRUNCATED_ID and type(self).truncate:
+                self.send_response(200)
+                self.send_header("Content-Length", str(2 * len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+                self.close_connection = True
+                return
+
+            self._send(200, body, {"Content-Type": "application/json", "ETag": etag})
+        else:
+            self._send(404, b"")
+
+    def _send(self, status: int, body: bytes, headers: dict[str, str] | None = None) -> None:
+        self.send_response(status)
+        for key, value in (headers or {}).items():
+            self.send_header(key, value)
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+
+@pytest.fixture
+def damit_server() -> Iterator[tuple[str, type[StubDamitHandler]]]:
+    handler = type("Handler", (StubDamitHandler,), {"requests_log": [], "flaky_hits": 0, "truncate": True, "html_ids": set()})
+    server = ThreadingHTTPServer(("127.0.0.1", 0), handler)
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+
+    yield f"http://127.0.0.1:{server.server_port}", handler
+
+    server.shutdown()
+    server.server_close()
+
+
+@pytest.fixture
+def downloader_data_dir(tmp_path: Path) -> Path:
+    with open(tmp_path / "asteroids.csv", "w") as f:
+        f.write("id,name,number\n")
+        f.writelines(f"{asteroid_id},{name},{number}\n" for name, (asteroid_id, number) in ASTEROIDS.items())
+
+    return tmp_path
+
+
+def make_downloader(data_dir: Path, url: str, **kwargs) -> AsteroidDownloader:
+    return AsteroidDownloader(
+        data_dir,
+        damit_url=f"{url}/damit/?q=",
+        lc_json_uri=f"{url}/lc/{{}}/json",
+        **{"backoff_factor": 0, "requests_per_second": None, **kwargs},
+    )
+
+
+def test_download_many(downloader_data_dir: Path, damit_server):
+    url, handler = damit_server
+    summary = make_downloader(downloader_data_dir, url).download_many(["Alpha", 2, "Gamma"])
+
+    assert summary.succeeded == {"Alpha": "Alpha", "2": "Beta"}
+    assert summary.failed == {"Gamma": "No object found"}
+
+    asteroid_dir = downloader_data_dir / "asteroids" / "Beta"
+    assert json.loads((asteroid_dir / "lc.json").read_text()) == lightcurves(102)
+    # The most recent model is selected
+    assert float((asteroid_dir / "period.txt").read_text()) == 7.25
+
+
+def test_retry(downloader_data_dir: Path, damit_server):
+    url, handler = damit_server
+    summary = make_downloader(downloader_data_dir, url).download_many(["Flaky"])
+
+    assert summary.succeeded == {"Flaky": "Flaky"}
+    assert handler.flaky_hits == FLAKY_FAILURES + 1
+
+
+def test_retries_are_rate_limited(downloader_data_dir: Path, damit_server, monkeypatch: pytest.MonkeyPatch):
+    url, handler = damit_server
+    downloader = make_downloader(downloader_data_dir, url)
+    waits: list[str] = []
+    monkeypatch.setattr(downloader._rate_limiter, "wait", waits.append)
+
+    downloader.download_many(["Flaky"])
+
+    # Every request, the retried searches included, waited for the rate limiter
+    assert len(handler.requests_log) == FLAKY_FAILURES + 2
+    assert waits == [urlsplit(url).netloc] * len(handler.requests_log)
+
+
+def test_retry_after(downloader_data_dir: Path, damit_server):
+    url, handler = damit_server
+    downloader = make_downloader(downloader_data_dir, url, backoff_factor=0.5)
+
+    assert downloader._get_backoff(2, None) == 2.0
+    assert downloader._get_backoff(0, "3") == 3.0
+    assert downloader._get_backoff(0, "Wed, 21 Oct 2015 07:28:00 GMT") == 0.0
+    assert downloader._get_backoff(0, "soon") == 0.5
+    assert downloader._get_backoff(0, "100000") == MAX_BACKOFF
+
+
+def test_failed_after_retries(downloader_data_dir: Path, damit_server):
+    url, handler = damit_server
+    summary = make_downloader(downloader_data_dir, url, max_retries=1).download_many(["Flaky"])
+
+    assert list(summary.failed) == ["Flaky"]
+    assert not (downloader_data_dir / "asteroids" / "Flaky").exists()
+
+
+def test_search_cache_written_once(downloader_data_dir: Path, damit_server, monkeypatch: pytest.MonkeyPatch):
+    url, handler = damit_server
+    replaced: list[str] = []
+    replace = asteroid_downloader.os.replace
+
+    def record_replace(src, dst) -> None:
+        replaced.append(Path(dst).name)
+        replace(src, dst)
+
+    monkeypatch.setattr(asteroid_downloader.os, "replace", record_replace)
+    make_downloader(downloader_data_dir, url).download_many(["Alpha", "Beta", "Gamma"])
+
+    assert replaced.count(SEARCH_CACHE_FILE) == 1
+    search_cache = json.loads((downloader_data_dir / SEARCH_CACHE_FILE).read_text())
+    assert sorted(search_cache) == ["Alpha", "Beta", "Gamma"]
+
+    # A single query is saved as well, cached searches are not written again
+    make_downloader(downloader_data_dir, url).query_asteroid("Alpha", skip_mirrored=True)
+    assert replaced.count(SEARCH_CACHE_FILE) == 1
+    make_downloader(downloader_data_dir, url).query_asteroid(2, exists_ok=True)
+    assert replaced.count(SEARCH_CACHE_FILE) == 2
+    assert "2" in json.loads((downloader_data_dir / SEARCH_CACHE_FILE).read_text())
+
+
+def test_skip_mirrored(downloader_data_dir: Path, damit_server):
+    url, handler = damit_server
+    make_downloader(downloader_data_dir, url).download_many(["Alpha", "Beta"])
+    handler.requests_log.clear()
+
+    summary = make_downloader(downloader_data_dir, url).download_many(["Alpha", "Beta"])
+
+    assert summary.succeeded == {"Alpha": "Alpha", "Beta": "Beta"}
+    # Both the search results (cached) and the lightcurves (mirrored) are reused
+    assert handler.requests_log == []
+
+
+@pytest.mark.parametrize("compress", [False, True])
+def test_interrupted_download_leaves_no_files(downloader_data_dir: Path, damit_server, compress: bool):
+    url, handler = damit_server
+    summary = make_downloader(downloader_data_dir, url, compress=compress).download_many(["Truncated"])
+
+    assert list(summary.failed) == ["Truncated"]
+    assert not (downloader_data_dir / "asteroids" / "Truncated").exists()
+
+    # Nothing is left behind that would fail the next attempt
+    handler.truncate = False
+    summary = make_downloader(downloader_data_dir, url, compress=compress).download_many(["Truncated"])
+
+    assert summary.succeeded == {"Truncated": "Truncated"}
+    asteroid_dir = downloader_data_dir / "asteroids" / "Truncated"
+    assert sorted(path.name for path in asteroid_dir.iterdir()) == [
+        "lc.json.gz" if compress else "lc.json",
+        "lc_meta.json",
+        "period.txt",
+    ]
+
+
+def test_lightcurve_validators_are_saved(downloader_data_dir: Path, damit_server):
+    url, handler = damit_server
+    make_downloader(downloader_data_dir, url).download_many(["Alpha"])
+
+    asteroid_dir = downloader_data_dir / "asteroids" / "Alpha"
+    assert json.loads((asteroid_dir / "lc_meta.json").read_text())["etag"] == '"v101"'
+    assert sorted(path.name for path in asteroid_dir.iterdir()) == ["lc.json", "lc_meta.json", "period.txt"]
+
+
+def test_revalidate_mirrored(downloader_data_dir: Path, damit_server):
+    url, handler = damit_server
+    make_downloader(downloader_data_dir, url).download_many(["Alpha", "Beta"])
+    handler.requests_log.clear()
+
+    asteroid_dir = downloader_data_dir / "asteroids"
+    lc_mtime_ns = (asteroid_dir / "Alpha" / "lc.json").stat().st_mtime_ns
+    # Beta changed on the server since it was downloaded
+    (asteroid_dir / "Beta" / "lc_meta.json").write_text(json.dumps({"etag": '"old"', "last_modified": None}))
+    (asteroid_dir / "Beta" / "lc.json").write_text("[]")
+
+    summary = make_downloader(downloader_data_dir, url).download_many(["Alpha", "Beta"], revalidate=True)
+
+    assert summary.succeeded == {"Alpha": "Alpha", "Beta": "Beta"}
+    assert sorted(handler.requests_log) == ["/lc/101/json", "/lc/102/json"]
+    assert (asteroid_dir / "Alpha" / "lc.json").stat().st_mtime_ns == lc_mtime_ns
+    assert json.loads((asteroid_dir / "Beta" / "lc.json").read_text()) == lightcurves(102)
+
+
+@pytest.mark.parametrize("compress", [False, True])
+def test_invalid_lightcurves_are_rejected(downloader_data_dir: Path, damit_server, compress: bool):
+    url, handler = damit_server
+    handler.html_ids = {101}
+    summary = make_downloader(downloader_data_dir, url, compress=compress).download_many(["Alpha", "Beta"])
+
+    assert summary.succeeded == {"Beta": "Beta"}
+    assert summary.failed["Alpha"].startswith("ValueError: Invalid light curve JSON for asteroid Alpha")
+    asteroid_dir = downloader_data_dir / "asteroids"
+    assert not (asteroid_dir / "Alpha").exists()
+
+    # The stored lightcurves and their validators are kept when the refreshed ones are invalid
+    lc_file = asteroid_dir / "Beta" / ("lc.json.gz" if compress else "lc.json")
+    (asteroid_dir / "Beta" / "lc_meta.json").write_text(json.dumps({"etag": '"old"', "last_modified": None}))
+    lc_bytes, meta_bytes = lc_file.read_bytes(), (asteroid_dir / "Beta" / "lc_meta.json").read_bytes()
+    handler.html_ids = {102}
+
+    summary = make_downloader(downloader_data_dir, url, compress=compress).download_many(["Beta"], revalidate=True)
+
+    assert summary.failed["Beta"].startswith("ValueError: Invalid light curve JSON for asteroid Beta")
+    assert lc_file.read_bytes() == lc_bytes
+    assert (asteroid_dir / "Beta" / "lc_meta.json").read_bytes() == meta_bytes
+    assert sorted(path.name for path in (asteroid_dir / "Beta").iterdir()) == [
+        lc_file.name,
+        "lc_meta.json",
+        "period.txt",
+    ]
@@ -0,0 +1,72 @@
+from pathlib import Path
+
+import pytest
+
+from astrofit.utils import AsteroidLoader
+from astrofit.utils.asteroid_cache import CACHE_META_FILE
+from astrofit.utils.asteroid_loader import CACHE_DIR
+
+
+@pytest.mark.parametrize("workers", [None, 2])
+def test_load_asteroids(data_dir: Path, workers: int | None):
+    asteroids = AsteroidLoader(data_dir).load_asteroids(workers=workers, executor="thread")
+
+    assert list(asteroids) == ["Ast0", "Ast1", "Ast2"]
+    assert asteroids["Ast1"] == AsteroidLoader(data_dir).load_asteroid("Ast1")
+
+
+@pytest.mark.parametrize("workers", [None, 2])
+def test_broken_asteroid_is_collected(data_dir: Path, workers: int | None):
+    lc_file = data_dir / "asteroids" / "Ast1" / "lc.json"
+    lc_file.write_text(lc_file.read_text().replace('"points_count": 20', '"points_count": 21', 1))
+
+    loader = AsteroidLoader(data_dir)
+    asteroids = loader.load_asteroids(workers=workers, executor="thread")
+
+    assert list(asteroids) == ["Ast0", "Ast2"]
+    assert list(loader.load_errors) == ["Ast1"]
+
+
+def test_corrupt_cache_entry_is_a_miss(data_dir: Path):
+    AsteroidLoader(data_dir, use_cache=True).load_asteroids()
+    (data_dir / CACHE_DIR / "Ast1" / CACHE_META_FILE).write_text("{")
+
+    progress = []
+    loader = AsteroidLoader(data_dir, use_cache=True)
+    asteroids = loader.load_asteroids(
+        workers=2, executor="thread", progress_callback=lambda name, done, total: progress.append((done, total))
+    )
+
+    assert list(asteroids) == ["Ast0", "Ast1", "Ast2"]
+    assert not loader.load_errors
+    assert progress == [(1, 3), (2, 3), (3, 3)]
+
+
+def test_raise_on_broken_asteroid(data_dir: Path):
+    lc_file = data_dir / "asteroids" / "Ast1" / "lc.json"
+    lc_file.write_text(lc_file.read_text().replace('"points_count": 20', '"points_count": 21', 1))
+
+    with pytest.raises(ValueError):
+        AsteroidLoader(data_dir).load_asteroids(skip_errors=False)
+
+
+@pytest.mark.parametrize("prefetch", [0, 1, 2, 5])
+def test_iter_asteroids(data_dir: Path, prefetch: int):
+    loader = AsteroidLoader(data_dir)
+
+    names = [name for name, _ in loader.iter_asteroids(prefetch=prefetch)]
+
+    assert names == ["Ast0", "Ast1", "Ast2"]
+
+
+@pytest.mark.parametrize("prefetch", [0, 2])
+def test_iter_asteroids_predicate(data_dir: Path, prefetch: int):
+    loader = AsteroidLoader(data_dir)
+    lc_file = data_dir / "asteroids" / "Ast1" / "lc.json"
+    lc_file.write_text(lc_file.read_text().replace('"points_count": 20', '"points_count": 21', 1))
+
+    # The broken asteroid is never read
+    asteroids = dict(loader.iter_asteroids(lambda info: info["period"] != 6.0, prefetch=prefetch))
+
+    assert list(asteroids) == ["Ast0", "Ast2"]
+    assert asteroids["Ast2"] == loader.load_asteroid("Ast2")
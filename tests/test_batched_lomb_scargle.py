@@ -0,0 +1,48 @@
+import numpy as np
+import pytest
+from astropy.timeseries import LombScargle
+
+from astrofit.utils.batched_lomb_scargle import BatchedLombScargle
+
+
+def make_bins() -> tuple[list[np.ndarray], list[np.ndarray]]:
+    rng = np.random.default_rng(0)
+    times, brightnesses = [], []
+    for n_points, baseline, freq in [(40, 1.5, 2.0), (130, 3.0, 4.5), (77, 0.8, 7.0)]:
+        bin_times = 2450000 + np.sort(rng.uniform(0, baseline, n_points))
+        times.append(bin_times)
+        brightnesses.append(
+            1
+            + 0.2 * np.sin(2 * np.pi * freq * bin_times)
+            + 0.05 * np.cos(4 * np.pi * freq * bin_times)
+            + rng.normal(scale=0.02, size=n_points)
+        )
+
+    return times, brightnesses
+
+
+@pytest.mark.parametrize("nterms", [1, 3])
+def test_power_matches_astropy(nterms: int):
+    times, brightnesses = make_bins()
+    # Well above 1 / baseline, where the multi-term fits are well conditioned
+    frequency = np.linspace(1.5, 20.0, 400)
+
+    # A small chunk bound splits the frequencies into several chunks
+    power = BatchedLombScargle(nterms=nterms, max_chunk_bytes=2**16).power(times, brightnesses, frequency)
+
+    assert power.shape == (len(times), len(frequency))
+    for bin_times, bin_brightnesses, bin_power in zip(times, brightnesses, power):
+        expected = LombScargle(bin_times, bin_brightnesses, nterms=nterms).power(frequency, method="chi2")
+        np.testing.assert_allclose(bin_power, expected, rtol=1e-6, atol=1e-8)
+
+
+def test_autofrequency_matches_astropy():
+    times, brightnesses = make_bins()
+    for bin_times, bin_brightnesses in zip(times, brightnesses):
+        expected = LombScargle(bin_times, bin_brightnesses).autofrequency(samples_per_peak=5, maximum_frequency=12.0)
+        np.testing.assert_allclose(BatchedLombScargle().autofrequency(bin_times, maximum_frequency=12.0), expected)
+
+
+def test_empty_bin():
+    with pytest.raises(ValueError):
+        BatchedLombScargle().power([np.empty(0)], [np.empty(0)], np.linspace(1, 2, 5))
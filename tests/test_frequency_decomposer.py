@@ -0,0 +1,54 @@
+from datetime import datetime
+
+import numpy as np
+import pytest
+
+from astrofit.model import Lightcurve, LightcurveBin
+from astrofit.utils import FrequencyDecomposer
+from astrofit.utils.enums import PeriodogramMethodEnum
+
+
+def make_bin(seed: int = 0) -> LightcurveBin:
+    rng = np.random.default_rng(seed)
+    times = 2450000 + np.sort(rng.uniform(0, 2, 150))
+    brightnesses = 1 + 0.1 * np.sin(2 * np.pi * 3.0 * times) + rng.normal(scale=0.01, size=times.size)
+    points = np.column_stack([times, brightnesses, np.ones((times.size, 6))])
+    lightcurve = Lightcurve(
+        id=1,
+        scale=1,
+        points=points,
+        created=datetime(2020, 1, 1),
+        modified=datetime(2020, 1, 1),
+        points_count=len(points),
+    )
+
+    return LightcurveBin(lightcurves=[lightcurve])
+
+
+@pytest.mark.parametrize("method", [PeriodogramMethodEnum.ASTROPY, PeriodogramMethodEnum.BATCHED])
+def test_top_frequencies(method: PeriodogramMethodEnum):
+    freq_data = FrequencyDecomposer(method=method).decompose_bin(make_bin(), 1, 3, max_freq=12.0)
+
+    assert freq_data.shape == (3, 2)
+    assert np.all(np.diff(freq_data[:, 1]) <= 0)
+    assert freq_data[0, 0] == pytest.approx(3.0, abs=0.05)
+
+
+@pytest.mark.parametrize("peak_separation", [None, 0.1])
+def test_zero_top_k(peak_separation: float | None):
+    decomposer = FrequencyDecomposer(peak_separation=peak_separation)
+
+    assert decomposer.decompose_bin(make_bin(), 1, 0, max_freq=12.0).shape == (0, 2)
+
+
+def test_top_k_peaks_are_separated():
+    # A comb of close peaks: most of the highest local maxima are too close to a higher one
+    frequency = np.linspace(0, 10, 2001)
+    power = np.abs(np.sin(40 * np.pi * frequency)) * np.exp(-frequency)
+
+    idx = FrequencyDecomposer()._get_top_k_peaks_idx(frequency, power, 5, 1.0)
+
+    assert len(idx) == 5
+    assert np.all(np.diff(power[idx]) <= 0)
+    assert np.min(np.abs(np.subtract.outer(frequency[idx], frequency[idx])) + 10 * np.eye(5)) >= 1.0
+    assert frequency[idx[0]] < 0.05
@@ -0,0 +1,87 @@
+from datetime import datetime
+from pathlib import Path
+
+import numpy as np
+
+from astrofit.model import Asteroid, Lightcurve, LightcurveBin
+from astrofit.utils import AsteroidLoader, LightcurveSplitter
+
+POINTS = (
+    "2450100.04990326 1.19151562 0.61413197 1.20518111 1.92599205 0.74943286 -0.44320324 1.46936470\n"
+    "2450100.05686823 1.19868362 -0.79299811 1.77312586 -3.94798291 2.38973695 -0.80953761 1.23146976\n"
+    "2450100.06680895 1.19124116 0.86924433 1.22302274 0.32043145 0.84644651 1.00087467 -0.18002363\n"
+)
+
+
+def make_lightcurve(points: str = POINTS, id: int = 1) -> Lightcurve:
+    return Lightcurve(
+        id=id,
+        scale=1,
+        points=points,
+        created=datetime(2020, 1, 1),
+        modified=datetime(2020, 1, 2),
+        points_count=len(points.strip().split("\n")),
+    )
+
+
+def make_asteroid(lightcurves: list[Lightcurve]) -> Asteroid:
+    return Asteroid(id=100, name="Test", period=5.0, lambd=10.0, beta=20.0, lightcurves=lightcurves)
+
+
+def test_equal_lightcurves():
+    assert make_lightcurve() == make_lightcurve()
+
+
+def test_lightcurves_with_different_points_differ():
+    other_points = POINTS.replace("1.19151562", "1.19151563")
+
+    assert make_lightcurve() != make_lightcurve(other_points)
+
+
+def test_lightcurves_with_different_metadata_differ():
+    assert make_lightcurve() != make_lightcurve(id=2)
+
+
+def test_equal_asteroids():
+    assert make_asteroid([make_lightcurve()]) == make_asteroid([make_lightcurve()])
+
+
+def test_empty_bin():
+    lightcurve_bin = LightcurveBin(lightcurves=[])
+
+    assert lightcurve_bin.times.shape == (0,)
+    assert lightcurve_bin.brightnesses.shape == (0,)
+
+
+def test_bin_concatenates_lightcurves():
+    lightcurve_bin = LightcurveBin(lightcurves=[make_lightcurve(), make_lightcurve()])
+
+    assert np.array_equal(lightcurve_bin.times, np.tile(make_lightcurve().time_arr, 2))
+
+
+def test_trusted_merge_matches_validated(data_dir: Path):
+    lightcurves = AsteroidLoader(data_dir).load_asteroid("Ast0").lightcurves[::-1]
+
+    merged = Lightcurve.merge_many(lightcurves)
+    validated = Lightcurve.from_points(lightcurves[0], [point for lc in lightcurves for point in lc.points])
+
+    assert merged == validated
+    assert not merged.points_arr.flags.writeable
+
+
+def test_trusted_split_matches_validated(data_dir: Path):
+    lightcurve = Lightcurve.merge_many(AsteroidLoader(data_dir).load_asteroid("Ast1").lightcurves)
+    max_hours_diff = 1.0
+
+    # Reference split of the validated points, one at a time (the fixture has no outliers)
+    segments = [[lightcurve.points[0]]]
+    for previous, point in zip(lightcurve.points, lightcurve.points[1:]):
+        if 24 * (point.JD - previous.JD) > max_hours_diff:
+            segments.append([])
+        segments[-1].append(point)
+
+    splitted = LightcurveSplitter().split_lightcurve(lightcurve, max_hours_diff)
+
+    assert len(splitted) >= 3
+    assert splitted == [Lightcurve.from_points(lightcurve, segment) for segment in segments]
+    assert all(not lc.points_arr.flags.writeable for lc in splitted)
@@ -0,0 +1,80 @@
+from datetime import datetime
+
+import numpy as np
+import pytest
+
+from astrofit.model import Lightcurve
+from astrofit.utils import LightcurveNormalizer
+
+
+def make_lightcurve(id: int, brightnesses: list[float], sun_distance: float, earth_distance: float) -> Lightcurve:
+    n_points = len(brightnesses)
+    points = np.column_stack(
+        [
+            2450000 + 10 * id + np.arange(n_points) / 24,
+            brightnesses,
+            np.tile([0.0, sun_distance, 0.0], (n_points, 1)),
+            np.tile([0.0, 0.0, earth_distance], (n_points, 1)),
+        ]
+    )
+
+    return Lightcurve(
+        id=id,
+        scale=1,
+        points=points,
+        created=datetime(2020, 1, 1),
+        modified=datetime(2020, 1, 1),
+        points_count=n_points,
+    )
+
+
+LIGHTCURVES = [make_lightcurve(1, [1.0, 2.0, 3.0], 2.0, 0.5), make_lightcurve(2, [0.5, 1.5], 3.0, 2.0)]
+
+
+@pytest.mark.parametrize(
+    ("correct_distance", "relative_scaling", "expected"),
+    [
+        # Distances reduce by (r * delta)**2, 1 for the first light curve and 36 for the second one
+        (True, False, [[1.0, 2.0, 3.0], [18.0, 54.0]]),
+        (False, True, [[0.5, 1.0, 1.5], [0.5, 1.5]]),
+        (True, True, [[0.5, 1.0, 1.5], [0.5, 1.5]]),
+        (False, False, [[1.0, 2.0, 3.0], [0.5, 1.5]]),
+    ],
+)
+def test_scaling(correct_distance: bool, relative_scaling: bool, expected: list[list[float]]):
+    normalized = LightcurveNormalizer(correct_distance, relative_scaling).normalize_lightcurves(LIGHTCURVES)
+
+    assert len(normalized) == len(LIGHTCURVES)
+    for lightcurve, normalized_lightcurve, expected_brightnesses in zip(LIGHTCURVES, normalized, expected):
+        np.testing.assert_allclose(normalized_lightcurve.brightness_arr, expected_brightnesses)
+        # Only the brightnesses change
+        assert normalized_lightcurve.id == lightcurve.id
+        np.testing.assert_array_equal(normalized_lightcurve.time_arr, lightcurve.time_arr)
+        np.testing.assert_array_equal(normalized_lightcurve.sun_arr, lightcurve.sun_arr)
+        np.testing.assert_array_equal(normalized_lightcurve.earth_arr, lightcurve.earth_arr)
+
+
+def test_unit_mean():
+    rng = np.random.default_rng(0)
+    lightcurves = [make_lightcurve(id, list(rng.uniform(0.5, 2.0, 30)), 1.0 + id, 0.2 * id) for id in range(1, 4)]
+
+    normalized = LightcurveNormalizer().normalize_lightcurves(lightcurves)
+
+    for lightcurve, normalized_lightcurve in zip(lightcurves, normalized):
+        assert normalized_lightcurve.brightness_arr.mean() == pytest.approx(1.0)
+        # The shape of each light curve is kept
+        np.testing.assert_allclose(
+            normalized_lightcurve.brightness_arr, lightcurve.brightness_arr / lightcurve.brightness_arr.mean()
+        )
+
+
+def test_input_is_not_modified():
+    brightnesses = [lc.brightness_arr.copy() for lc in LIGHTCURVES]
+
+    LightcurveNormalizer().normalize_lightcurves(LIGHTCURVES)
+    single = LightcurveNormalizer().normalize_lightcurve(LIGHTCURVES[1])
+
+    for lightcurve, original in zip(LIGHTCURVES, brightnesses):
+        np.testing.assert_array_equal(lightcurve.brightness_arr, original)
+    np.testing.assert_allclose(single.brightness_arr, [0.5, 1.5])
+    assert LightcurveNormalizer().normalize_lightcurves([]) == []
@@ -0,0 +1,50 @@
+import math
+
+import numpy as np
+import pytest
+
+from astrofit.utils import LightcurveResampler
+
+
+def make_series() -> tuple[np.ndarray, np.ndarray]:
+    # Two nights of one point per 0.002 days, with a few missing points and a gap of half a day
+    times = 2450000 + 0.002 * np.concatenate([np.arange(50), np.arange(300, 350)])
+    # Away from the bucket edges (which start at the first point)
+    times[1:] += 0.0005
+    times = np.delete(times, [10, 11, 12, 30])
+    brightnesses = 1 + 0.1 * np.sin(2 * np.pi * times / 0.05)
+
+    return times, brightnesses
+
+
+def test_resample_means():
+    times = 2450000 + np.array([0.0, 0.5, 1.2, 3.1, 3.9])
+    brightnesses = np.array([1.0, 2.0, 3.0, 4.0, 6.0])
+
+    resampled_times, resampled_brightnesses = LightcurveResampler(resolution=1.0).resample(times, brightnesses)
+
+    assert np.allclose(resampled_times - 2450000, [0.5, 1.5, 3.5])
+    assert np.allclose(resampled_brightnesses, [1.5, 3.0, 5.0])
+
+
+def test_fill_short_gaps_only():
+    times, brightnesses = make_series()
+
+    resampled_times, _ = LightcurveResampler(fill_gaps=True).resample(times, brightnesses)
+
+    # The missing points within the nights are filled, the gap between them is not
+    assert len(resampled_times) == 100
+    assert np.max(np.diff(resampled_times)) == pytest.approx(0.002 * 251)
+
+
+def test_fill_all_gaps():
+    times, brightnesses = make_series()
+
+    resampled_times, _ = LightcurveResampler(fill_gaps=True, max_gap=math.inf).resample(times, brightnesses)
+
+    assert len(resampled_times) == 350
+
+
+def test_invalid_max_gap():
+    with pytest.raises(ValueError):
+        LightcurveResampler(fill_gaps=True, max_gap=0)
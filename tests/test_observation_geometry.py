@@ -0,0 +1,68 @@
+from pathlib import Path
+
+import numpy as np
+import pytest
+
+from astrofit.model import ObservationGeometry
+from astrofit.model.observation_geometry import GEOMETRY_FIELDS, cartesian_to_spherical
+from astrofit.utils import AsteroidLoader
+
+
+def make_points(sun: list[list[float]], earth: list[list[float]]) -> np.ndarray:
+    jds = 2450000 + np.arange(len(sun), dtype=np.float64)
+
+    return np.column_stack([jds, np.ones(len(sun)), sun, earth])
+
+
+def test_known_geometry():
+    points_arr = make_points(
+        sun=[[2.0, 0.0, 0.0], [0.0, 0.0, 1.5], [1.0, 1.0, 0.0]],
+        earth=[[0.0, 0.5, 0.0], [0.0, 0.0, -3.0], [2.0, 2.0, 0.0]],
+    )
+
+    geometry = ObservationGeometry.from_points(points_arr)
+
+    np.testing.assert_allclose(geometry.sun_distance, [2.0, 1.5, np.sqrt(2)])
+    np.testing.assert_allclose(geometry.earth_distance, [0.5, 3.0, np.sqrt(8)])
+    # Perpendicular, opposite and aligned Sun and Earth directions
+    np.testing.assert_allclose(geometry.phase_angle, [np.pi / 2, np.pi, 0.0], atol=1e-7)
+    np.testing.assert_allclose(geometry.sun_spherical, [[np.pi / 2, 0.0], [0.0, 0.0], [np.pi / 2, np.pi / 4]])
+    np.testing.assert_allclose(geometry.earth_spherical, [[np.pi / 2, np.pi / 2], [np.pi, 0.0], [np.pi / 2, np.pi / 4]])
+
+
+def test_geometry_matches_per_point(data_dir: Path):
+    points_arr = AsteroidLoader(data_dir).load_asteroid("Ast0").lightcurves[0].points_arr
+
+    geometry = ObservationGeometry.from_points(points_arr)
+
+    assert geometry.geometry_arr.shape == (len(points_arr), len(GEOMETRY_FIELDS))
+    assert not geometry.geometry_arr.flags.writeable
+    for point, row in zip(points_arr, geometry.geometry_arr):
+        sun, earth = point[2:5], point[5:8]
+        sun_distance, earth_distance = np.linalg.norm(sun), np.linalg.norm(earth)
+        phase_angle = np.arccos(np.dot(sun, earth) / (sun_distance * earth_distance))
+
+        assert row[:3] == pytest.approx([sun_distance, earth_distance, phase_angle])
+        assert row[3:5] == pytest.approx([np.arccos(sun[2] / sun_distance), np.arctan2(sun[1], sun[0])])
+        assert row[5:7] == pytest.approx([np.arccos(earth[2] / earth_distance), np.arctan2(earth[1], earth[0])])
+
+
+def test_spherical_round_trip():
+    vectors = np.random.default_rng(0).normal(size=(50, 3))
+
+    r, theta, phi = cartesian_to_spherical(vectors).T
+    cartesian = np.column_stack([r * np.sin(theta) * np.cos(phi), r * np.sin(theta) * np.sin(phi), r * np.cos(theta)])
+
+    np.testing.assert_allclose(cartesian, vectors, atol=1e-12)
+
+
+def test_cached_geometry(data_dir: Path):
+    lightcurves = AsteroidLoader(data_dir, use_cache=True, cache_geometry=True).load_asteroid("Ast0").lightcurves
+    # Loaded again from the cache, the geometry is then memory-mapped
+    cached = AsteroidLoader(data_dir, use_cache=True, cache_geometry=True).load_asteroid("Ast0").lightcurves
+
+    assert isinstance(cached[0].geometry.geometry_arr.base, np.memmap)
+    for lightcurve, cached_lightcurve in zip(lightcurves, cached):
+        expected = ObservationGeometry.compute(lightcurve.points_arr)
+        np.testing.assert_allclose(lightcurve.geometry.geometry_arr, expected)
+        np.testing.assert_allclose(cached_lightcurve.geometry.geometry_arr, expected)
@@ -0,0 +1,79 @@
+import json
+from pathlib import Path
+
+import pytest
+
+from astrofit.utils import AsteroidLoader, FeatureStore, FrequencyDecomposer, ParameterSweep
+from astrofit.utils.enums import PeriodogramMethodEnum
+from astrofit.utils.parameter_sweep import FEATURES_FILE, SweepConfig
+
+CONFIG = {
+    "max_hours_diff": 1.0,
+    "min_no_points": 10,
+    "top_k_bins": 1,
+    "buffer_bins": 1,
+    "select_bins_by": "lightcurves",
+    "max_time_diff": 30.0,
+    "min_bin_size": 1,
+    "max_freq": 12.0,
+    "top_k_freqs": 5,
+    "nterms": 1,
+}
+
+
+def read_output(features_dir: Path, output_format: str) -> tuple[dict, list[str]]:
+    if output_format == "npy":
+        store = FeatureStore(features_dir)
+        return store.read_config(1), list(store.read(1))
+
+    with open(features_dir / FEATURES_FILE.format(config_no=1), "r") as f:
+        data = json.load(f)
+
+    return data["config"], list(data["asteroids"])
+
+
+@pytest.mark.parametrize("output_format", ["json", "npy"])
+def test_regenerate(data_dir: Path, tmp_path: Path, output_format: str):
+    asteroids = AsteroidLoader(data_dir).load_asteroids()
+    features_dir = tmp_path / "features"
+    sweep = ParameterSweep()
+    config = SweepConfig(**CONFIG)
+
+    assert sweep.regenerate(asteroids, [config], features_dir, output_format=output_format) == {
+        1: ["Ast0", "Ast1", "Ast2"]
+    }
+    assert sweep.regenerate(asteroids, [config], features_dir, output_format=output_format) == {}
+
+    subset = {"Ast1": asteroids["Ast1"]}
+    assert sweep.regenerate(subset, [config], features_dir, output_format=output_format) == {}
+    assert read_output(features_dir, output_format)[1] == ["Ast0", "Ast1", "Ast2"]
+
+
+@pytest.mark.parametrize("output_format", ["json", "npy"])
+def test_regenerate_other_config_replaces_output(data_dir: Path, tmp_path: Path, output_format: str):
+    asteroids = AsteroidLoader(data_dir).load_asteroids()
+    features_dir = tmp_path / "features"
+    sweep = ParameterSweep()
+    sweep.regenerate(asteroids, [SweepConfig(**CONFIG)], features_dir, output_format=output_format)
+
+    other_config = SweepConfig(**{**CONFIG, "top_k_freqs": 3})
+    subset = {"Ast1": asteroids["Ast1"]}
+    assert sweep.regenerate(subset, [other_config], features_dir, output_format=output_format) == {1: ["Ast1"]}
+
+    stored_config, names = read_output(features_dir, output_format)
+    assert SweepConfig.model_validate(stored_config) == other_config
+    assert names == ["Ast1"]
+
+
+def test_input_hash_ignores_unused_settings(data_dir: Path):
+    asteroid = AsteroidLoader(data_dir).load_asteroid("Ast0")
+    config = SweepConfig(**CONFIG)
+
+    def get_input_hash(**kwargs) -> str:
+        return ParameterSweep(FrequencyDecomposer(**kwargs))._get_input_hash(asteroid, config)
+
+    assert get_input_hash() == get_input_hash(pdm_bins=20, max_evaluations=100)
+    assert get_input_hash() != get_input_hash(samples_per_peak=10)
+
+    pdm = PeriodogramMethodEnum.PDM
+    assert get_input_hash(method=pdm) != get_input_hash(method=pdm, pdm_bins=20)
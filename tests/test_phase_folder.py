@@ -0,0 +1,63 @@
+from pathlib import Path
+
+import numpy as np
+import pytest
+
+from astrofit.utils import AsteroidLoader, PhaseFolder
+from astrofit.utils.enums import PhaseStatisticEnum
+
+
+def naive_fold(times: np.ndarray, period: float, ref_time: float) -> np.ndarray:
+    return np.array([(time - ref_time) * 24 % period / period for time in times])
+
+
+def naive_phase_curve(phases: np.ndarray, brightnesses: np.ndarray, n_bins: int, statistic) -> np.ndarray:
+    bin_idx = [min(int(phase * n_bins), n_bins - 1) for phase in phases]
+    curve = np.full(n_bins, np.nan)
+    for ind in range(n_bins):
+        values = [brightness for brightness, idx in zip(brightnesses, bin_idx) if idx == ind]
+        if values:
+            curve[ind] = statistic(values)
+
+    return curve
+
+
+def test_fold_matches_naive():
+    rng = np.random.default_rng(0)
+    times = 2450000 + np.sort(rng.uniform(0, 30, 200))
+    periods = np.array([0.5, 3.7, 6.0, 11.25])
+
+    phases = PhaseFolder().fold(times, periods)
+
+    assert phases.shape == (len(periods), len(times))
+    assert np.all((phases >= 0) & (phases < 1))
+    for period, period_phases in zip(periods, phases):
+        np.testing.assert_allclose(period_phases, naive_fold(times, period, times[0]))
+
+    np.testing.assert_allclose(PhaseFolder().fold(times, 6.0, ref_time=times[5])[0], naive_fold(times, 6.0, times[5]))
+
+
+@pytest.mark.parametrize(
+    ("statistic", "reduce"), [(PhaseStatisticEnum.MEAN, np.mean), (PhaseStatisticEnum.MEDIAN, np.median)]
+)
+def test_phase_curves_match_naive(data_dir: Path, statistic: PhaseStatisticEnum, reduce):
+    asteroid = AsteroidLoader(data_dir).load_asteroid("Ast1")
+    times = np.concatenate([lc.time_arr for lc in asteroid.lightcurves])
+    brightnesses = np.concatenate([lc.brightness_arr for lc in asteroid.lightcurves])
+    periods = np.array([asteroid.period, 2.5])
+    n_bins = 16
+
+    curves = PhaseFolder().phase_curves_lightcurves(asteroid.lightcurves, periods, n_bins, statistic)
+
+    assert curves.shape == (len(periods), n_bins)
+    for period, curve in zip(periods, curves):
+        expected = naive_phase_curve(naive_fold(times, period, times[0]), brightnesses, n_bins, reduce)
+        np.testing.assert_allclose(curve, expected, equal_nan=True)
+
+
+def test_fill_empty_bins():
+    # Points only in the phase bins 0, 1 and 3 of 4
+    times = 2450000 + np.array([0.0, 1.5, 3.5]) / 24
+    curves = PhaseFolder().phase_curves(times, np.array([1.0, 2.0, 4.0]), 4.0, n_bins=4, fill_empty=True)
+
+    np.testing.assert_allclose(curves[0], [1.0, 2.0, 3.0, 4.0])
@@ -0,0 +1,82 @@
+from pathlib import Path
+
+from astrofit.model import Asteroid
+from astrofit.utils import AsteroidLoader, LightcurveNormalizer, LightcurveSplitter, PipelineCache
+from astrofit.utils.pipeline_cache import BIN_STAGE, NORMALIZE_STAGE, SPLIT_STAGE
+
+
+def load_asteroids(data_dir: Path) -> dict[str, Asteroid]:
+    loader = AsteroidLoader(data_dir)
+    return {name: loader.load_asteroid(name) for name in ["Ast0", "Ast1", "Ast2"]}
+
+
+def test_split_matches_splitter(data_dir: Path):
+    asteroid = load_asteroids(data_dir)["Ast0"]
+    cache = PipelineCache()
+
+    first = cache.split_lightcurves(asteroid, 24)
+    second = cache.split_lightcurves(asteroid, 24)
+
+    assert second is first
+    assert first == LightcurveSplitter().split_lightcurves(asteroid.lightcurves, 24)
+    assert cache.stats[SPLIT_STAGE].hits == 1
+    assert cache.stats[SPLIT_STAGE].misses == 1
+
+
+def test_lru_eviction(data_dir: Path):
+    asteroids = load_asteroids(data_dir)
+    # Each split holds 60 points of 8 float64 values, the budget fits two of them
+    cache = PipelineCache(max_bytes=2 * 60 * 8 * 8)
+
+    cache.split_lightcurves(asteroids["Ast0"], 24)
+    cache.split_lightcurves(asteroids["Ast1"], 24)
+    # Ast0 becomes the most recently used, so Ast1 is evicted next
+    cache.split_lightcurves(asteroids["Ast0"], 24)
+    cache.split_lightcurves(asteroids["Ast2"], 24)
+
+    stats = cache.stats[SPLIT_STAGE]
+    assert (stats.hits, stats.misses, stats.evictions) == (1, 3, 1)
+    assert cache.size_bytes <= 2 * 60 * 8 * 8
+
+    cache.split_lightcurves(asteroids["Ast0"], 24)
+    assert cache.stats[SPLIT_STAGE].hits == 2
+    cache.split_lightcurves(asteroids["Ast1"], 24)
+    assert cache.stats[SPLIT_STAGE].misses == 4
+
+
+def test_disk_round_trip(data_dir: Path, tmp_path: Path):
+    asteroid = load_asteroids(data_dir)["Ast0"]
+    disk_dir = tmp_path / "pipeline_cache"
+
+    bins = PipelineCache(disk_dir=disk_dir).bin_lightcurves(asteroid, 24, None, 15, normalize=True)
+
+    # A new instance (e.g. after a restart) reads all stages from the disk
+    cache = PipelineCache(disk_dir=disk_dir)
+    assert cache.bin_lightcurves(asteroid, 24, None, 15, normalize=True) == bins
+    assert cache.stats[BIN_STAGE].disk_hits == 1
+    assert cache.stats[BIN_STAGE].misses == 0
+
+    cache.clear(disk=True)
+    assert cache.bin_lightcurves(asteroid, 24, None, 15, normalize=True) == bins
+    assert cache.stats[BIN_STAGE].misses == 1
+
+
+def test_changed_config_invalidates(data_dir: Path, tmp_path: Path):
+    asteroid = load_asteroids(data_dir)["Ast0"]
+    disk_dir = tmp_path / "pipeline_cache"
+
+    PipelineCache(disk_dir=disk_dir).normalize_lightcurves(asteroid, 24)
+
+    # Other stage parameters, normalizer settings or asteroid content are new keys, not stale hits
+    cache = PipelineCache(normalizer=LightcurveNormalizer(relative_scaling=False), disk_dir=disk_dir)
+    cache.normalize_lightcurves(asteroid, 24)
+    assert cache.stats[NORMALIZE_STAGE].misses == 1
+    assert cache.stats[SPLIT_STAGE].disk_hits == 1
+
+    cache.split_lightcurves(asteroid, 12)
+    assert cache.stats[SPLIT_STAGE].misses == 1
+
+    changed = Asteroid(**{**dict(asteroid), "lightcurves": asteroid.lightcurves[:2]})
+    assert changed.fingerprint != asteroid.fingerprint
+    assert len(cache.split_lightcurves(changed, 24)) == 2
+    assert cache.stats[SPLIT_STAGE].misses == 2